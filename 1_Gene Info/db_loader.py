@@ -0,0 +1,239 @@
+"""
+Provides a bulk loader that builds the genes SQLite database from the NCBI gene_info dump.
+
+Reads plain or gzipped gene_info files as a stream, inserts the rows in large batches inside
+a single transaction and only creates the secondary indexes and the count tables from db_logic
+once all rows are loaded. The database is built in a temporary file next to the target, which
+replaces the target only when the load succeeded, so a reload never mixes rows of two releases.
+
+Functions:
+    open_gene_info(file_path): Opens a plain or gzipped gene_info file for reading.
+    read_gene_rows(file): Yields the rows of a gene_info file with '-' replaced by None.
+    create_genes_table(conn): Creates the 'genes' table.
+    load_gene_info(file_path, database, batch_size, report_every): Loads a gene_info file
+    into the database.
+    report_progress(total, start): Prints the number of loaded rows and the load rate.
+    main(): Handles the command line input and starts the load.
+
+Dependencies:
+    SQLite3 for database operations
+    gzip for reading compressed gene_info dumps
+"""
+
+import gzip
+import os
+import sqlite3
+import sys
+import time
+from itertools import islice
+from db_logic import create_indexes, refresh_summary_tables, create_summary_triggers
+
+CREATE_TABLE_QUERY = '''
+CREATE TABLE genes (
+    tax_id INTEGER,
+    GeneID INTEGER PRIMARY KEY,
+    Symbol TEXT,
+    LocusTag TEXT,
+    Synonyms TEXT,
+    dbXrefs TEXT,
+    chromosome TEXT,
+    map_location TEXT,
+    description TEXT,
+    type_of_gene TEXT,
+    Symbol_from_nomenclature_authority TEXT,
+    Full_name_from_nomenclature_authority TEXT,
+    Nomenclature_status TEXT,
+    Other_designations TEXT,
+    Modification_date DATE,
+    Feature_type TEXT
+);
+'''
+
+INSERT_QUERY = '''
+INSERT INTO genes (
+    tax_id, GeneID, Symbol, LocusTag, Synonyms, dbXrefs, chromosome,
+    map_location, description, type_of_gene, Symbol_from_nomenclature_authority,
+    Full_name_from_nomenclature_authority, Nomenclature_status,
+    Other_designations, Modification_date, Feature_type
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Trade durability for speed while loading, the database is built in a new temporary file that
+# only replaces the target once it is complete
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+RESTORE_PRAGMAS = [
+    "PRAGMA locking_mode = NORMAL",
+    "PRAGMA synchronous = FULL",
+    "PRAGMA journal_mode = DELETE",
+]
+
+TEMPORARY_SUFFIX = '.loading'
+NUMBER_OF_COLUMNS = 16
+BATCH_SIZE = 100_000
+REPORT_EVERY = 1_000_000
+
+
+def open_gene_info(file_path):
+    """
+    Opens a gene_info file for reading, transparently decompressing gzipped files.
+
+    Args:
+    file_path (str): Path to a plain or gzipped gene_info file.
+
+    Returns:
+    TextIO: A text file object that yields the lines of the file.
+    """
+    with open(file_path, 'rb') as file:
+        is_gzipped = file.read(2) == b'\x1f\x8b'
+    if is_gzipped:
+        return gzip.open(file_path, 'rt', encoding='utf-8', newline='\n')
+    return open(file_path, 'r', encoding='utf-8', newline='\n')
+
+
+def read_gene_rows(file):
+    """
+    Yields the rows of a gene_info file one by one.
+
+    Args:
+    file (TextIO): An open gene_info file.
+
+    Yields:
+    list: The 16 column values of a row, with '-' replaced by None to handle null values.
+    Header lines starting with '#' and rows with an unexpected number of columns are skipped.
+    """
+    for line in file:
+        if line.startswith('#'):
+            continue
+        row = line.rstrip('\r\n').split('\t')
+        if len(row) != NUMBER_OF_COLUMNS:
+            continue
+        yield [None if cell == '-' else cell for cell in row]
+
+
+def create_genes_table(conn):
+    """
+    Creates the 'genes' table.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    conn.execute(CREATE_TABLE_QUERY)
+
+
+def load_gene_info(file_path, database='genes.db', batch_size=BATCH_SIZE,
+                   report_every=REPORT_EVERY):
+    """
+    Loads a gene_info file into the 'genes' table of a new SQLite database.
+
+    Args:
+    file_path (str): Path to a plain or gzipped gene_info file.
+    database (str): Path to the SQLite database file, replaced if it exists.
+    batch_size (int): Number of rows inserted per executemany call.
+    report_every (int): Number of rows after which the progress is printed.
+
+    Returns:
+    int: The number of rows read from the gene_info file.
+
+    Raises:
+    sqlite3.IntegrityError: If a GeneID occurs more than once in the file.
+
+    Details:
+    The database is built from scratch in a temporary file, which replaces the existing
+    database only after the load succeeded, so genes removed or changed in a newer gene_info
+    release do not survive from an older one. The indexes and count tables are created once
+    after all rows are inserted instead of being updated for every row. All batches are
+    inserted inside one transaction. If the load fails, the temporary file is removed and the
+    existing database is left unchanged.
+    """
+    temporary = database + TEMPORARY_SUFFIX
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    try:
+        total = _build_database(file_path, temporary, batch_size, report_every)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    os.replace(temporary, database)
+    return total
+
+
+def _build_database(file_path, database, batch_size, report_every):
+    conn = sqlite3.connect(database, isolation_level=None)
+    try:
+        for pragma in BULK_LOAD_PRAGMAS:
+            conn.execute(pragma)
+        create_genes_table(conn)
+
+        start = time.perf_counter()
+        total = 0
+        next_report = report_every
+        conn.execute("BEGIN")
+        with open_gene_info(file_path) as file:
+            rows = read_gene_rows(file)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(INSERT_QUERY, batch)
+                total += len(batch)
+                if total >= next_report:
+                    report_progress(total, start)
+                    next_report += report_every
+        conn.execute("COMMIT")
+        report_progress(total, start)
+
+        print("Creating indexes and summary tables ...")
+        conn.execute("BEGIN")
+        create_indexes(conn)
+        refresh_summary_tables(conn)
+        create_summary_triggers(conn)
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        for pragma in RESTORE_PRAGMAS:
+            conn.execute(pragma)
+        return total
+    finally:
+        conn.close()
+
+
+def report_progress(total, start):
+    """
+    Prints the number of loaded rows and the load rate.
+
+    Args:
+    total (int): Number of rows loaded so far.
+    start (float): Start time of the load as returned by time.perf_counter().
+    """
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total} rows in {elapsed:.1f} s ({rate:,.0f} rows/s)")
+
+
+def main():
+    """
+    Main function that loads the gene_info file given on the command line.
+
+    Usage:
+    python db_loader.py GENE_INFO_FILE [DATABASE]
+    """
+    if len(sys.argv) not in (2, 3):
+        print("Please enter it in the format like this: python db_loader.py GENE_INFO_FILE [DATABASE]")
+        sys.exit(1)
+    database = sys.argv[2] if len(sys.argv) == 3 else 'genes.db'
+    try:
+        load_gene_info(sys.argv[1], database)
+    except (OSError, sqlite3.Error) as error:
+        print("Error while loading the gene_info file", error)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,179 @@ Provides functionality for querying and processing gene data from a SQLite datab
 Contains functions for extraction, processing, and display of gene-related data. 
 
 Functions:
-    get_genes_data(conn, question_number, query): Fetches / processes gene data from the database.
+    get_genes_data(conn, question_number, query, cache): Fetches / processes gene data from the
+    database, optionally served from a ResultCache.
     process_data(question_number, rows): Processes raw gene data into a human-readable format.
+    iter_genes_rows(conn, query, chunk_size): Yields the rows of a query chunk by chunk.
+    get_genes_data_streaming(conn, question_number, query, chunk_size, reducer): Fetches gene
+    data as a stream and reduces it without holding all rows in memory.
     main(): handles database connections and managing data retrieval / display.
     output_result(results): Output the processed results for each question.
+    create_indexes(conn): Creates the secondary indexes on tax_id and type_of_gene.
+    drop_indexes(conn): Drops the secondary indexes, e.g. before a bulk load.
+    create_summary_tables(conn): Creates the per-taxon and per-gene-type count tables.
+    refresh_summary_tables(conn): Recomputes the count tables from the 'genes' table.
+    create_summary_triggers(conn): Creates triggers that keep the count tables up to date.
+    drop_summary_triggers(conn): Drops the triggers, e.g. before a bulk load.
+    has_summary_tables(conn): Checks whether the count tables and triggers are in place.
+    ensure_query_support(conn): Builds indexes, count tables and triggers if missing.
+    get_queries(conn): Returns the queries answering the questions for this database.
+    get_combined_results(conn, cache): Answers all four questions from the count tables or
+    with a single scan of 'genes'.
+    open_read_only(database): Opens a read-only connection to the database.
+    run_queries_concurrently(database, queries, max_workers, cache): Runs queries in parallel
+    on a pool of read-only connections.
 
 Dependencies:
     SQLite3 for database operations
     'genes' table
+    result_cache for persisting results between runs
 """
 
 
 import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from result_cache import ResultCache, MISSING
 
-def get_genes_data(conn, question_number, query):
+INDEX_QUERIES = [
+    "CREATE INDEX IF NOT EXISTS idx_genes_tax_id ON genes (tax_id)",
+    "CREATE INDEX IF NOT EXISTS idx_genes_type_of_gene ON genes (type_of_gene)",
+]
+
+DROP_INDEX_QUERIES = [
+    "DROP INDEX IF EXISTS idx_genes_tax_id",
+    "DROP INDEX IF EXISTS idx_genes_type_of_gene",
+]
+
+SUMMARY_TABLE_QUERIES = [
+    "CREATE TABLE IF NOT EXISTS taxon_counts (tax_id INTEGER PRIMARY KEY, gene_count INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS gene_type_counts (type_of_gene TEXT PRIMARY KEY, gene_count INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS replaced_genes (GeneID INTEGER PRIMARY KEY, tax_id INTEGER, type_of_gene TEXT)",
+]
+
+# A row removed by the REPLACE conflict resolution does not fire trg_genes_delete (recursive
+# triggers are off), so the BEFORE triggers keep the row that would be replaced in
+# replaced_genes and the AFTER triggers take it off the counts once the write happened. A write
+# that is ignored or fails leaves nothing to take off, the next write clears the stale row.
+DISCOUNT_REPLACED = """
+        UPDATE taxon_counts SET gene_count = gene_count - 1
+            WHERE tax_id IS (SELECT tax_id FROM replaced_genes WHERE GeneID = NEW.GeneID)
+            AND EXISTS (SELECT 1 FROM replaced_genes WHERE GeneID = NEW.GeneID);
+        DELETE FROM taxon_counts WHERE gene_count <= 0
+            AND tax_id IS (SELECT tax_id FROM replaced_genes WHERE GeneID = NEW.GeneID);
+        UPDATE gene_type_counts SET gene_count = gene_count - 1
+            WHERE type_of_gene IS
+            (SELECT type_of_gene FROM replaced_genes WHERE GeneID = NEW.GeneID)
+            AND EXISTS (SELECT 1 FROM replaced_genes WHERE GeneID = NEW.GeneID);
+        DELETE FROM gene_type_counts WHERE gene_count <= 0 AND type_of_gene IS
+            (SELECT type_of_gene FROM replaced_genes WHERE GeneID = NEW.GeneID);
+        DELETE FROM replaced_genes;
+"""
+
+# type_of_gene can be NULL, so the count rows are matched with IS instead of an upsert
+SUMMARY_TRIGGER_QUERIES = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_genes_before_insert BEFORE INSERT ON genes
+    BEGIN
+        DELETE FROM replaced_genes;
+        INSERT INTO replaced_genes (GeneID, tax_id, type_of_gene)
+            SELECT GeneID, tax_id, type_of_gene FROM genes WHERE GeneID = NEW.GeneID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_genes_before_rekey BEFORE UPDATE OF GeneID ON genes
+    BEGIN
+        DELETE FROM replaced_genes;
+        INSERT INTO replaced_genes (GeneID, tax_id, type_of_gene)
+            SELECT GeneID, tax_id, type_of_gene FROM genes
+            WHERE GeneID = NEW.GeneID AND NEW.GeneID IS NOT OLD.GeneID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_genes_rekey AFTER UPDATE OF GeneID ON genes
+    BEGIN""" + DISCOUNT_REPLACED + """    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_genes_insert AFTER INSERT ON genes
+    BEGIN""" + DISCOUNT_REPLACED + """
+        INSERT INTO taxon_counts (tax_id, gene_count)
+            SELECT NEW.tax_id, 0 WHERE NOT EXISTS
+            (SELECT 1 FROM taxon_counts WHERE tax_id IS NEW.tax_id);
+        UPDATE taxon_counts SET gene_count = gene_count + 1 WHERE tax_id IS NEW.tax_id;
+        INSERT INTO gene_type_counts (type_of_gene, gene_count)
+            SELECT NEW.type_of_gene, 0 WHERE NOT EXISTS
+            (SELECT 1 FROM gene_type_counts WHERE type_of_gene IS NEW.type_of_gene);
+        UPDATE gene_type_counts SET gene_count = gene_count + 1
+            WHERE type_of_gene IS NEW.type_of_gene;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_genes_delete AFTER DELETE ON genes
+    BEGIN
+        UPDATE taxon_counts SET gene_count = gene_count - 1 WHERE tax_id IS OLD.tax_id;
+        DELETE FROM taxon_counts WHERE tax_id IS OLD.tax_id AND gene_count <= 0;
+        UPDATE gene_type_counts SET gene_count = gene_count - 1
+            WHERE type_of_gene IS OLD.type_of_gene;
+        DELETE FROM gene_type_counts WHERE type_of_gene IS OLD.type_of_gene AND gene_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_genes_update AFTER UPDATE OF tax_id, type_of_gene ON genes
+    BEGIN
+        UPDATE taxon_counts SET gene_count = gene_count - 1 WHERE tax_id IS OLD.tax_id;
+        DELETE FROM taxon_counts WHERE tax_id IS OLD.tax_id AND gene_count <= 0;
+        INSERT INTO taxon_counts (tax_id, gene_count)
+            SELECT NEW.tax_id, 0 WHERE NOT EXISTS
+            (SELECT 1 FROM taxon_counts WHERE tax_id IS NEW.tax_id);
+        UPDATE taxon_counts SET gene_count = gene_count + 1 WHERE tax_id IS NEW.tax_id;
+        UPDATE gene_type_counts SET gene_count = gene_count - 1
+            WHERE type_of_gene IS OLD.type_of_gene;
+        DELETE FROM gene_type_counts WHERE type_of_gene IS OLD.type_of_gene AND gene_count <= 0;
+        INSERT INTO gene_type_counts (type_of_gene, gene_count)
+            SELECT NEW.type_of_gene, 0 WHERE NOT EXISTS
+            (SELECT 1 FROM gene_type_counts WHERE type_of_gene IS NEW.type_of_gene);
+        UPDATE gene_type_counts SET gene_count = gene_count + 1
+            WHERE type_of_gene IS NEW.type_of_gene;
+    END
+    """,
+]
+
+DROP_TRIGGER_QUERIES = [
+    "DROP TRIGGER IF EXISTS trg_genes_before_insert",
+    "DROP TRIGGER IF EXISTS trg_genes_before_rekey",
+    "DROP TRIGGER IF EXISTS trg_genes_rekey",
+    "DROP TRIGGER IF EXISTS trg_genes_insert",
+    "DROP TRIGGER IF EXISTS trg_genes_delete",
+    "DROP TRIGGER IF EXISTS trg_genes_update",
+]
+
+# Queries on the full 'genes' table, used when the count tables are not available
+TABLE_QUERIES = {
+    1: "SELECT COUNT(*) FROM genes",
+    2: "SELECT COUNT(*) FROM genes WHERE tax_id = 9606",
+    3: "SELECT DISTINCT type_of_gene FROM genes;",
+    4: "SELECT type_of_gene, COUNT(type_of_gene) AS frequency FROM genes GROUP BY type_of_gene ORDER BY frequency DESC LIMIT 1;",
+}
+
+# Queries on the precomputed count tables, each reads at most a few hundred rows
+SUMMARY_QUERIES = {
+    1: "SELECT IFNULL(SUM(gene_count), 0) FROM taxon_counts",
+    2: "SELECT IFNULL(SUM(gene_count), 0) FROM taxon_counts WHERE tax_id = 9606",
+    3: "SELECT type_of_gene FROM gene_type_counts ORDER BY type_of_gene;",
+    4: "SELECT type_of_gene, gene_count FROM gene_type_counts WHERE type_of_gene IS NOT NULL ORDER BY gene_count DESC LIMIT 1;",
+}
+
+# Answers all four questions in one pass: per gene type the number of genes, the number of
+# human genes and the number of genes with a non-NULL type (what COUNT(type_of_gene) counts)
+COMBINED_QUERY = """
+SELECT type_of_gene, COUNT(*), SUM(tax_id = 9606), COUNT(type_of_gene)
+FROM genes GROUP BY type_of_gene;
+"""
+
+def get_genes_data(conn, question_number, query, cache=None):
     """
     Executes a SQL query to fetch gene data based on a provided query and connection.
 
@@ -25,6 +184,8 @@ def get_genes_data(conn, question_number, query):
     conn (sqlite3.Connection): A connection object to the SQLite database.
     question_number (int): An identifier for the specific question or data request.
     query (str): SQL query string to be executed.
+    cache (ResultCache, optional): Cache for the database behind conn. A cached result is
+    returned without executing the query, a new result is stored in the cache.
 
     Returns:
     Any: The processed data for the specific question, or None if there is
@@ -33,12 +194,19 @@ def get_genes_data(conn, question_number, query):
     Raises:
     sqlite3.Error: If there is an issue executing the database query.
     """
+    if cache is not None:
+        result = cache.get(question_number, query)
+        if result is not MISSING:
+            return result
     try:
         cur = conn.cursor()
         cur.execute(query)
         rows = cur.fetchall()
         cur.close()  # Close the cursor
-        return process_data(question_number, rows)
+        result = process_data(question_number, rows)
+        if cache is not None:
+            cache.put(question_number, query, result)
+        return result
     except sqlite3.Error as error:
         print("Error while connecting to sqlite", error)
         return None
@@ -49,36 +217,104 @@ def process_data(question_number, rows):
 
     Args:
     question_number (int): The specific question number which dictates the format of processing.
-    rows (list of tuple): Data fetched from the database as a list of tuples.
+    rows (iterable of tuple): Data fetched from the database, either as a list of tuples or
+    as a stream of tuples from iter_genes_rows. Rows are consumed one by one.
 
     Returns:
     str: A string representing the processed result for the question.
     """
+    rows = iter(rows)
     if question_number in (1, 2):
-        result = rows[0][0]
+        result = next(rows)[0]
     elif question_number == 3:
         result = ', '.join(str(row[0]) for row in rows)
     elif question_number == 4:
-        result = f"Most frequent gene type: {rows[0][0]}, Frequency: {rows[0][1]}"
+        row = next(rows)
+        result = f"Most frequent gene type: {row[0]}, Frequency: {row[1]}"
     return result
 
+def iter_genes_rows(conn, query, chunk_size=10000):
+    """
+    Executes a SQL query and yields its rows, fetching them from the cursor in chunks.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    query (str): SQL query string to be executed.
+    chunk_size (int): Number of rows fetched per fetchmany call.
+
+    Yields:
+    tuple: One row of the result set. At most chunk_size rows are held in memory at a time.
+
+    Raises:
+    sqlite3.Error: If there is an issue executing the database query.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(query)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cur.close()
+
+def get_genes_data_streaming(conn, question_number, query, chunk_size=10000,
+                             reducer=process_data):
+    """
+    Executes a SQL query and reduces its rows as they are fetched, instead of fetching all
+    rows first like get_genes_data.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    question_number (int): An identifier for the specific question or data request.
+    query (str): SQL query string to be executed.
+    chunk_size (int): Number of rows fetched per fetchmany call.
+    reducer (callable): Called as reducer(question_number, rows) with an iterator over the
+    rows, defaults to process_data.
+
+    Returns:
+    Any: The result of the reducer, or None if there is an error during database interaction.
+    """
+    rows = iter_genes_rows(conn, query, chunk_size)
+    try:
+        return reducer(question_number, rows)
+    except sqlite3.Error as error:
+        print("Error while connecting to sqlite", error)
+        return None
+    finally:
+        rows.close()
+
 def main():
     """
     Main function to manage database connection and fetch results for predefined queries.
 
     Details:
     Establishes a connection to a SQLite database, executes multiple queries to fetch data,
-    processes and prints the results for different questions.
+    processes and prints the results for different questions. Results are cached per
+    database content in 'genes.db.cache', so unchanged databases are not queried again.
+    Called with '--combined', answers missing in the count tables are computed in a single
+    scan of the table. Called with '--concurrent', the queries not in the cache run in
+    parallel on read-only connections. All modes use the same count tables and cache, so
+    they give the same answers.
     """
     database = 'genes.db'
+    mode = sys.argv[1] if len(sys.argv) == 2 else None
     with sqlite3.connect(database) as conn:  # using connection as context manager
-        results = {}
-        print("MD5 Hash of the file: 391abe3356f88ff7a34a085f37e29f66")
-        results[1] = get_genes_data(conn, 1, "SELECT COUNT(*) FROM genes")
-        results[2] = get_genes_data(conn, 2, "SELECT COUNT(*) FROM genes WHERE tax_id = 9606")
-        results[3] = get_genes_data(conn, 3, "SELECT DISTINCT type_of_gene FROM genes;")
-        results[4] = get_genes_data(conn, 4, "SELECT type_of_gene, COUNT(type_of_gene) AS frequency FROM genes GROUP BY type_of_gene ORDER BY frequency DESC LIMIT 1;")
-        output_result(results)
+        ensure_query_support(conn)
+        with ResultCache(database) as cache:
+            print(f"MD5 Hash of the file: {cache.fingerprint()}")
+            if mode == '--combined':
+                results = get_combined_results(conn, cache)
+            elif mode == '--concurrent':
+                results = run_queries_concurrently(database, get_queries(conn).items(),
+                                                   cache=cache)
+            else:
+                results = {}
+                for question_number, query in get_queries(conn).items():
+                    results[question_number] = get_genes_data(conn, question_number, query,
+                                                              cache)
+            output_result(results)
 
 def output_result(results):
     """
@@ -91,5 +327,241 @@ def output_result(results):
     for question_number, result in results.items():
         print(f"Question number: {question_number}\n \t Result: {result}")
 
+def create_indexes(conn):
+    """
+    Creates the secondary indexes on the tax_id and type_of_gene columns.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    for query in INDEX_QUERIES:
+        conn.execute(query)
+
+def drop_indexes(conn):
+    """
+    Drops the secondary indexes, so a bulk load does not have to maintain them row by row.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    for query in DROP_INDEX_QUERIES:
+        conn.execute(query)
+
+def create_summary_tables(conn):
+    """
+    Creates the tables holding the number of genes per taxon and per gene type.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    for query in SUMMARY_TABLE_QUERIES:
+        conn.execute(query)
+
+def refresh_summary_tables(conn):
+    """
+    Recomputes the count tables from scratch with one GROUP BY over the 'genes' table.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    create_summary_tables(conn)
+    conn.execute("DELETE FROM taxon_counts")
+    conn.execute("DELETE FROM gene_type_counts")
+    conn.execute("INSERT INTO taxon_counts (tax_id, gene_count) "
+                 "SELECT tax_id, COUNT(*) FROM genes GROUP BY tax_id")
+    conn.execute("INSERT INTO gene_type_counts (type_of_gene, gene_count) "
+                 "SELECT type_of_gene, COUNT(*) FROM genes GROUP BY type_of_gene")
+
+def create_summary_triggers(conn):
+    """
+    Creates the triggers that update the count tables on every insert, delete and update,
+    including rows replaced by INSERT OR REPLACE, so the counts stay correct without
+    recomputing them.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    create_summary_tables(conn)
+    for query in SUMMARY_TRIGGER_QUERIES:
+        conn.execute(query)
+
+def drop_summary_triggers(conn):
+    """
+    Drops the count triggers, so a bulk load is not slowed down by them. The count tables
+    have to be recomputed with refresh_summary_tables afterwards.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    for query in DROP_TRIGGER_QUERIES:
+        conn.execute(query)
+
+def has_summary_tables(conn):
+    """
+    Checks whether the count tables and the triggers maintaining them exist.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+
+    Returns:
+    bool: True if the count tables can be used to answer the questions.
+    """
+    cur = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE (type = 'table' AND name IN "
+        "('taxon_counts', 'gene_type_counts', 'replaced_genes')) OR (type = 'trigger' AND "
+        "name IN ('trg_genes_before_insert', 'trg_genes_before_rekey', 'trg_genes_rekey', "
+        "'trg_genes_insert', 'trg_genes_delete', 'trg_genes_update'))")
+    return cur.fetchone()[0] == 9
+
+def ensure_query_support(conn):
+    """
+    Builds the indexes, count tables and triggers if they are not in place yet.
+    The first call scans the 'genes' table once, later calls return immediately. Triggers of
+    an older database are replaced, as its counts may already be off.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    """
+    try:
+        create_indexes(conn)
+        if not has_summary_tables(conn):
+            drop_summary_triggers(conn)
+            refresh_summary_tables(conn)
+            create_summary_triggers(conn)
+        conn.commit()
+    except sqlite3.Error as error:
+        print("Error while preparing the summary tables", error)
+
+def get_queries(conn):
+    """
+    Returns the queries answering the four questions, using the count tables if available.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+
+    Returns:
+    dict: Question numbers as keys and SQL query strings as values.
+    """
+    if has_summary_tables(conn):
+        return SUMMARY_QUERIES
+    return TABLE_QUERIES
+
+def get_combined_results(conn, cache=None):
+    """
+    Answers all four questions, from the count tables if they exist and otherwise with a
+    single GROUP BY scan over the 'genes' table.
+
+    Args:
+    conn (sqlite3.Connection): A connection object to the SQLite database.
+    cache (ResultCache, optional): Cache for the database behind conn, used like in
+    get_genes_data.
+
+    Returns:
+    dict: Question numbers as keys and processed results as values, in the same format
+    as the results of get_genes_data, or None values if there is an error during
+    database interaction.
+    """
+    if has_summary_tables(conn):
+        # The count tables answer every question from a few rows, exactly like the default mode
+        return {question_number: get_genes_data(conn, question_number, query, cache)
+                for question_number, query in SUMMARY_QUERIES.items()}
+    if cache is not None:
+        results = {question_number: cache.get(question_number, COMBINED_QUERY)
+                   for question_number in range(1, 5)}
+        if MISSING not in results.values():
+            return results
+    try:
+        cur = conn.cursor()
+        cur.execute(COMBINED_QUERY)
+        rows = cur.fetchall()
+        cur.close()
+    except sqlite3.Error as error:
+        print("Error while connecting to sqlite", error)
+        return dict.fromkeys(range(1, 5))
+
+    total = sum(row[1] for row in rows)
+    human = sum(row[2] or 0 for row in rows)
+    ranking = sorted(((row[0], row[3]) for row in rows), key=lambda row: row[1], reverse=True)
+    results = {
+        1: process_data(1, [(total,)]),
+        2: process_data(2, [(human,)]),
+        3: process_data(3, [(row[0],) for row in rows]),
+        4: process_data(4, ranking) if ranking else None,
+    }
+    if cache is not None:
+        for question_number, result in results.items():
+            cache.put(question_number, COMBINED_QUERY, result)
+    return results
+
+def open_read_only(database):
+    """
+    Opens a read-only connection to a SQLite database.
+
+    Args:
+    database (str): Path to the SQLite database file.
+
+    Returns:
+    sqlite3.Connection: A connection that can be used from any thread.
+    """
+    uri = Path(database).resolve().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+def run_queries_concurrently(database, queries, max_workers=4, cache=None):
+    """
+    Runs queries in parallel, each worker thread using its own read-only connection.
+
+    Args:
+    database (str): Path to the SQLite database file.
+    queries (iterable of tuple): (question_number, query) pairs to execute, e.g. the items
+    of get_queries(conn).
+    max_workers (int): Number of worker threads and therefore read-only connections.
+    cache (ResultCache, optional): Cache for the database. Cached results are returned
+    without running their queries and new results are stored. The cache is only used from
+    the calling thread, as its connection cannot be shared between threads.
+
+    Returns:
+    dict: Question numbers as keys and processed results as values, in the order the
+    queries were given, ready to be passed to output_result.
+
+    Details:
+    SQLite releases the GIL while a statement runs, so the scans of different queries
+    really run at the same time.
+    """
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def open_worker_connection():
+        local.conn = open_read_only(database)
+        with lock:
+            connections.append(local.conn)
+
+    def run(question_number, query):
+        return get_genes_data(local.conn, question_number, query)
+
+    queries = list(queries)
+    results = {}
+    pending = []
+    for question_number, query in queries:
+        result = cache.get(question_number, query) if cache is not None else MISSING
+        if result is MISSING:
+            pending.append((question_number, query))
+        else:
+            results[question_number] = result
+    try:
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending)),
+                                    initializer=open_worker_connection) as executor:
+                futures = {question_number: (query, executor.submit(run, question_number, query))
+                           for question_number, query in pending}
+                for question_number, (query, future) in futures.items():
+                    results[question_number] = future.result()
+                    if cache is not None and results[question_number] is not None:
+                        cache.put(question_number, query, results[question_number])
+    finally:
+        for conn in connections:
+            conn.close()
+    return {question_number: results[question_number] for question_number, _ in queries}
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,323 @@
+"""
+Provides a columnar, memory-mapped snapshot of the genes table for vectorized analytics.
+
+The snapshot is a directory of NumPy .npy files: the integer columns tax_id and GeneID are
+stored as they are, type_of_gene and chromosome are dictionary-encoded into integer codes with
+their dictionaries stored as JSON. The arrays are memory-mapped when the snapshot is opened, so
+questions are answered with NumPy operations without loading the table into Python objects.
+The size, modification time and MD5 hash of the source database are stored with the snapshot,
+and a snapshot whose database has changed since the export is not opened.
+
+Classes:
+    GeneSnapshot: Opens a snapshot and answers questions on it.
+
+Functions:
+    export_snapshot(database, snapshot_dir, chunk_size): Exports the genes table into a snapshot.
+    is_current(snapshot_dir, database): Checks whether a snapshot matches its source database.
+    main(): Handles the command line input, exports a snapshot and prints the answers.
+
+Dependencies:
+    NumPy for the memory-mapped arrays and vectorized operations
+    db_logic for streaming the rows out of the database
+    result_cache for fingerprinting the database file
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import numpy as np
+from db_logic import iter_genes_rows, process_data, output_result
+from result_cache import file_md5
+
+INTEGER_COLUMNS = ('tax_id', 'GeneID')
+ENCODED_COLUMNS = ('type_of_gene', 'chromosome')
+NULL_CODE = -1
+HUMAN_TAX_ID = 9606
+
+
+def export_snapshot(database, snapshot_dir, chunk_size=100000):
+    """
+    Exports the integer and dictionary-encoded columns of the genes table into a snapshot.
+
+    Args:
+    database (str): Path to the SQLite database file.
+    snapshot_dir (str): Directory the snapshot is written to, created if it does not exist.
+    chunk_size (int): Number of rows fetched and written at a time.
+
+    Returns:
+    int: The number of exported rows.
+
+    Details:
+    The arrays are preallocated as memory-mapped .npy files and filled chunk by chunk, so the
+    memory needed does not grow with the size of the table. NULL values are stored as -1 in
+    the code arrays and as 0 in the integer arrays.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # Fingerprinted before the export, so changes made during it make the snapshot stale
+    stat = os.stat(database)
+    source = {'source': os.path.abspath(database), 'size': stat.st_size,
+              'mtime_ns': stat.st_mtime_ns, 'md5': file_md5(database)}
+    with sqlite3.connect(database) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM genes").fetchone()[0]
+        dictionaries = {}
+        for column in ENCODED_COLUMNS:
+            values = conn.execute(
+                f"SELECT DISTINCT {column} FROM genes WHERE {column} IS NOT NULL "
+                f"ORDER BY {column}").fetchall()
+            dictionaries[column] = [row[0] for row in values]
+
+        arrays = {}
+        for column in INTEGER_COLUMNS:
+            arrays[column] = np.lib.format.open_memmap(
+                os.path.join(snapshot_dir, f"{column}.npy"), mode='w+', dtype=np.int64,
+                shape=(total,))
+        for column in ENCODED_COLUMNS:
+            dtype = np.int16 if len(dictionaries[column]) < 2 ** 15 else np.int32
+            arrays[column] = np.lib.format.open_memmap(
+                os.path.join(snapshot_dir, f"{column}.codes.npy"), mode='w+', dtype=dtype,
+                shape=(total,))
+        codes = {column: {value: code for code, value in enumerate(dictionaries[column])}
+                 for column in ENCODED_COLUMNS}
+
+        query = f"SELECT {', '.join(INTEGER_COLUMNS + ENCODED_COLUMNS)} FROM genes"
+        rows = iter_genes_rows(conn, query, chunk_size)
+        position = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                position = _write_chunk(arrays, codes, chunk, position)
+                chunk = []
+        if chunk:
+            position = _write_chunk(arrays, codes, chunk, position)
+
+    for array in arrays.values():
+        array.flush()
+    for column in ENCODED_COLUMNS:
+        with open(os.path.join(snapshot_dir, f"{column}.dict.json"), 'w') as file:
+            json.dump(dictionaries[column], file)
+    with open(os.path.join(snapshot_dir, 'meta.json'), 'w') as file:
+        json.dump({'rows': position, **source}, file)
+    return position
+
+
+def is_current(snapshot_dir, database=None):
+    """
+    Checks whether a snapshot still matches its source database.
+
+    Args:
+    snapshot_dir (str): Directory of the snapshot.
+    database (str, optional): Path to the database, by default the one the snapshot was
+    exported from.
+
+    Returns:
+    bool: True if the database has the size and modification time it had at the export, or
+    else the same MD5 hash. False if it changed, if the snapshot or database does not exist
+    or if the snapshot was exported without a fingerprint.
+    """
+    try:
+        with open(os.path.join(snapshot_dir, 'meta.json')) as file:
+            meta = json.load(file)
+        stat = os.stat(database or meta['source'])
+    except (OSError, KeyError, ValueError):
+        return False
+    if 'md5' not in meta:
+        return False
+    if stat.st_size == meta['size'] and stat.st_mtime_ns == meta['mtime_ns']:
+        return True
+    return stat.st_size == meta['size'] and file_md5(database or meta['source']) == meta['md5']
+
+
+def _write_chunk(arrays, codes, chunk, position):
+    end = position + len(chunk)
+    columns = list(zip(*chunk))
+    for index, column in enumerate(INTEGER_COLUMNS):
+        arrays[column][position:end] = np.fromiter(
+            (value or 0 for value in columns[index]), dtype=np.int64, count=len(chunk))
+    for index, column in enumerate(ENCODED_COLUMNS, start=len(INTEGER_COLUMNS)):
+        lookup = codes[column]
+        arrays[column][position:end] = np.fromiter(
+            (lookup.get(value, NULL_CODE) for value in columns[index]),
+            dtype=arrays[column].dtype, count=len(chunk))
+    return end
+
+
+class GeneSnapshot:
+    """
+    Read-only view on a snapshot exported with export_snapshot.
+
+    Attributes:
+        rows (int): Number of genes in the snapshot.
+        columns (dict): Memory-mapped arrays by column name, code arrays for encoded columns.
+        dictionaries (dict): The values of the encoded columns, indexed by code.
+
+    Methods:
+        count(**conditions): Counts the genes matching equality conditions.
+        distinct(column): Lists the distinct values of a column, including NULL.
+        group_count(*columns, **conditions): Counts the genes per combination of values.
+        most_frequent(column): Returns the most frequent non-NULL value and its frequency.
+        answers(): Answers the four db_logic questions.
+    """
+
+    def __init__(self, snapshot_dir, database=None, check_source=True):
+        """
+        Opens a snapshot.
+
+        Args:
+            snapshot_dir (str): Directory of the snapshot.
+            database (str, optional): Path to the source database, by default the one the
+            snapshot was exported from.
+            check_source (bool): Whether to check that the database has not changed since
+            the export.
+
+        Raises:
+            ValueError: If the database changed since the export, see is_current.
+        """
+        if check_source and not is_current(snapshot_dir, database):
+            raise ValueError(f"The snapshot in {snapshot_dir} does not match its database, "
+                             "export it again")
+        with open(os.path.join(snapshot_dir, 'meta.json')) as file:
+            self.rows = json.load(file)['rows']
+        self.columns = {}
+        self.dictionaries = {}
+        for column in INTEGER_COLUMNS:
+            self.columns[column] = np.load(
+                os.path.join(snapshot_dir, f"{column}.npy"), mmap_mode='r')
+        for column in ENCODED_COLUMNS:
+            self.columns[column] = np.load(
+                os.path.join(snapshot_dir, f"{column}.codes.npy"), mmap_mode='r')
+            with open(os.path.join(snapshot_dir, f"{column}.dict.json")) as file:
+                self.dictionaries[column] = json.load(file)
+
+    def _mask(self, conditions):
+        mask = None
+        for column, value in conditions.items():
+            if column in self.dictionaries:
+                try:
+                    value = self.dictionaries[column].index(value)
+                except ValueError:
+                    value = NULL_CODE if value is None else len(self.dictionaries[column])
+            condition = self.columns[column] == value
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    def _decode(self, column, value):
+        if column in self.dictionaries:
+            return None if value == NULL_CODE else self.dictionaries[column][value]
+        return int(value)
+
+    def count(self, **conditions):
+        """
+        Counts the genes whose columns equal the given values, e.g. count(tax_id=9606).
+
+        Returns:
+            int: The number of matching genes, or all genes without conditions.
+        """
+        if not conditions:
+            return self.rows
+        return int(np.count_nonzero(self._mask(conditions)))
+
+    def distinct(self, column):
+        """
+        Lists the distinct values of a column, like SELECT DISTINCT column ... ORDER BY column.
+
+        Returns:
+            list: The values, sorted, with None first if the column contains NULL values.
+            NULL values of integer columns are stored as 0 and listed as 0.
+        """
+        if column in self.dictionaries:
+            present = np.unique(self.columns[column])
+            return [self._decode(column, code) for code in present]
+        return [int(value) for value in np.unique(self.columns[column])]
+
+    def group_count(self, *columns, **conditions):
+        """
+        Counts the genes per combination of values of the given columns, like a
+        SELECT columns, COUNT(*) ... GROUP BY columns query.
+
+        Args:
+            *columns (str): Names of the columns to group by.
+            **conditions: Equality conditions restricting the counted genes.
+
+        Returns:
+            dict: Tuples of column values as keys and the number of genes as values.
+        """
+        mask = self._mask(conditions) if conditions else None
+        keys = np.zeros(self.rows if mask is None else int(np.count_nonzero(mask)),
+                        dtype=np.int64)
+        uniques = []
+        for column in columns:
+            values = self.columns[column] if mask is None else self.columns[column][mask]
+            unique, inverse = np.unique(values, return_inverse=True)
+            keys = keys * len(unique) + inverse
+            uniques.append(unique)
+        combined, counts = np.unique(keys, return_counts=True)
+        result = {}
+        for key, count in zip(combined.tolist(), counts.tolist()):
+            group = []
+            for column, unique in zip(reversed(columns), reversed(uniques)):
+                key, index = divmod(key, len(unique))
+                group.append(self._decode(column, unique[index]))
+            result[tuple(reversed(group))] = count
+        return result
+
+    def most_frequent(self, column):
+        """
+        Returns the most frequent non-NULL value of a column and its frequency.
+
+        Returns:
+            tuple: The value and its frequency, or None if the column has no values.
+        """
+        if column in self.dictionaries:
+            codes = self.columns[column]
+            counts = np.bincount(codes[codes != NULL_CODE],
+                                 minlength=len(self.dictionaries[column]))
+            if not counts.any():
+                return None
+            code = int(np.argmax(counts))
+            return self.dictionaries[column][code], int(counts[code])
+        unique, counts = np.unique(self.columns[column], return_counts=True)
+        if not len(unique):
+            return None
+        index = int(np.argmax(counts))
+        return int(unique[index]), int(counts[index])
+
+    def answers(self):
+        """
+        Answers the four db_logic questions on the snapshot.
+
+        Returns:
+            dict: Question numbers as keys and processed results as values, in the same
+            format as the results of db_logic.get_genes_data.
+        """
+        most_frequent = self.most_frequent('type_of_gene')
+        return {
+            1: process_data(1, [(self.count(),)]),
+            2: process_data(2, [(self.count(tax_id=HUMAN_TAX_ID),)]),
+            3: process_data(3, [(value,) for value in self.distinct('type_of_gene')]),
+            4: process_data(4, [most_frequent]) if most_frequent else None,
+        }
+
+
+def main():
+    """
+    Main function that exports a snapshot of the database, unless an up-to-date one exists,
+    and prints the answers from it.
+
+    Usage:
+    python gene_snapshot.py [DATABASE] [SNAPSHOT_DIR]
+    """
+    database = sys.argv[1] if len(sys.argv) > 1 else 'genes.db'
+    snapshot_dir = sys.argv[2] if len(sys.argv) > 2 else 'genes_snapshot'
+    try:
+        if not is_current(snapshot_dir, database):
+            export_snapshot(database, snapshot_dir)
+    except (OSError, sqlite3.Error) as error:
+        print("Error while connecting to sqlite", error)
+        sys.exit(1)
+    output_result(GeneSnapshot(snapshot_dir).answers())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Provides an on-disk cache for the processed results of gene data queries.
+
+Results are keyed by the MD5 fingerprint of the database file, the question number and the
+normalized query text, so a rebuilt database never serves stale results. The cache itself is
+a small SQLite database whose size is bounded by evicting the least recently used results.
+
+Classes:
+    ResultCache: Persists query results for one database file.
+
+Functions:
+    file_md5(file_path): Computes the MD5 hash of a file's content.
+    normalize_query(query): Normalizes whitespace outside literals and trailing semicolons of a
+    query.
+
+Dependencies:
+    SQLite3 for storing the cached results
+    hashlib for fingerprinting the database file
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+MISSING = object()
+
+# String literals and quoted identifiers, with doubled quotes as escapes
+QUOTED_PATTERN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+CACHE_TABLE_QUERIES = [
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        key TEXT PRIMARY KEY,
+        result TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)",
+    """
+    CREATE TABLE IF NOT EXISTS fingerprints (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        md5 TEXT NOT NULL
+    )
+    """,
+]
+
+
+def file_md5(file_path):
+    """
+    Computes the MD5 hash of a file's content, reading it in chunks.
+
+    Args:
+    file_path (str): The path to the file.
+
+    Returns:
+    str: The hexadecimal MD5 digest.
+    """
+    with open(file_path, 'rb') as file:
+        return hashlib.file_digest(file, 'md5').hexdigest()
+
+
+def normalize_query(query):
+    """
+    Normalizes a query so formatting differences do not lead to separate cache entries.
+
+    Args:
+    query (str): SQL query string.
+
+    Returns:
+    str: The query with whitespace collapsed outside of quoted literals and identifiers and
+    without trailing semicolons. Quoted text is kept as it is, as it changes the result.
+    """
+    parts = QUOTED_PATTERN.split(query)
+    # Every odd part is quoted text
+    for index in range(0, len(parts), 2):
+        parts[index] = re.sub(r'\s+', ' ', parts[index])
+    normalized = ''.join(parts).strip()
+    while normalized.endswith(';'):
+        normalized = normalized[:-1].rstrip()
+    return normalized
+
+
+class ResultCache:
+    """
+    On-disk cache for the processed results of queries against one database file.
+
+    Attributes:
+        database (str): Path to the SQLite database whose results are cached.
+        cache_path (str): Path to the SQLite file holding the cache.
+        max_bytes (int): Maximum total size of the cached results before eviction starts.
+
+    Methods:
+        fingerprint(): Returns the MD5 hash of the database file's content.
+        get(question_number, query): Returns a cached result or MISSING.
+        put(question_number, query, result): Stores a result and evicts old entries.
+        close(): Closes the connection to the cache.
+
+    The MD5 hash of the database is only recomputed when the file's size or modification
+    time changes, so repeated runs against an unchanged database do not read it again.
+    """
+
+    def __init__(self, database, cache_path=None, max_bytes=16 * 1024 * 1024):
+        self.database = database
+        self.cache_path = cache_path or database + '.cache'
+        self.max_bytes = max_bytes
+        self._fingerprint = None
+        self._conn = sqlite3.connect(self.cache_path)
+        for query in CACHE_TABLE_QUERIES:
+            self._conn.execute(query)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def fingerprint(self):
+        """
+        Returns the MD5 hash of the database file, reusing the stored hash while the
+        file's size and modification time are unchanged.
+
+        Returns:
+        str: The hexadecimal MD5 digest of the database file.
+        """
+        if self._fingerprint is not None:
+            return self._fingerprint
+        path = os.path.abspath(self.database)
+        stat = os.stat(path)
+        row = self._conn.execute(
+            "SELECT md5 FROM fingerprints WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        if row:
+            self._fingerprint = row[0]
+        else:
+            self._fingerprint = file_md5(path)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, md5) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, self._fingerprint))
+            self._conn.commit()
+        return self._fingerprint
+
+    def _key(self, question_number, query):
+        text = f"{self.fingerprint()}\n{question_number}\n{normalize_query(query)}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, question_number, query):
+        """
+        Looks up the cached result of a query.
+
+        Args:
+        question_number (int): The question the query answers.
+        query (str): SQL query string.
+
+        Returns:
+        Any: The cached result, or MISSING if the query is not cached for this database.
+        """
+        key = self._key(question_number, query)
+        row = self._conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return MISSING
+        self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, question_number, query, result):
+        """
+        Stores the result of a query and evicts the least recently used results if the
+        cache grows beyond max_bytes.
+
+        Args:
+        question_number (int): The question the query answers.
+        query (str): SQL query string.
+        result (Any): The JSON serializable processed result.
+        """
+        key = self._key(question_number, query)
+        value = json.dumps(result)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (key, result, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()))
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT IFNULL(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY last_used DESC")
+        kept = 0
+        evicted = []
+        for key, size in rows:
+            kept += size
+            if kept > self.max_bytes:
+                evicted.append((key,))
+        self._conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def close(self):
+        """
+        Closes the connection to the cache.
+        """
+        self._conn.close()
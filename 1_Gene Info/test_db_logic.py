@@ -0,0 +1,97 @@
+"""
+This module contains tests for the count tables of the db_logic module and the triggers that
+maintain them. It uses Python's unittest framework on in-memory SQLite databases.
+
+The TestSummaryTriggers class checks that the counts kept by the triggers stay equal to the
+counts recomputed from the 'genes' table after inserts, deletes, updates and replaced rows.
+"""
+
+import sqlite3
+import unittest
+from db_loader import create_genes_table
+from db_logic import (ensure_query_support, has_summary_tables, get_genes_data, SUMMARY_QUERIES,
+                      TABLE_QUERIES)
+
+
+class TestSummaryTriggers(unittest.TestCase):
+    """
+    A test suite for the trigger-maintained count tables.
+    """
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_genes_table(self.conn)
+        self.conn.executemany(
+            "INSERT INTO genes (GeneID, tax_id, type_of_gene) VALUES (?, ?, ?)",
+            [(1, 9606, "protein-coding"), (2, 9606, "ncRNA"), (3, 10090, "protein-coding"),
+             (4, 10090, None), (5, 7227, "pseudo")])
+        ensure_query_support(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def assert_counts(self):
+        """
+        Asserts that the count tables equal the counts recomputed from the 'genes' table.
+        """
+        counts = {
+            "taxon_counts": "SELECT tax_id, gene_count FROM taxon_counts",
+            "gene_type_counts": "SELECT type_of_gene, gene_count FROM gene_type_counts",
+        }
+        expected = {
+            "taxon_counts": "SELECT tax_id, COUNT(*) FROM genes GROUP BY tax_id",
+            "gene_type_counts": "SELECT type_of_gene, COUNT(*) FROM genes GROUP BY type_of_gene",
+        }
+        for table, query in counts.items():
+            self.assertEqual(sorted(self.conn.execute(query), key=repr),
+                             sorted(self.conn.execute(expected[table]), key=repr), table)
+        for question_number in SUMMARY_QUERIES:
+            self.assertEqual(
+                get_genes_data(self.conn, question_number, SUMMARY_QUERIES[question_number]),
+                get_genes_data(self.conn, question_number, TABLE_QUERIES[question_number]))
+
+    def test_insert_delete_update(self):
+        """
+        Checks the counts after inserting, deleting and updating rows, including NULL gene
+        types and counts dropping to zero.
+        """
+        self.assertTrue(has_summary_tables(self.conn))
+        self.assert_counts()
+        self.conn.execute("INSERT INTO genes (GeneID, tax_id, type_of_gene) "
+                          "VALUES (6, 9606, NULL), (7, 4932, 'tRNA')")
+        self.assert_counts()
+        self.conn.execute("DELETE FROM genes WHERE GeneID IN (5, 7)")
+        self.assert_counts()
+        self.conn.execute("UPDATE genes SET tax_id = 9606, type_of_gene = 'ncRNA' "
+                          "WHERE GeneID = 4")
+        self.assert_counts()
+        self.conn.execute("UPDATE genes SET type_of_gene = NULL WHERE tax_id = 9606")
+        self.assert_counts()
+
+    def test_replace(self):
+        """
+        Checks that rows replaced by INSERT OR REPLACE or UPDATE OR REPLACE are taken off the
+        counts, and that ignored or failing inserts do not change them.
+        """
+        self.conn.execute("INSERT OR REPLACE INTO genes (GeneID, tax_id, type_of_gene) "
+                          "VALUES (1, 10090, 'ncRNA')")
+        self.assert_counts()
+        self.conn.execute("REPLACE INTO genes (GeneID, tax_id, type_of_gene) "
+                          "VALUES (5, 7227, 'pseudo'), (8, 7227, 'pseudo')")
+        self.assert_counts()
+        self.conn.execute("INSERT OR IGNORE INTO genes (GeneID, tax_id, type_of_gene) "
+                          "VALUES (2, 4932, 'tRNA')")
+        self.assert_counts()
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("INSERT INTO genes (GeneID, tax_id, type_of_gene) "
+                              "VALUES (3, 4932, 'tRNA')")
+        self.assert_counts()
+        self.conn.execute("UPDATE OR REPLACE genes SET GeneID = 3 WHERE GeneID = 4")
+        self.assert_counts()
+        self.conn.execute("INSERT INTO genes (tax_id, type_of_gene) VALUES (9606, 'tRNA')")
+        self.assert_counts()
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM replaced_genes").fetchone()[0],
+                         0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+"""
+This module runs the parsing and GC content computation of large uploads as background jobs,
+so the Streamlit script run does not block while a big file is processed.
+
+Jobs are executed on a worker pool shared by all sessions and registered by the session and
+the hash of the uploaded bytes, so a job keeps running across reruns of its session, and
+cancelling it does not affect other sessions processing the same file. Results are published
+in batches, every PUBLISH_BYTES of parsed input or PUBLISH_INTERVAL seconds, whichever comes
+first, and cancellation is checked after every record. Gzipped uploads report the progress of
+their decompression as the first DECOMPRESS_SHARE of the job.
+
+Classes:
+    UploadJob: Parses an upload in the background and collects its records in batches.
+
+Functions:
+    get_executor(): Returns the worker pool shared by all sessions.
+    get_job_registry(): Returns the registry of jobs shared by all sessions.
+    get_or_start_job(session_id, digest, data): Returns the job of a session for an upload,
+    starting it if necessary.
+    discard_job(session_id, digest): Removes a job from the registry, e.g. to restart a
+    cancelled job.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from fasta_class import iter_upload_records
+from fasta_stream import GZIP_MAGIC
+from timing import span
+
+JOB_WORKERS = 2
+# A batch of records is published after this many bytes of the upload or this many seconds
+PUBLISH_BYTES = 4 * 1024 * 1024
+PUBLISH_INTERVAL = 0.5
+# Share of the progress bar taken by decompressing a gzipped upload before it is parsed
+DECOMPRESS_SHARE = 0.5
+# Number of finished jobs kept in the registry, the oldest ones are dropped first
+FINISHED_JOBS_KEPT = 8
+
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class UploadJob:
+    """
+    Parses an uploaded FASTA file and computes the base counts of its records in the background.
+
+    Attributes:
+        digest (str): The SHA-256 hash of the uploaded bytes.
+        size (int): The size of the upload in bytes.
+        state (str): One of RUNNING, DONE, CANCELLED or FAILED.
+        error (Exception or None): The exception that made the job fail.
+
+    Methods:
+        run(data): Processes the upload, called on a worker thread.
+        cancel(): Asks the job to stop after the current record.
+        snapshot(): Returns the records processed so far and the progress.
+    """
+    def __init__(self, digest, size):
+        self.digest = digest
+        self.size = size
+        self.state = RUNNING
+        self.error = None
+        self._entries = []
+        self._fraction = 0.0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def run(self, data):
+        """
+        Parses the upload and publishes its records in batches, every PUBLISH_BYTES of the 
+        upload or PUBLISH_INTERVAL seconds. The duration of the whole job is logged as the 
+        'background_job' stage.
+
+        Args:
+            data (bytes): The content of the uploaded file.
+        """
+        batch = []
+        fraction = 0.0
+        offset = DECOMPRESS_SHARE if data[:2] == GZIP_MAGIC else 0.0
+        published_at = time.monotonic()
+        published_end = 0
+        job_span = span("background_job", source="file", bytes=self.size)
+        try:
+            with job_span:
+                for entry in iter_upload_records(data, self._cancelled, self._decompressed):
+                    if self._cancelled.is_set():
+                        break
+                    _ = entry.composition  # Count the bases on the worker thread
+                    batch.append(entry)
+                    fraction = offset + (1.0 - offset) * entry.end / len(entry.buffer)
+                    now = time.monotonic()
+                    if (entry.end - published_end >= PUBLISH_BYTES
+                            or now - published_at >= PUBLISH_INTERVAL):
+                        self._publish(batch, fraction)
+                        batch = []
+                        published_at = now
+                        published_end = entry.end
+                if self._cancelled.is_set():
+                    self._publish(batch, fraction)
+                    self.state = CANCELLED
+                    job_span.set(records=len(self._entries), cancelled=True)
+                    return
+                self._publish(batch, 1.0)
+                self.state = DONE
+                job_span.set(records=len(self._entries))
+        except Exception as e:
+            logging.error("Error - Background job for upload %s failed: %s", self.digest, e)
+            self.error = e
+            self.state = FAILED
+
+    def _decompressed(self, fraction):
+        self._publish([], fraction * DECOMPRESS_SHARE)
+
+    def _publish(self, batch, fraction):
+        with self._lock:
+            self._entries.extend(batch)
+            self._fraction = fraction
+
+    def cancel(self):
+        """
+        Asks the job to stop after the current record. Records processed so far are kept.
+        """
+        self._cancelled.set()
+
+    def snapshot(self):
+        """
+        Returns the records processed so far and the progress of the job.
+
+        Returns:
+            tuple: A copy of the list of records and the processed fraction of the upload.
+        """
+        with self._lock:
+            return list(self._entries), min(self._fraction, 1.0)
+
+
+@st.cache_resource
+def get_executor():
+    """
+    Returns the worker pool executing the jobs, shared by all sessions.
+
+    Returns:
+        ThreadPoolExecutor: The worker pool.
+    """
+    return ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="gc-job")
+
+
+@st.cache_resource
+def get_job_registry():
+    """
+    Returns the registry of jobs, shared by all sessions and kept across reruns.
+
+    Returns:
+        tuple: A dict of jobs by session id and upload hash, and the lock guarding it.
+    """
+    return {}, threading.Lock()
+
+
+def get_or_start_job(session_id, digest, data):
+    """
+    Returns the job processing an upload for a session, starting a new job if there is none yet.
+
+    Args:
+        session_id (str): The id of the session that uploaded the file.
+        digest (str): The SHA-256 hash of the uploaded bytes.
+        data (bytes): The content of the uploaded file.
+
+    Returns:
+        UploadJob: The running or finished job for the upload.
+    """
+    jobs, lock = get_job_registry()
+    with lock:
+        key = (session_id, digest)
+        job = jobs.get(key)
+        if job is None:
+            finished = [key for key, other in jobs.items() if other.state != RUNNING]
+            for key in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT + 1)]:
+                del jobs[key]
+            job = UploadJob(digest, len(data))
+            jobs[key] = job
+            get_executor().submit(job.run, data)
+        return job
+
+
+def discard_job(session_id, digest):
+    """
+    Removes the job of a session from the registry, so the next request for the upload starts a 
+    new job. Jobs of other sessions for the same upload are not affected.
+
+    Args:
+        session_id (str): The id of the session that uploaded the file.
+        digest (str): The SHA-256 hash of the uploaded bytes.
+    """
+    jobs, lock = get_job_registry()
+    with lock:
+        job = jobs.pop((session_id, digest), None)
+    if job is not None:
+        job.cancel()
@@ -0,0 +1,304 @@
+"""
+Benchmark suite for the GC content pipeline of the command line tool and the Streamlit app.
+
+Synthetic FASTA files are generated deterministically from a seed in several scenarios and
+scales. For each of the exercise_3, file_upload and text_upload paths, parsing, validation,
+GC computation and the preparation of the output are timed separately, and the throughput and
+the peak memory of the whole path are reported. Results can be saved as a baseline, and later
+runs are compared against it.
+
+Functions:
+    generate_fasta(scenario, scale, seed): Generates a synthetic FASTA file as bytes.
+    run_exercise_3(data, file_path): Runs the stages of the command line path.
+    run_file_upload(data, file_path): Runs the stages of the file upload path.
+    run_text_upload(data, file_path): Runs the stages of the text input path.
+    measure(path, data, file_path, repeat): Times the stages of a path and its peak memory.
+    run_benchmarks(scenarios, scale, repeat): Runs all paths on all scenarios.
+    compare_to_baseline(results, baseline): Adds the change against a baseline to results.
+    print_report(results): Prints the results as a table.
+    main(): Runs the benchmarks from the command line and prints a report.
+
+Usage:
+    python benchmark_gc.py [--scale=small|medium|large] [--scenarios=huge,tiny,...]
+    [--repeat=N] [--baseline=PATH] [--save-baseline]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from exercise_3 import valid_entry, count_gc
+from fasta_parser import parse_fasta_file, parse_fasta_text
+from fasta_class import iter_upload_records
+from gc_content import build_results_table, is_valid_record
+
+# Approximate size of the generated files in bytes
+SCALES = {"small": 2 * 1024 * 1024, "medium": 20 * 1024 * 1024, "large": 100 * 1024 * 1024}
+SCENARIOS = ["huge", "tiny", "mixed_case", "n_rich"]
+STAGES = ["parse", "validate", "gc", "render"]
+LINE_WIDTH = 70
+DEFAULT_SEED = 42
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+def generate_fasta(scenario, scale="small", seed=DEFAULT_SEED):
+    """
+    Generates a synthetic FASTA file, always the same one for the same arguments.
+
+    Args:
+        scenario (str): 'huge' for four huge records, 'tiny' for many records of 50 to 250
+        bases, 'mixed_case' for records with about half of the bases in lowercase and
+        'n_rich' for records with runs of N covering about a third of the bases.
+        scale (str): One of the keys of SCALES, the approximate size of the file.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        bytes: The FASTA file with sequence lines of LINE_WIDTH bases.
+
+    Raises:
+        ValueError: If the scenario or scale is unknown.
+    """
+    if scenario not in SCENARIOS or scale not in SCALES:
+        raise ValueError(f"Unknown scenario or scale: {scenario}, {scale}")
+    rng = np.random.default_rng(seed)
+    total = SCALES[scale]
+    if scenario == "huge":
+        lengths = np.full(4, total // 4)
+    elif scenario == "tiny":
+        lengths = rng.integers(50, 251, size=total // 150)
+    else:
+        lengths = rng.integers(1000, 50001, size=max(1, total // 25500))
+
+    bases = np.frombuffer(b"ACGT", dtype=np.uint8)[rng.integers(0, 4, size=int(lengths.sum()))]
+    if scenario == "mixed_case":
+        bases[rng.random(len(bases)) < 0.5] += ord("a") - ord("A")
+    elif scenario == "n_rich":
+        runs = rng.random(len(bases) // 100 + 1) < 0.33
+        bases[np.repeat(runs, 100)[:len(bases)]] = ord("N")
+
+    parts = []
+    offset = 0
+    for number, length in enumerate(lengths):
+        parts.append(f">{scenario}_{number} synthetic length={length}\n".encode())
+        parts.append(_wrap(bases[offset:offset + length]))
+        offset += length
+    return b"".join(parts)
+
+
+def _wrap(seq):
+    # Inserts a line break after every LINE_WIDTH bases and at the end
+    full = len(seq) // LINE_WIDTH * LINE_WIDTH
+    lines = np.empty((full // LINE_WIDTH, LINE_WIDTH + 1), dtype=np.uint8)
+    lines[:, :LINE_WIDTH] = seq[:full].reshape(-1, LINE_WIDTH)
+    lines[:, LINE_WIDTH] = ord("\n")
+    rest = seq[full:].tobytes()
+    return lines.tobytes() + (rest + b"\n" if rest else b"")
+
+
+def run_exercise_3(data, file_path):
+    """
+    Runs the stages of the command line path: validate_fasta_file and process_valid_entries.
+
+    Args:
+        data (bytes): The FASTA file.
+        file_path (str): The path to the same FASTA file on disk.
+
+    Yields:
+        tuple: The name of a stage and its result, after the stage has run.
+    """
+    entries = list(parse_fasta_file(file_path, False))
+    yield "parse", entries
+    valid = [entry for entry in entries if valid_entry(entry)]
+    yield "validate", valid
+    gc = [count_gc(entry.seq) for entry in valid]
+    yield "gc", gc
+    lines = [f"Entry ID: {entry.id}\nGC Content Percentage: {value * 100:.10f}%\n"
+             for entry, value in zip(valid, gc)]
+    yield "render", lines
+
+
+def run_file_upload(data, file_path):
+    """
+    Runs the stages of the file upload path like the app: the parsing and the counting of the 
+    bases done by parse_fasta_upload, the validity check of the results table and 
+    build_results_table, which display_results_from_file renders.
+
+    Args:
+        data (bytes): The FASTA file.
+        file_path (str): The path to the same FASTA file on disk.
+
+    Yields:
+        tuple: The name of a stage and its result, after the stage has run.
+    """
+    entries = list(iter_upload_records(data))
+    yield "parse", entries
+    compositions = [entry.composition for entry in entries]
+    yield "gc", compositions
+    valid = [entry for entry in entries if is_valid_record(entry)]
+    yield "validate", valid
+    yield "render", build_results_table(entries)
+
+
+def run_text_upload(data, file_path):
+    """
+    Runs the stages of the text input path: parse_fasta_from_string, check_entry and
+    build_results_table.
+
+    Args:
+        data (bytes): The FASTA file.
+        file_path (str): The path to the same FASTA file on disk.
+
+    Yields:
+        tuple: The name of a stage and its result, after the stage has run.
+    """
+    entries = parse_fasta_text(data.decode("utf-8"), False)
+    yield "parse", entries
+    valid = [entry for entry in entries if valid_entry(entry)]
+    yield "validate", valid
+    compositions = [entry.composition for entry in entries]
+    yield "gc", compositions
+    yield "render", build_results_table(entries)
+
+
+PATHS = {"exercise_3": run_exercise_3, "file_upload": run_file_upload,
+         "text_upload": run_text_upload}
+
+
+def measure(path, data, file_path, repeat=3):
+    """
+    Times the stages of a path and measures the peak memory of the whole path.
+
+    Args:
+        path (function): One of the run functions, e.g. run_exercise_3.
+        data (bytes): The FASTA file.
+        file_path (str): The path to the same FASTA file on disk.
+        repeat (int): Number of runs, the fastest time of each stage is kept.
+
+    Returns:
+        dict: The seconds per stage, the number of records and the peak memory in bytes
+        allocated by the path, measured in a separate run with tracemalloc.
+    """
+    seconds = {stage: float("inf") for stage in STAGES}
+    records = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for stage, result in path(data, file_path):
+            now = time.perf_counter()
+            seconds[stage] = min(seconds[stage], now - start)
+            if stage == "parse":
+                records = len(result)
+            start = time.perf_counter()
+
+    tracemalloc.start()
+    for _ in path(data, file_path):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "records": records, "peak_bytes": peak}
+
+
+def run_benchmarks(scenarios=SCENARIOS, scale="small", repeat=3):
+    """
+    Runs all paths on the generated file of each scenario.
+
+    Args:
+        scenarios (list): The scenarios to run.
+        scale (str): The scale of the generated files.
+        repeat (int): Number of timed runs per path.
+
+    Returns:
+        dict: Results by '<scenario>/<path>' key, each with the size of the file in bytes,
+        the seconds per stage, the number of records, the throughput and the peak memory.
+    """
+    results = {}
+    for scenario in scenarios:
+        data = generate_fasta(scenario, scale)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, f"{scenario}.fa")
+            with open(file_path, "wb") as handle:
+                handle.write(data)
+            for name, path in PATHS.items():
+                result = measure(path, data, file_path, repeat)
+                total = sum(result["seconds"].values())
+                result["bytes"] = len(data)
+                result["mb_per_s"] = len(data) / 1e6 / total
+                result["records_per_s"] = result["records"] / total
+                results[f"{scenario}/{name}"] = result
+    return results
+
+
+def compare_to_baseline(results, baseline):
+    """
+    Adds the relative change of the total time against a baseline to each result.
+
+    Args:
+        results (dict): The results of run_benchmarks.
+        baseline (dict): Earlier results of run_benchmarks at the same scale.
+
+    Returns:
+        dict: The results, each with a 'change' value, e.g. -0.25 if it got 25 % faster, or
+        None if the baseline has no result for it.
+    """
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            result["change"] = None
+        else:
+            result["change"] = (sum(result["seconds"].values())
+                                / sum(old["seconds"].values()) - 1)
+    return results
+
+
+def print_report(results):
+    """
+    Prints the results as a table, including the change against the baseline if available.
+
+    Args:
+        results (dict): The results of run_benchmarks.
+    """
+    header = (f"{'Benchmark':<26}" + "".join(f"{stage + ' (s)':>13}" for stage in STAGES)
+              + f"{'MB/s':>9}{'records/s':>12}{'peak MB':>9}{'change':>9}")
+    print(header)
+    for key, result in results.items():
+        change = result.get("change")
+        print(f"{key:<26}"
+              + "".join(f"{result['seconds'][stage]:>13.4f}" for stage in STAGES)
+              + f"{result['mb_per_s']:>9.1f}{result['records_per_s']:>12.0f}"
+              + f"{result['peak_bytes'] / 1e6:>9.1f}"
+              + (f"{change:>+9.1%}" if change is not None else f"{'-':>9}"))
+
+
+def main():
+    """
+    Runs the benchmarks with the options given on the command line and prints a report.
+    The results are compared against the baseline file if it exists for the same scale, and
+    saved as the new baseline with --save-baseline.
+    """
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    scale = options.get("scale") or "small"
+    scenarios = options["scenarios"].split(",") if options.get("scenarios") else SCENARIOS
+    repeat = int(options.get("repeat") or 3)
+    baseline_path = options.get("baseline") or DEFAULT_BASELINE
+
+    results = run_benchmarks(scenarios, scale, repeat)
+    baselines = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r", encoding="utf-8") as handle:
+            baselines = json.load(handle)
+    compare_to_baseline(results, baselines.get(scale, {}))
+    print(f"Scale: {scale}, best of {repeat} runs")
+    print_report(results)
+
+    if "save-baseline" in options:
+        baselines[scale] = {key: {name: value for name, value in result.items()
+                                  if name != "change"} for key, result in results.items()}
+        with open(baseline_path, "w", encoding="utf-8") as handle:
+            json.dump(baselines, handle, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Provides the nucleotide composition engine shared by the GC content calculations of the
+command line tool and the Streamlit app.
+
+A sequence is counted in a single pass over its bytes: NumPy builds a histogram of all 256 byte
+values, from which the counts of A, C, G, T, N, lowercase letters and other characters are
+derived. Sliding-window GC and GC-skew profiles are computed in linear time from cumulative
+sums, independent of the window size. Both work through the bytes in chunks of COUNT_CHUNK_SIZE,
+so their temporary arrays do not grow with the length of the sequence.
+
+Classes:
+    Composition: Base counts of a sequence.
+
+Functions:
+    as_bytes(seq): Converts a str, Bio.Seq or bytes-like sequence to bytes.
+    count_composition(seq, ignore_whitespace): Counts the bases of a sequence in one pass.
+    gc_fraction(seq): Returns the GC content of a sequence as a decimal.
+    composition_gc_fraction(composition): Returns the GC content from already counted bases.
+    gc_profile(seq, window, step): Computes GC content and GC skew in sliding windows.
+"""
+
+from collections import namedtuple
+import numpy as np
+
+Composition = namedtuple(
+    "Composition", ["a", "c", "g", "t", "n", "lowercase", "other", "length"])
+
+# Number of bytes counted at a time, NumPy widens each chunk to 8-byte integers while counting
+COUNT_CHUNK_SIZE = 1024 * 1024
+
+_IS_G = np.zeros(256, dtype=bool)
+_IS_G[list(b"Gg")] = True
+_IS_C = np.zeros(256, dtype=bool)
+_IS_C[list(b"Cc")] = True
+
+
+def as_bytes(seq):
+    """
+    Converts a sequence to bytes without copying it if it already is bytes-like.
+
+    Args:
+        seq (str, Bio.Seq, bytes, bytearray or memoryview): The sequence.
+
+    Returns:
+        bytes-like: The sequence as bytes.
+    """
+    if isinstance(seq, (bytes, bytearray, memoryview)):
+        return seq
+    if isinstance(seq, str):
+        return seq.encode("utf-8")
+    try:
+        return bytes(seq)
+    except TypeError:
+        return str(seq).encode("utf-8")
+
+
+def count_composition(seq, ignore_whitespace=False):
+    """
+    Counts the bases of a sequence in a single pass over its bytes.
+
+    Args:
+        seq (str, Bio.Seq or bytes-like): The sequence.
+        ignore_whitespace (bool): Leave spaces, tabs and line breaks out of the counts, so
+        the raw lines of a FASTA entry can be counted without joining them first.
+
+    Returns:
+        Composition: The counts of A, C, G, T and N in either case, of lowercase letters,
+        of all other characters and the total length.
+    """
+    data = np.frombuffer(as_bytes(seq), dtype=np.uint8)
+    histogram = np.zeros(256, dtype=np.int64)
+    for start in range(0, len(data), COUNT_CHUNK_SIZE):
+        histogram += np.bincount(data[start:start + COUNT_CHUNK_SIZE], minlength=256)
+
+    def count(letter):
+        return int(histogram[ord(letter)] + histogram[ord(letter.lower())])
+
+    a, c, g, t, n = (count(letter) for letter in "ACGTN")
+    lowercase = int(histogram[ord("a"):ord("z") + 1].sum())
+    length = len(data)
+    if ignore_whitespace:
+        length -= int(histogram[list(b" \t\r\n")].sum())
+    return Composition(a, c, g, t, n, lowercase, length - a - c - g - t - n, length)
+
+
+def gc_fraction(seq):
+    """
+    Returns the GC content of a sequence.
+
+    Args:
+        seq (str, Bio.Seq or bytes-like): The sequence.
+
+    Returns:
+        float: The number of G and C bases in either case divided by the sequence length,
+        or 0 if the sequence is empty.
+    """
+    return composition_gc_fraction(count_composition(seq))
+
+
+def composition_gc_fraction(composition):
+    """
+    Returns the GC content from already counted bases.
+
+    Args:
+        composition (Composition): The base counts of a sequence.
+
+    Returns:
+        float: The GC content as a decimal, or 0 if the sequence is empty.
+    """
+    if not composition.length:
+        return 0
+    return (composition.g + composition.c) / composition.length
+
+
+def gc_profile(seq, window, step=1):
+    """
+    Computes the GC content and GC skew (G - C) / (G + C) in sliding windows.
+
+    Args:
+        seq (str, Bio.Seq or bytes-like): The sequence.
+        window (int): Number of bases per window.
+        step (int): Distance between the starts of two consecutive windows.
+
+    Returns:
+        tuple: Three NumPy arrays with the start position, the GC content and the GC skew
+        of every window. A window without G or C has a skew of 0. Sequences shorter than
+        the window give empty arrays.
+
+    Raises:
+        ValueError: If window or step is smaller than 1.
+    """
+    if window < 1 or step < 1:
+        raise ValueError("Window and step must be at least 1.")
+    data = np.frombuffer(as_bytes(seq), dtype=np.uint8)
+    if len(data) < window:
+        empty = np.zeros(0)
+        return np.zeros(0, dtype=np.int64), empty, empty
+
+    starts = np.arange(0, len(data) - window + 1, step)
+    g_sums = _window_sums(data, _IS_G, starts, window)
+    c_sums = _window_sums(data, _IS_C, starts, window)
+    gc_sums = g_sums + c_sums
+    skew = np.divide(g_sums - c_sums, gc_sums, out=np.zeros(len(starts)), where=gc_sums > 0)
+    return starts, gc_sums / window, skew
+
+
+def _window_sums(data, table, starts, window):
+    # Number of bytes marked in the table per window
+    return _prefix_counts(data, table, starts + window) - _prefix_counts(data, table, starts)
+
+
+def _prefix_counts(data, table, positions):
+    # Number of marked bytes in data[:position] for every position of a sorted array, from
+    # cumulative sums of one chunk at a time instead of the whole sequence
+    counts = np.zeros(len(positions), dtype=np.int64)
+    total = 0
+    done = np.searchsorted(positions, 0, side="right")
+    for start in range(0, len(data), COUNT_CHUNK_SIZE):
+        cumulative = np.cumsum(table[data[start:start + COUNT_CHUNK_SIZE]], dtype=np.int64)
+        end = np.searchsorted(positions, start + len(cumulative), side="right")
+        counts[done:end] = total + cumulative[positions[done:end] - start - 1]
+        total += int(cumulative[-1])
+        done = end
+    return counts
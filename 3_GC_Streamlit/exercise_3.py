@@ -2,8 +2,8 @@
 Provides functionality for validating FASTA files to ensure entries are correct and complete.
 
 Handles command line input for specifying the FASTA file path, checks for file validity, 
-parses FASTA entries using Biopython, separates entries into valid and invalid categories 
-based on presence of essential data fields. The module provides detailed output on the validity of 
+parses FASTA entries with the built-in parser (or Biopython with --biopython), separates 
+entries into valid and invalid categories based on presence of essential data fields. The module provides detailed output on the validity of 
 entries, including specific error handling for common file and entry issues.
 
 Classes:
@@ -13,19 +13,33 @@ Classes:
 Functions:
     main(): Orchestrates the file checking and validation process.
     check_filename(): Checks for proper command line input and file existence.
+    get_options(): Returns the options given on the command line.
     is_file_readable_and_not_empty(file_path): Verifies if the file is readable and not empty.
-    validate_fasta_file(file_path): Parses the FASTA file and categorizes entries.
+    validate_fasta_file(file_path, use_biopython): Parses the FASTA file and categorizes entries.
     valid_entry(entry): Checks if an entry has both an ID and a sequence.
     output(valid_entries, invalid_entries): Manages the output of validation results.
     process_valid_entries(valid_entries): Processes and displays information for valid entries.
     count_gc(seq): Calculates the GC content percentage of a sequence.
     process_invalid_entries(invalid_entries): Processes and displays information for 
     nvalid entries.
+    stream_output(file_path, chunk_size, workers): Validates entries and outputs their GC 
+    content one at a time, without keeping the sequences in memory.
+    get_workers(): Returns the number of worker processes requested on the command line.
+    get_selected_ids(): Returns the entry IDs requested with --ids on the command line.
+    output_selected(file_path, entry_ids): Outputs the GC content of selected entries using 
+    the offset index of the file.
+
+Usage:
+    python exercise_3.py [--stream] [--parallel] [--workers=N] [--ids=ID1,ID2] [--biopython] 
+    FILENAME
+
+Only the modules needed by the selected mode are imported, e.g. NumPy is not loaded for 
+--stream, and Biopython only with --biopython.
 """
 
 import sys
 import os
-from Bio import SeqIO
+from fasta_stream import iter_gc_counts, parallel_gc_counts, DEFAULT_CHUNK_SIZE
 
 # Exception classes for error handling
 class InvalidEntryIDError(Exception):
@@ -57,11 +71,24 @@ def main():
     Main function that runs the validation process for a FASTA file provided via command
     line argument.
     Handles exceptions and coordinates the output of validation results.
+    With the --stream option the entries are processed one at a time instead, with the 
+    --parallel or --workers=N option they are processed by a pool of worker processes. With 
+    the --ids=ID1,ID2 option only the given entries are read, using the offset index.
     """
     file_path = check_filename()
     try:
-        valid_entries, invalid_entries = validate_fasta_file(file_path)
-        output(valid_entries, invalid_entries)
+        workers = get_workers()
+        selected_ids = get_selected_ids()
+        if selected_ids:
+            output_selected(file_path, selected_ids)
+        elif workers:
+            stream_output(file_path, workers=workers)
+        elif '--stream' in get_options():
+            stream_output(file_path)
+        else:
+            use_biopython = True if '--biopython' in get_options() else None
+            valid_entries, invalid_entries = validate_fasta_file(file_path, use_biopython)
+            output(valid_entries, invalid_entries)
     except Exception as e:
         print(f"An error occurred: {e}")
 
@@ -73,14 +100,58 @@ def check_filename():
     Returns:
     str: Valid file path input from the command line.
     """
-    if len(sys.argv) != 2:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) != 1:
         print("Please enter it in the format like this: python exercise_1.py FILENAME")
         sys.exit(1)
-    file_path = sys.argv[1]
+    file_path = args[0]
     if not is_file_readable_and_not_empty(file_path):
         sys.exit(1)
     return file_path
 
+def get_options():
+    """
+    Returns the options given on the command line, i.e. all arguments starting with '--'.
+
+    Returns:
+    list: The options in the order they were given.
+    """
+    return [arg for arg in sys.argv[1:] if arg.startswith('--')]
+
+def get_workers():
+    """
+    Returns the number of worker processes requested with --workers=N, or the number of CPUs 
+    if only --parallel is given.
+
+    Returns:
+    int: The number of worker processes, or 0 if the entries should be processed serially.
+
+    Raises:
+    ValueError: If N is not a positive number.
+    """
+    workers = 0
+    for option in get_options():
+        if option == '--parallel':
+            workers = workers or os.cpu_count() or 1
+        elif option.startswith('--workers='):
+            workers = int(option.split('=', 1)[1])
+            if workers < 1:
+                raise ValueError("The number of workers must be at least 1.")
+    return workers
+
+def get_selected_ids():
+    """
+    Returns the entry IDs requested with --ids=ID1,ID2.
+
+    Returns:
+    list: The requested entry IDs, empty if all entries should be processed.
+    """
+    selected_ids = []
+    for option in get_options():
+        if option.startswith('--ids='):
+            selected_ids.extend(entry_id for entry_id in option[6:].split(',') if entry_id)
+    return selected_ids
+
 def is_file_readable_and_not_empty(file_path):
     """
     Checks if the file exists, is not empty, and is readable.
@@ -102,20 +173,23 @@ def is_file_readable_and_not_empty(file_path):
         print(f"Error: The file '{file_path}' does not exist or is empty.")
         return False
 
-def validate_fasta_file(file_path):
+def validate_fasta_file(file_path, use_biopython=None):
     """
     Parses the FASTA file, validating each entry to determine if it's correctly 
     formatted and complete.
 
     Args:
     file_path (str): The path to the FASTA file.
+    use_biopython (bool, optional): Parse with Biopython instead of the built-in parser. By 
+    default the FASTA_PARSER environment variable decides.
 
     Returns:
     tuple: Two lists containing valid and invalid entries respectively.
     """
+    from fasta_parser import parse_fasta_file
     valid_entries = []
     invalid_entries = []
-    for record in SeqIO.parse(file_path, "fasta"):
+    for record in parse_fasta_file(file_path, use_biopython):
         if valid_entry(record):
             valid_entries.append(record)
         else:
@@ -127,7 +201,7 @@ def valid_entry(entry):
     Validates an individual FASTA entry to ensure it has both an ID and a non-empty sequence.
 
     Args:
-    entry (SeqRecord): The FASTA entry to validate.
+    entry (FastaRecord or SeqRecord): The FASTA entry to validate.
 
     Returns:
     bool: True if the entry is valid, False otherwise.
@@ -142,8 +216,8 @@ def output(valid_entries, invalid_entries):
     Manages the output of validation results by processing both valid and invalid FASTA entries.
 
     Args:
-    valid_entries (list): A list of valid SeqRecord objects.
-    invalid_entries (list): A list of invalid SeqRecord objects.
+    valid_entries (list): A list of valid FastaRecord or SeqRecord objects.
+    invalid_entries (list): A list of invalid FastaRecord or SeqRecord objects.
     """
     process_valid_entries(valid_entries)
     process_invalid_entries(invalid_entries)
@@ -153,7 +227,7 @@ def process_valid_entries(valid_entries):
     Outputs details for valid FASTA entries including GC content and entry count.
 
     Args:
-    valid_entries (list): A list of valid SeqRecord objects.
+    valid_entries (list): A list of valid FastaRecord or SeqRecord objects.
     """
     for entry in valid_entries:
         print(f"Entry ID: {entry.id}")
@@ -169,21 +243,84 @@ def count_gc(seq):
 
     Returns:
     float: The GC content percentage of the sequence.
+
+    Uses the shared composition engine, which counts the sequence in a single pass.
     """
-    gc = sum(seq.upper().count(x) for x in ['G', 'C'])
-    return gc / len(seq) if seq else 0
+    from composition import gc_fraction
+    return gc_fraction(seq)
 
 def process_invalid_entries(invalid_entries):
     """
     Outputs details for invalid FASTA entries and the total count of such entries.
 
     Args:
-    invalid_entries (list): A list of invalid SeqRecord objects.
+    invalid_entries (list): A list of invalid FastaRecord or SeqRecord objects.
     """
     for entry in invalid_entries:
         print(f"Invalid FASTA entry found: {entry.id}")
     if invalid_entries:
         print(f"Total invalid entries: {len(invalid_entries)}")
 
+def stream_output(file_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Validates the entries of a FASTA file and outputs their GC content one entry at a time.
+
+    Args:
+    file_path (str): The path to the FASTA file.
+    chunk_size (int): Maximum number of bytes of the file held in memory at a time.
+    workers (int, optional): Number of worker processes computing the GC content. By default 
+    the file is processed serially in this process.
+
+    The output is the same as the one of output(), but an entry is dropped as soon as its 
+    result is printed, so only the IDs of invalid entries are kept until the end.
+    """
+    valid_count = 0
+    invalid_ids = []
+    with open(file_path, 'rb') as handle:
+        if workers:
+            gc_counts = parallel_gc_counts(file_path, workers, chunk_size)
+        else:
+            gc_counts = iter_gc_counts(handle, chunk_size)
+        for entry_id, gc, length in gc_counts:
+            if entry_id and length:
+                print(f"Entry ID: {entry_id}")
+                print(f"GC Content Percentage: {gc / length * 100:.10f}%\n")
+                valid_count += 1
+            else:
+                invalid_ids.append(entry_id)
+    print(f"Total valid entries: {valid_count} \n")
+    for entry_id in invalid_ids:
+        print(f"Invalid FASTA entry found: {entry_id}")
+    if invalid_ids:
+        print(f"Total invalid entries: {len(invalid_ids)}")
+
+def output_selected(file_path, entry_ids):
+    """
+    Outputs the GC content of selected entries, reading only these entries from the file.
+
+    Args:
+    file_path (str): The path to the FASTA file.
+    entry_ids (list): The IDs of the entries to output.
+
+    The offset index of the file is built on first use and saved next to the file, so later 
+    calls for the same unchanged file do not scan it again.
+    """
+    from fasta_index import load_or_build_index
+    index = load_or_build_index(file_path)
+    found = 0
+    for entry_id in entry_ids:
+        if entry_id not in index:
+            print(f"Entry ID not found: {entry_id}\n")
+        # Every entry with a repeated ID is output, like when the whole file is processed
+        for occurrence in range(index.count(entry_id)):
+            if index.length(entry_id, occurrence) == 0:
+                print(f"Invalid FASTA entry found: {entry_id}\n")
+            else:
+                print(f"Entry ID: {entry_id}")
+                print(f"GC Content Percentage: "
+                      f"{index.gc_content(entry_id, occurrence) * 100:.10f}%\n")
+                found += 1
+    print(f"Total valid entries: {found} \n")
+
 if __name__ == "__main__":
     main()
@@ -1,28 +1,152 @@
 """
-This module defines the FastaRecord class, which is used for representing and handling 
-FASTA record data. It provides a structured way to store sequence data and associated identifiers 
+This module defines the FastaRecord class, which is used for representing and handling
+FASTA record data. It provides a structured way to store sequence data and associated identifiers
 from FASTA formatted files.
+
+Both record classes use __slots__ instead of a per-instance __dict__, store the sequence as bytes
+instead of a Python string and count the bases of the sequence only once.
+
+Classes:
+    FastaRecord: A FASTA record holding its sequence as bytes or as a view into a buffer.
+    LazyFastaRecord: A FASTA record that only keeps the offsets of its sequence in a buffer.
+
+Functions:
+    iter_upload_records(data, cancelled, progress): Yields the records of a plain or gzipped 
+    upload.
 """
 
+from composition import as_bytes, count_composition, composition_gc_fraction
+from fasta_stream import SEQUENCE_WHITESPACE, iter_fasta_offsets, decompress_upload, GZIP_MAGIC
+
 class FastaRecord:
     """
     Class to encapsulate a FASTA record's data.
 
     Attributes:
         id (str): The identifier of the FASTA record, typically describing the sequence.
-        seq (str): The nucleotide or amino acid sequence of the FASTA record.
+        seq (str): The nucleotide or amino acid sequence of the FASTA record, decoded on access.
+        seq_bytes (bytes-like): The sequence as stored, bytes or a memoryview into a buffer.
+        composition (Composition): The base counts of the sequence, counted on first access.
+        gc (float): The GC content of the sequence as a decimal.
 
-    This class provides a way to manage sequence data in a structured format, making it easier 
+    This class provides a way to manage sequence data in a structured format, making it easier
     to handle and process FASTA file data within bioinformatics applications.
     """
-    def __init__(self, id, seq):
+    __slots__ = ("id", "_seq", "_composition")
+
+    def __init__(self, id, seq, composition=None):
         """"
         Initializes a new FastaRecord with a specific ID and sequence.
 
         Args:
             id (str): The identifier of the FASTA record.
-            seq (str or Bio.Seq): The sequence of the FASTA record, which will be stored as a 
-            string.
+            seq (str, Bio.Seq or bytes-like): The sequence of the FASTA record. Bytes-like
+            sequences, e.g. a memoryview into an uploaded file, are stored without a copy.
+            composition (Composition, optional): The precomputed base counts of the sequence.
         """
         self.id = id
-        self.seq = str(seq)
+        self._seq = as_bytes(seq)
+        self._composition = composition
+
+    @property
+    def seq(self):
+        """The sequence decoded to a string."""
+        return str(self._seq, "utf-8")
+
+    @property
+    def seq_bytes(self):
+        """The sequence as stored, without a copy."""
+        return self._seq
+
+    @property
+    def composition(self):
+        """The base counts of the sequence, computed on first access and then kept."""
+        if self._composition is None:
+            self._composition = count_composition(self._seq)
+        return self._composition
+
+    @property
+    def gc(self):
+        """The GC content of the sequence as a decimal."""
+        return composition_gc_fraction(self.composition)
+
+
+class LazyFastaRecord(FastaRecord):
+    """
+    FASTA record that only keeps the ID and the offsets of its sequence lines in a buffer,
+    e.g. the bytes of an uploaded file.
+
+    Attributes:
+        buffer (bytes-like): The buffer holding the FASTA file.
+        start (int): Offset of the first sequence line in the buffer.
+        end (int): Offset directly after the last sequence line.
+
+    The sequence without line breaks is only assembled when seq or seq_bytes is accessed, and
+    it is not kept afterwards. The base counts are computed directly on the sequence lines in
+    the buffer, so computing the GC content needs no copy of the sequence.
+    """
+    __slots__ = ("buffer", "start", "end")
+
+    def __init__(self, id, buffer, start, end):
+        """
+        Initializes a new LazyFastaRecord from the position of its sequence in a buffer.
+
+        Args:
+            id (str): The identifier of the FASTA record.
+            buffer (bytes-like): The buffer holding the FASTA file.
+            start (int): Offset of the first sequence line in the buffer.
+            end (int): Offset directly after the last sequence line.
+        """
+        self.id = id
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self._composition = None
+
+    @property
+    def seq_bytes(self):
+        """The sequence assembled from its lines in the buffer."""
+        region = memoryview(self.buffer)[self.start:self.end].tobytes()
+        return region.translate(None, SEQUENCE_WHITESPACE)
+
+    @property
+    def seq(self):
+        """The sequence assembled from its lines in the buffer and decoded to a string."""
+        return str(self.seq_bytes, "utf-8")
+
+    @property
+    def composition(self):
+        """The base counts of the sequence lines, ignoring line breaks and other whitespace."""
+        if self._composition is None:
+            region = memoryview(self.buffer)[self.start:self.end]
+            self._composition = count_composition(region, ignore_whitespace=True)
+        return self._composition
+
+
+def iter_upload_records(data, cancelled=None, progress=None):
+    """
+    Yields the records of an uploaded plain or gzipped FASTA file. This is the one parser of
+    file uploads, used both in the script run and by background jobs.
+
+    Args:
+        data (bytes): The content of the uploaded file.
+        cancelled (threading.Event, optional): Stops decompressing a gzipped upload early, 
+        without yielding any record, once it is set.
+        progress (callable, optional): Called with the decompressed fraction of a gzipped 
+        upload while it is decompressed, before the first record is yielded.
+
+    Yields:
+        LazyFastaRecord: The records in file order, keeping offsets into the upload, or into
+        its decompressed content for gzipped uploads. record.end / len(record.buffer) is the
+        fraction of the upload parsed so far.
+
+    Raises:
+        ValueError: If the content does not start with a '>' header line.
+    """
+    buffer = data
+    if data[:2] == GZIP_MAGIC:
+        buffer = decompress_upload(data, cancelled, progress)
+        if buffer is None:
+            return
+    for entry_id, start, end in iter_fasta_offsets(buffer):
+        yield LazyFastaRecord(entry_id, buffer, start, end)
@@ -0,0 +1,216 @@
+"""
+Provides an offset index for FASTA files, in the spirit of samtools' .fai files, to access
+single entries by ID without parsing the whole file.
+
+The index stores for every entry the byte offset of its header, the byte range of its
+sequence and the sequence length. An ID occurring several times keeps all of its entries, in
+file order, so every occurrence can be read like when the whole file is parsed. It is saved
+next to the FASTA file with the '.fxi' suffix and reused as long as the size and modification
+time of the FASTA file are unchanged.
+
+Classes:
+    IndexEntry: Offsets and length of one indexed entry.
+    FastaIndex: Offset index of a FASTA file with methods to fetch entries by ID.
+
+Functions:
+    build_index(file_path): Scans a FASTA file and returns the entries of its index.
+    load_or_build_index(file_path): Returns the saved index of a file, rebuilt if outdated.
+"""
+
+import os
+from collections import namedtuple
+from fasta_class import FastaRecord
+from fasta_stream import iter_gc_counts, parse_entry_id, SEQUENCE_WHITESPACE
+
+INDEX_SUFFIX = ".fxi"
+
+IndexEntry = namedtuple("IndexEntry", ["header_offset", "seq_offset", "seq_end", "length"])
+
+
+def build_index(file_path):
+    """
+    Scans a FASTA file once and records the offsets of each entry.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+
+    Returns:
+        dict: Entry IDs as keys, in the order of their first occurrence, and lists of the
+        IndexEntry tuples of all entries with this ID, in file order, as values. Entries
+        without an ID cannot be looked up and are left out.
+
+    Raises:
+        ValueError: If the file does not start with a header line.
+    """
+    entries = {}
+    current = None
+    offset = 0
+
+    def finish(current, seq_end):
+        entry_id, header_offset, seq_offset, length = current
+        if not entry_id:
+            return
+        entries.setdefault(entry_id, []).append(
+            IndexEntry(header_offset, seq_offset, seq_end, length))
+
+    with open(file_path, "rb") as handle:
+        for line in handle:
+            if line.startswith(b">"):
+                if current is not None:
+                    finish(current, offset)
+                current = [parse_entry_id(line), offset, offset + len(line), 0]
+            elif current is None:
+                raise ValueError("FASTA file does not start with a '>' header line.")
+            else:
+                current[3] += len(line.translate(None, SEQUENCE_WHITESPACE))
+            offset += len(line)
+    if current is not None:
+        finish(current, offset)
+    return entries
+
+
+def load_or_build_index(file_path):
+    """
+    Returns the index of a FASTA file, reading it from the '.fxi' file next to the FASTA
+    file if it is up to date and building and saving it otherwise.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+
+    Returns:
+        FastaIndex: The index of the file.
+    """
+    index_path = file_path + INDEX_SUFFIX
+    stat = os.stat(file_path)
+    signature = f"#{stat.st_size}\t{stat.st_mtime_ns}"
+    try:
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            if index_file.readline().rstrip("\n") == signature:
+                entries = {}
+                for line in index_file:
+                    entry_id, *numbers = line.rstrip("\n").split("\t")
+                    entries.setdefault(entry_id, []).append(IndexEntry(*map(int, numbers)))
+                return FastaIndex(file_path, entries)
+    except (OSError, ValueError):
+        pass
+
+    entries = build_index(file_path)
+    try:
+        with open(index_path, "w", encoding="utf-8") as index_file:
+            index_file.write(signature + "\n")
+            for entry_id, id_entries in entries.items():
+                for entry in id_entries:
+                    index_file.write("\t".join([entry_id, *map(str, entry)]) + "\n")
+    except OSError:
+        pass  # The index still works from memory if it cannot be saved
+    return FastaIndex(file_path, entries)
+
+
+class FastaIndex:
+    """
+    Offset index of a FASTA file.
+
+    Attributes:
+        file_path (str): The path to the indexed FASTA file.
+        entries (dict): Entry IDs as keys and lists of IndexEntry tuples as values.
+
+    Methods:
+        ids(): Returns the indexed entry IDs in file order.
+        count(entry_id): Returns the number of entries with an ID.
+        length(entry_id, occurrence): Returns the sequence length of an entry.
+        fetch(entry_id, occurrence): Reads a single entry from the file.
+        gc_content(entry_id, occurrence): Computes the GC content of a single entry.
+
+    Only the bytes of the requested entry are read from the file. Of an ID occurring several
+    times, the first entry is read unless another occurrence is given.
+    """
+    def __init__(self, file_path, entries):
+        self.file_path = file_path
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, entry_id):
+        return entry_id in self.entries
+
+    def ids(self):
+        """
+        Returns the indexed entry IDs in file order.
+
+        Returns:
+            list: The entry IDs, each once, in the order of their first occurrence.
+        """
+        return list(self.entries)
+
+    def count(self, entry_id):
+        """
+        Returns the number of entries with an ID.
+
+        Args:
+            entry_id (str): The ID of the entries.
+
+        Returns:
+            int: The number of entries, 0 if the ID is not in the index.
+        """
+        return len(self.entries.get(entry_id, ()))
+
+    def length(self, entry_id, occurrence=0):
+        """
+        Returns the sequence length of an entry without reading the file.
+
+        Args:
+            entry_id (str): The ID of the entry.
+            occurrence (int): Which of the entries with this ID, 0 for the first one.
+
+        Returns:
+            int: The number of bases of the entry.
+
+        Raises:
+            KeyError: If the ID is not in the index.
+            IndexError: If the ID has fewer entries.
+        """
+        return self.entries[entry_id][occurrence].length
+
+    def fetch(self, entry_id, occurrence=0):
+        """
+        Reads a single entry from the FASTA file.
+
+        Args:
+            entry_id (str): The ID of the entry.
+            occurrence (int): Which of the entries with this ID, 0 for the first one.
+
+        Returns:
+            FastaRecord: The ID and sequence of the entry.
+
+        Raises:
+            KeyError: If the ID is not in the index.
+            IndexError: If the ID has fewer entries.
+        """
+        entry = self.entries[entry_id][occurrence]
+        with open(self.file_path, "rb") as handle:
+            handle.seek(entry.seq_offset)
+            data = handle.read(entry.seq_end - entry.seq_offset)
+        return FastaRecord(entry_id, data.translate(None, SEQUENCE_WHITESPACE))
+
+    def gc_content(self, entry_id, occurrence=0):
+        """
+        Computes the GC content of a single entry, reading it in bounded chunks.
+
+        Args:
+            entry_id (str): The ID of the entry.
+            occurrence (int): Which of the entries with this ID, 0 for the first one.
+
+        Returns:
+            float: The GC content as a decimal, or 0 if the sequence is empty.
+
+        Raises:
+            KeyError: If the ID is not in the index.
+            IndexError: If the ID has fewer entries.
+        """
+        entry = self.entries[entry_id][occurrence]
+        with open(self.file_path, "rb") as handle:
+            handle.seek(entry.header_offset)
+            for _, gc, length in iter_gc_counts(handle, limit=entry.seq_end - entry.header_offset):
+                return gc / length if length else 0
+        return 0
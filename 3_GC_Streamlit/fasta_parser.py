@@ -0,0 +1,83 @@
+"""
+Provides the FASTA parser used by the command line tool and the Streamlit app.
+
+By default the built-in parser of fasta_stream is used, which interprets entry IDs and
+sequences the same way as Bio.SeqIO's 'fasta' parser but needs no import of Biopython.
+Biopython is only imported when it is requested, with the use_biopython argument or by
+setting the FASTA_PARSER environment variable to 'biopython'.
+
+Functions:
+    use_biopython_default(): Returns whether Biopython was requested in the environment.
+    parse_fasta_file(file_path, use_biopython): Parses the entries of a FASTA file.
+    parse_fasta_text(text, use_biopython): Parses the entries of FASTA formatted text.
+"""
+
+import os
+from fasta_class import FastaRecord
+from fasta_stream import iter_fasta_records, DEFAULT_CHUNK_SIZE
+
+PARSER_VARIABLE = "FASTA_PARSER"
+BIOPYTHON = "biopython"
+
+
+def use_biopython_default():
+    """
+    Returns whether Biopython should be used when the caller does not decide it.
+
+    Returns:
+        bool: True if the FASTA_PARSER environment variable is set to 'biopython'.
+    """
+    return os.environ.get(PARSER_VARIABLE, "").lower() == BIOPYTHON
+
+
+def parse_fasta_file(file_path, use_biopython=None):
+    """
+    Parses the entries of a FASTA file, reading it in blocks.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        use_biopython (bool, optional): Parse with Bio.SeqIO instead of the built-in parser.
+        By default the FASTA_PARSER environment variable decides.
+
+    Yields:
+        FastaRecord or SeqRecord: The entries of the file, both having an id and a seq.
+
+    Raises:
+        ValueError: If the file does not start with a '>' header line.
+    """
+    if use_biopython is None:
+        use_biopython = use_biopython_default()
+    if use_biopython:
+        from Bio import SeqIO
+        yield from SeqIO.parse(file_path, "fasta")
+        return
+    with open(file_path, "rb") as handle:
+        blocks = iter(lambda: handle.read(DEFAULT_CHUNK_SIZE), b"")
+        for entry_id, seq in iter_fasta_records(blocks):
+            yield FastaRecord(entry_id, seq)
+
+
+def parse_fasta_text(text, use_biopython=None):
+    """
+    Parses the entries of FASTA formatted text.
+
+    Args:
+        text (str): The FASTA formatted text.
+        use_biopython (bool, optional): Parse with Bio.SeqIO instead of the built-in parser.
+        By default the FASTA_PARSER environment variable decides.
+
+    Returns:
+        list: A FastaRecord instance per entry.
+
+    Raises:
+        ValueError: If the text does not start with a '>' header line.
+    """
+    if use_biopython is None:
+        use_biopython = use_biopython_default()
+    if use_biopython:
+        from io import StringIO
+        from Bio import SeqIO
+        return [FastaRecord(record.id, record.seq)
+                for record in SeqIO.parse(StringIO(text), "fasta")]
+    blocks = [text.encode("utf-8")]
+    return [FastaRecord(entry_id, seq) for entry_id, seq in iter_fasta_records(blocks)]
@@ -0,0 +1,369 @@
+"""
+Provides a streaming scanner that computes the GC content of FASTA entries without keeping
+their sequences in memory.
+
+The file is read in blocks of at most a fixed chunk size, so even a single huge sequence line
+never has to be held in memory at once. Entry IDs and sequences are interpreted the same way
+as Bio.SeqIO's 'fasta' parser does it.
+
+Functions:
+    iter_gc_counts(handle, chunk_size, limit): Yields the ID, GC count and length of each entry.
+    parse_entry_id(header): Extracts the entry ID from a FASTA header line.
+    find_entry_boundaries(file_path, parts): Splits a file into byte ranges at entry starts.
+    gc_counts_in_range(file_path, start, end, chunk_size): Scans one byte range of a file.
+    parallel_gc_counts(file_path, workers, chunk_size): Scans a file with a process pool.
+    iter_upload_blocks(data, chunk_size): Yields the content of a plain or gzipped upload.
+    decompress_upload(data, cancelled, progress, chunk_size): Decompresses a gzipped upload 
+    into one buffer.
+    iter_fasta_records(blocks): Parses FASTA entries from blocks of bytes.
+    iter_fasta_offsets(data): Yields the ID and sequence offsets of each entry in a buffer.
+"""
+
+import gzip
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+SEQUENCE_WHITESPACE = b" \t\r\n"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_entry_id(header):
+    """
+    Extracts the entry ID from a FASTA header line, like Bio.SeqIO does.
+
+    Args:
+        header (bytes): The header line including the leading '>'.
+
+    Returns:
+        str: The first word of the header, or an empty string if the header is empty.
+    """
+    words = header[1:].decode("utf-8", errors="replace").split(None, 1)
+    return words[0] if words else ""
+
+
+def iter_gc_counts(handle, chunk_size=DEFAULT_CHUNK_SIZE, limit=None):
+    """
+    Scans a FASTA file and yields the GC count and length of every entry as soon as the
+    entry has been read completely.
+
+    Args:
+        handle (BinaryIO): The FASTA file opened in binary mode.
+        chunk_size (int): Maximum number of bytes read at a time.
+        limit (int, optional): Number of bytes to scan from the current position of the
+        handle, the rest of the file by default.
+
+    Yields:
+        tuple: The entry ID (str), the number of G and C bases in either case (int) and the
+        sequence length without whitespace (int).
+
+    Raises:
+        ValueError: If the file does not start with a '>' header line.
+
+    The file is read in blocks instead of lines, and the sequence lines between two headers
+    are counted with one bytes operation per block, which keeps the Python overhead per line
+    out of the loop.
+    """
+    entry_id = None
+    header = None
+    gc = length = 0
+    at_line_start = True
+    remaining = limit
+    while remaining is None or remaining > 0:
+        data = handle.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not data:
+            break
+        if remaining is not None:
+            remaining -= len(data)
+        if entry_id is None and header is None and not data.startswith(b">"):
+            raise ValueError("FASTA file does not start with a '>' header line.")
+        position = 0
+        while position < len(data):
+            if header is not None:
+                newline = data.find(b"\n", position)
+                if newline < 0:
+                    header += data[position:]
+                    position = len(data)
+                    break
+                if entry_id is not None:
+                    yield entry_id, gc, length
+                entry_id = parse_entry_id(header + data[position:newline])
+                header = None
+                gc = length = 0
+                position = newline + 1
+                at_line_start = True
+                continue
+            if at_line_start and data[position:position + 1] == b">":
+                header = b">"
+                position += 1
+                continue
+            next_header = data.find(b"\n>", position)
+            end = next_header + 1 if next_header >= 0 else len(data)
+            sequence = data[position:end].translate(None, SEQUENCE_WHITESPACE)
+            gc += (sequence.count(b"G") + sequence.count(b"C")
+                   + sequence.count(b"g") + sequence.count(b"c"))
+            length += len(sequence)
+            position = end
+            at_line_start = data[end - 1:end] == b"\n"
+    if header is not None:
+        if entry_id is not None:
+            yield entry_id, gc, length
+        entry_id = parse_entry_id(header)
+        gc = length = 0
+    if entry_id is not None:
+        yield entry_id, gc, length
+
+
+def find_entry_boundaries(file_path, parts):
+    """
+    Splits a FASTA file into roughly equal byte ranges that each start at an entry header.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        parts (int): The number of ranges to aim for. Fewer ranges are returned if the file
+        has fewer entries than that.
+
+    Returns:
+        list: The start offsets of the ranges followed by the file size, in ascending order.
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [0]
+    with open(file_path, "rb") as handle:
+        for part in range(1, parts):
+            offset = max(size * part // parts, boundaries[-1])
+            if offset >= size:
+                break
+            boundary = _next_entry_start(handle, offset, size)
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+    boundaries.append(size)
+    return boundaries
+
+
+def _next_entry_start(handle, offset, size):
+    # An entry starts with '>' directly after a newline, so search for b"\n>" from the byte
+    # before the offset on, keeping one byte of overlap between the blocks read
+    handle.seek(offset - 1)
+    position = offset - 1
+    previous = b""
+    while position < size:
+        block = handle.read(DEFAULT_CHUNK_SIZE)
+        if not block:
+            break
+        data = previous + block
+        index = data.find(b"\n>")
+        if index >= 0:
+            return position - len(previous) + index + 1
+        previous = data[-1:]
+        position += len(block)
+    return size
+
+
+def gc_counts_in_range(file_path, start, end, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Scans the entries in one byte range of a FASTA file.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        start (int): Offset of the first header of the range.
+        end (int): Offset directly after the range.
+        chunk_size (int): Maximum number of bytes read at a time.
+
+    Returns:
+        list: A tuple of entry ID, GC count and length per entry, in file order.
+    """
+    with open(file_path, "rb") as handle:
+        handle.seek(start)
+        return list(iter_gc_counts(handle, chunk_size, end - start))
+
+
+def parallel_gc_counts(file_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Computes the GC counts of all entries of a FASTA file in a pool of worker processes.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        workers (int, optional): Number of worker processes, the number of CPUs by default.
+        chunk_size (int): Maximum number of bytes a worker reads at a time.
+
+    Yields:
+        tuple: The entry ID, GC count and length of each entry, in the same order as
+        iter_gc_counts yields them.
+
+    The file is split at entry boundaries into several ranges per worker, so workers that
+    finish early pick up more work while the results are still yielded in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    boundaries = find_entry_boundaries(file_path, workers * 4)
+    starts = boundaries[:-1]
+    ends = boundaries[1:]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(gc_counts_in_range, [file_path] * len(starts), starts, ends,
+                               [chunk_size] * len(starts))
+        for counts in results:
+            yield from counts
+
+
+def iter_upload_blocks(data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the content of an uploaded file, decompressing it on the fly if it is gzipped.
+
+    Args:
+        data (bytes): The raw bytes of the upload.
+        chunk_size (int): Number of decompressed bytes yielded at a time for gzipped data.
+
+    Yields:
+        bytes: The whole upload as one block if it is not compressed, without copying it,
+        or the decompressed content in blocks of chunk_size bytes.
+    """
+    if data[:2] != GZIP_MAGIC:
+        yield data
+        return
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as decompressed:
+        while True:
+            block = decompressed.read(chunk_size)
+            if not block:
+                break
+            yield block
+
+
+def decompress_upload(data, cancelled=None, progress=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decompresses a gzipped upload into one growing buffer, so no list of blocks has to be 
+    joined afterwards and the peak memory stays close to the size of the decompressed content.
+
+    Args:
+        data (bytes): The raw bytes of the gzipped upload.
+        cancelled (threading.Event, optional): Stops decompressing early once it is set.
+        progress (callable, optional): Called with the fraction of the compressed bytes read 
+        so far after every block.
+        chunk_size (int): Number of decompressed bytes read at a time.
+
+    Returns:
+        bytearray or None: The decompressed content, or None if it was cancelled.
+    """
+    compressed = io.BytesIO(data)
+    buffer = bytearray()
+    with gzip.GzipFile(fileobj=compressed) as decompressed:
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                return None
+            block = decompressed.read(chunk_size)
+            if not block:
+                break
+            buffer += block
+            if progress is not None:
+                progress(compressed.tell() / len(data))
+    return buffer
+
+
+def iter_fasta_records(blocks):
+    """
+    Parses FASTA entries directly from blocks of bytes, without decoding the data first.
+
+    Args:
+        blocks (iterable of bytes): The content of a FASTA file, e.g. from iter_upload_blocks.
+
+    Yields:
+        tuple: The entry ID (str) and the sequence without whitespace (bytes-like). A sequence
+        stored on a single line is returned as a memoryview into its block, without a copy.
+
+    Raises:
+        ValueError: If the data does not start with a '>' header line.
+
+    Entry IDs and sequences are interpreted the same way as Bio.SeqIO's 'fasta' parser does.
+    """
+    entry_id = None
+    header = None
+    pieces = []
+    at_line_start = True
+    started = False
+    for data in blocks:
+        if not data:
+            continue
+        if not started:
+            if not data.startswith(b">"):
+                raise ValueError("FASTA file does not start with a '>' header line.")
+            started = True
+        view = memoryview(data)
+        position = 0
+        while position < len(data):
+            if header is not None:
+                newline = data.find(b"\n", position)
+                if newline < 0:
+                    header += data[position:]
+                    break
+                if entry_id is not None:
+                    yield entry_id, _join_pieces(pieces)
+                entry_id = parse_entry_id(header + data[position:newline])
+                header = None
+                pieces = []
+                position = newline + 1
+                at_line_start = True
+                continue
+            if at_line_start and data[position:position + 1] == b">":
+                header = b">"
+                position += 1
+                continue
+            next_header = data.find(b"\n>", position)
+            end = next_header + 1 if next_header >= 0 else len(data)
+            pieces.append(_sequence_piece(data, view, position, end))
+            position = end
+            at_line_start = data[end - 1:end] == b"\n"
+    if header is not None:
+        if entry_id is not None:
+            yield entry_id, _join_pieces(pieces)
+        entry_id = parse_entry_id(header)
+        pieces = []
+    if entry_id is not None:
+        yield entry_id, _join_pieces(pieces)
+
+
+def _sequence_piece(data, view, start, end):
+    # Sequence lines without inner whitespace are returned as a view, everything else is
+    # copied once while the whitespace is removed
+    whitespace = sum(data.count(character, start, end) for character in SEQUENCE_WHITESPACE)
+    if whitespace == 0:
+        return view[start:end]
+    if whitespace == 1 and data[end - 1:end] == b"\n":
+        return view[start:end - 1]
+    return data[start:end].translate(None, SEQUENCE_WHITESPACE)
+
+
+def _join_pieces(pieces):
+    if len(pieces) == 1:
+        return pieces[0]
+    return b"".join(pieces)
+
+
+def iter_fasta_offsets(data):
+    """
+    Finds the entries of a FASTA file held in a buffer, without copying any sequence.
+
+    Args:
+        data (bytes): The content of the FASTA file.
+
+    Yields:
+        tuple: The entry ID (str), the offset of the first sequence line and the offset
+        directly after the last sequence line. The range still contains the line breaks.
+
+    Raises:
+        ValueError: If the data does not start with a '>' header line.
+    """
+    if not data:
+        return
+    if not data.startswith(b">"):
+        raise ValueError("FASTA file does not start with a '>' header line.")
+    position = 0
+    while position < len(data):
+        newline = data.find(b"\n", position)
+        start = newline + 1 if newline >= 0 else len(data)
+        entry_id = parse_entry_id(data[position:start])
+        if data.startswith(b">", start):
+            end = start
+        else:
+            next_header = data.find(b"\n>", start)
+            end = next_header + 1 if next_header >= 0 else len(data)
+        yield entry_id, start, end
+        position = end
@@ -1,19 +1,43 @@
 """
 This module provides functionality to process FASTA files and display their GC content 
-using Streamlit. It uses the BioPython library to parse FASTA entries, and handles file
-input/output and error management.
+using Streamlit. It parses the uploaded bytes with fasta_class.iter_upload_records, supports 
+gzipped uploads, and handles file input/output and error management.
 
 Functions:
     process_fasta_from_file(uploaded_file): Process the FASTA file and store each record.
+    upload_digest(uploaded_file, data): Return the hash of the uploaded bytes, computed once 
+    per uploaded file.
+    parse_fasta_upload(digest, _data): Parse the uploaded bytes and compute the GC content, 
+    cached by the hash of the bytes.
     display_results_from_file(file_entries): Display the GC content of the records from the 
-    processed file.
+    processed file as a paginated table.
+    process_in_background(digest, data): Process a large upload as a background job and show 
+    its progress.
+    keep_polling(): Rerun the script while the background job of the session is running.
 """
 
-from io import StringIO
-from Bio import SeqIO
-from fasta_class import FastaRecord
-from gc_content import output_gc_content
+import hashlib
+import time
+import uuid
+import streamlit as st
+from fasta_class import iter_upload_records
+from gc_content import build_results_table, output_results_table
 from error_handling import handle_errors
+from background_jobs import get_or_start_job, discard_job, RUNNING, CANCELLED, FAILED
+from timing import span
+
+# Number of distinct uploads whose parsed records are kept, the least recently used is evicted
+UPLOAD_CACHE_ENTRIES = 8
+# Uploads larger than this are processed as background jobs instead of in the script run
+BACKGROUND_THRESHOLD = 5 * 1024 * 1024
+# Seconds between two reruns while a background job is running
+POLL_INTERVAL = 1.0
+# Session state key holding the background job of the current upload
+JOB_KEY = "upload_job"
+# Session state key holding the id that scopes the background jobs to the session
+SESSION_ID_KEY = "session_id"
+# Session state key holding the file id of the current upload and the hash of its bytes
+UPLOAD_DIGEST_KEY = "upload_digest"
 
 def process_fasta_from_file(uploaded_file):
     """
@@ -30,25 +54,124 @@ def process_fasta_from_file(uploaded_file):
         Exception: Any exceptions that occur during file reading or parsing are caught and handled 
         by the handle_errors function.
 
-    This function reads from the provided UploadedFile object, decodes it to a string, and then 
-    parses it using SeqIO.
-    It constructs a list of FastaRecord objects which encapsulate the ID and sequence of each entry 
-    in the FASTA file.
+    This function reads from the provided UploadedFile object and hands its bytes to 
+    parse_fasta_upload together with their SHA-256 hash, so reruns of the script and repeated 
+    uploads of the same file reuse the already parsed records. The hash is computed only 
+    once per uploaded file, see upload_digest. Uploads larger than BACKGROUND_THRESHOLD are 
+    processed as background jobs, and the records processed so far are returned.
     """
     all_entries = []
+    st.session_state.pop(JOB_KEY, None)
 
     try:
         if uploaded_file is not None:
-            stringio = StringIO(uploaded_file.getvalue().decode("utf-8"))
-
-            for record in SeqIO.parse(stringio, "fasta"):
-                fasta = FastaRecord(record.id, record.seq)
-                all_entries.append(fasta)
+            data = uploaded_file.getvalue()
+            digest = upload_digest(uploaded_file, data)
+            if len(data) > BACKGROUND_THRESHOLD:
+                all_entries = process_in_background(digest, data)
+            else:
+                all_entries = parse_fasta_upload(digest, data)
     except Exception as e:
         handle_errors(e)
 
     return all_entries
 
+def upload_digest(uploaded_file, data):
+    """
+    Returns the SHA-256 hash of the bytes of an uploaded file, hashing them only if the file 
+    changed since the last run of the script.
+
+    Args:
+        uploaded_file (UploadedFile): The file uploaded by the user.
+        data (bytes): The content of the uploaded file.
+
+    Returns:
+        str: The SHA-256 hash of the bytes.
+
+    The hash is kept in the session state together with the file id Streamlit gives every 
+    upload, so the reruns while a background job is polled do not hash the upload again.
+    """
+    file_id, digest = st.session_state.get(UPLOAD_DIGEST_KEY, (None, None))
+    if digest is None or file_id != uploaded_file.file_id:
+        digest = hashlib.sha256(data).hexdigest()
+        st.session_state[UPLOAD_DIGEST_KEY] = (uploaded_file.file_id, digest)
+    return digest
+
+def process_in_background(digest, data):
+    """
+    Processes a large upload as a background job and displays its progress with options to 
+    cancel or restart it.
+
+    Args:
+        digest (str): The SHA-256 hash of the uploaded bytes.
+        data (bytes): The content of the uploaded file.
+
+    Returns:
+        list: The FastaRecord instances processed so far.
+
+    The job is kept across reruns of the session, so a rerun only picks up its current state. 
+    Cancelling it does not stop the jobs of other sessions that uploaded the same file. While 
+    it is running, keep_polling reruns the script to show new batches of results.
+    """
+    session_id = st.session_state.setdefault(SESSION_ID_KEY, uuid.uuid4().hex)
+    job = get_or_start_job(session_id, digest, data)
+    entries, fraction = job.snapshot()
+    if job.state == RUNNING:
+        st.session_state[JOB_KEY] = job
+        st.progress(fraction, text=f"Processing upload: {len(entries)} records, {fraction:.0%}")
+        if st.button("Cancel processing"):
+            job.cancel()
+    elif job.state == CANCELLED:
+        st.info(f"Processing was cancelled after {len(entries)} records.")
+        if st.button("Restart processing"):
+            discard_job(session_id, digest)
+            st.rerun()
+    elif job.state == FAILED:
+        handle_errors(job.error)
+    return entries
+
+def keep_polling():
+    """
+    Reruns the script after POLL_INTERVAL seconds while the background job of the session is 
+    running, so its progress and new results are shown. Call it at the end of the script run.
+    """
+    job = st.session_state.get(JOB_KEY)
+    if job is not None and job.state == RUNNING:
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+
+@st.cache_resource(max_entries=UPLOAD_CACHE_ENTRIES, show_spinner=False)
+def parse_fasta_upload(digest, _data):
+    """
+    Parses the bytes of an uploaded plain or gzipped FASTA file and computes the GC content 
+    of each entry.
+
+    Args:
+        digest (str): The SHA-256 hash of the bytes, used as the cache key.
+        _data (bytes): The content of the uploaded file. The leading underscore excludes it 
+        from Streamlit's own hashing of the arguments.
+
+    Returns:
+        list: A list of FastaRecord instances with their GC content and base counts already 
+        computed.
+
+    The bytes are scanned entry by entry without decoding the whole upload into a string 
+    first. The entries are LazyFastaRecords that only keep offsets into the uploaded bytes, or 
+    into the decompressed content of gzipped uploads. The GC content is computed on the raw 
+    sequence bytes.
+
+    The result is cached by Streamlit for the last UPLOAD_CACHE_ENTRIES distinct uploads. The 
+    cached list is shared between reruns and sessions and must not be modified. Parsing and 
+    counting are logged as the 'parse' and 'compute' stages, only when the cache misses.
+    """
+    with span("parse", source="file", bytes=len(_data)) as parse_span:
+        entries = list(iter_upload_records(_data))
+        parse_span.set(records=len(entries))
+    with span("compute", source="file", records=len(entries)):
+        for entry in entries:
+            _ = entry.composition  # Count the bases once, while the result is being cached
+    return entries
+
 def display_results_from_file(file_entries):
     """
     Displays the GC content of each entry in the provided list of FastaRecord objects using the 
@@ -57,11 +180,10 @@ def display_results_from_file(file_entries):
     Args:
         file_entries (list): A list of FastaRecord objects whose GC content is to be displayed.
 
-    This function iterates over each FastaRecord in the provided list, extracting the ID and 
-    sequence.
-    It then uses the output_gc_content function to calculate and display the GC content for 
-    each sequence.
+    This function collects the records into one results table, reusing the base counts computed 
+    while parsing, and renders it with output_results_table. The time it takes is logged as 
+    the 'render' stage.
     """
     if file_entries:
-        for entry in file_entries:
-            output_gc_content(entry.id, entry.seq)
+        with span("render", source="file", records=len(file_entries)):
+            output_results_table(build_results_table(file_entries), "file")
@@ -4,16 +4,28 @@ displays these calculations using the Streamlit library for interactive web appl
 
 Functions:
     calculate_gc_content(fasta): Computes the GC content of a given DNA sequence.
-    output_gc_content(id, seq): Displays the GC content and sequence ID using Streamlit.
+    is_valid_record(entry): Checks that a FASTA record has an ID and a non-empty sequence.
+    build_results_table(entries): Collects ID, length, GC content, N count and validity of 
+    FASTA records in one table.
+    output_results_table(table, key): Displays summary statistics, one page of the table and 
+    a CSV download of the whole table using Streamlit.
 
 Dependencies:
     Streamlit: A framework for creating web applications for machine learning and data science.
+    pandas: Holds the results table.
+    composition: The shared nucleotide composition engine.
 
 Example Usage:
     This script is intended to be run within a Streamlit application environment.
 """
 
+import math
+import pandas as pd
 import streamlit as st
+from composition import gc_fraction, composition_gc_fraction
+
+RESULT_COLUMNS = ["ID", "Length", "GC %", "N count", "Valid"]
+PAGE_SIZES = [25, 50, 100, 500]
 
 
 def calculate_gc_content(fasta):
@@ -31,21 +43,74 @@ def calculate_gc_content(fasta):
         Displays a warning message using Streamlit if an exception occurs during calculation.
     """
     try:
-        gc = sum(fasta.upper().count(x) for x in ['G', 'C'])
-        return gc / len(fasta) if fasta else 0
+        return gc_fraction(fasta)
     except Exception as e:
         st.warning(f"Error: {e}")
         return 0
 
-def output_gc_content(id, seq):
+def is_valid_record(entry):
+    """
+    Checks that a FASTA record has both an ID and a non-empty sequence.
+
+    Args:
+        entry (FastaRecord): The record to check.
+
+    Returns:
+        bool: True if the record is valid, False otherwise.
+
+    The length is taken from the base counts of the record, so the sequence is not assembled.
+    """
+    return bool(entry.id and entry.composition.length)
+
+def build_results_table(entries):
     """
-    Output the GC content percentage of a DNA sequence along with its ID using Streamlit.
+    Collects the results of FASTA records in one table.
 
     Args:
-        id (str): The identifier for the FASTA sequence.
-        seq (str): The DNA sequence whose GC content is to be calculated and displayed.
+        entries (list): A list of FastaRecord objects.
 
-    This function calls calculate_gc_content to determine the GC content and then formats and 
-    displays the results using Streamlit's text function.
+    Returns:
+        pandas.DataFrame: One row per record with the columns ID, Length, GC %, N count and 
+        Valid. A record is valid if it has both an ID and a non-empty sequence.
+
+    The base counts are taken from the records, which count them only once.
     """
-    st.text(f"FASTA Record ID: {id} \n GC Content Percentage: {calculate_gc_content(seq) * 100:.10f}%\n")
+    rows = []
+    for entry in entries:
+        composition = entry.composition
+        gc = composition_gc_fraction(composition)
+        rows.append((entry.id, composition.length, gc * 100, composition.n,
+                     is_valid_record(entry)))
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+def output_results_table(table, key):
+    """
+    Displays a results table page by page together with summary statistics and a CSV download.
+
+    Args:
+        table (pandas.DataFrame): The table built by build_results_table.
+        key (str): Prefix for the widget keys, so several tables can be shown on one page.
+
+    Only the selected page is sent to the browser, so the rendering cost does not grow with 
+    the number of records. The download contains the whole table.
+    """
+    valid = table[table["Valid"]]
+    records, valid_records, mean_gc, total_length = st.columns(4)
+    records.metric("Records", len(table))
+    valid_records.metric("Valid records", len(valid))
+    mean_gc.metric("Mean GC %", f"{valid['GC %'].mean():.4f}" if len(valid) else "-")
+    total_length.metric("Total length", int(table["Length"].sum()))
+
+    page_size_column, page_column = st.columns(2)
+    page_size = page_size_column.selectbox("Records per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, math.ceil(len(table) / page_size))
+    page = page_column.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                    step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    st.dataframe(
+        table.iloc[start:start + page_size],
+        hide_index=True,
+        column_config={"GC %": st.column_config.NumberColumn(format="%.10f")},
+    )
+    st.download_button("Download results as CSV", table.to_csv(index=False).encode("utf-8"),
+                       file_name="gc_content.csv", mime="text/csv", key=f"{key}_download")
@@ -1,29 +1,69 @@
 """
 Provides functionality to configure and initialize logging for Python applications.
 
+Log records are not written to the file by the thread that logs them. They are put on a queue
+and written to the file by a background listener thread, so logging never blocks a script run
+on file I/O.
+
 Function:
     setup_logging(): Configures the logging to capture messages with debug and higher severity levels into a file.
+    stop_logging(): Writes the queued messages and stops the background listener.
 
 Example Usage:
     Simply import and call setup_logging at the beginning of your application to start logging.
 """
 
+import atexit
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FILE = 'app.log'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+_lock = threading.Lock()
 
 def setup_logging():
     """
     Configure the  logging system to log messages to a file with a specified format.
 
-    No parameters are used and no values are returned. 
+    No parameters are used and no values are returned.
 
     Usage:
-        Call this function at the start of your application to ensure all  
-        operations are logged.
+        Call this function at the start of your application to ensure all
+        operations are logged. Further calls, e.g. on every rerun of a Streamlit script,
+        do nothing.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        log_queue = queue.SimpleQueue()
+        # Log messages will be appended to app.log by the listener thread
+        file_handler = logging.FileHandler(LOG_FILE, mode='a')
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        root = logging.getLogger()
+        root.setLevel(logging.DEBUG)  # Adjust the logging level as needed
+        root.addHandler(QueueHandler(log_queue))
+        _listener.start()
+        atexit.register(stop_logging)
+
+def stop_logging():
+    """
+    Writes all queued log messages to the file and stops the listener thread. Called
+    automatically when the interpreter exits.
     """
-    # Configure the logging system to log messages to a file
-    logging.basicConfig(
-        level=logging.DEBUG,  # Adjust the logging level as needed
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        filename='app.log',  # Log messages will be written to app.log
-        filemode='a'  # Append mode, which ensures logs are added to the file
-    )
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+            root.removeHandler(handler)
+        _listener = None
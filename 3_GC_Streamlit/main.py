@@ -9,30 +9,31 @@ Functions:
     setup(): Sets up the Streamlit interface and handles file or text inputs.
 
 External Modules:
-    file_upload: Handles processing of FASTA sequences uploaded as files.
+    file_upload: Handles processing of FASTA sequences uploaded as files, large files as 
+    background jobs.
     text_upload: Manages processing of FASTA sequences entered via text input.
-    logging_config: Configures logging across the application.
+    logging_config: Configures asynchronous logging across the application.
     error_handling: Provides error handling mechanisms for robust application behavior.
 """
 
 import streamlit as st
-from file_upload import process_fasta_from_file, display_results_from_file
+from file_upload import process_fasta_from_file, display_results_from_file, keep_polling
 from text_upload import display_results_from_text
 from logging_config import setup_logging
 from error_handling import handle_errors
 
-setup_logging()
-
 def main():
     """
     Main function to initialize the logging and display functionalities within the 
     Streamlit web application. It orchestrates the sequence input through file or 
-    text and displays the calculated GC content.
+    text and displays the calculated GC content. While a large upload is processed in the 
+    background, the script is rerun to show its progress.
     """
     setup_logging()
     fasta, file_entries = setup()
     display_results_from_file(file_entries)
     display_results_from_text(fasta)
+    keep_polling()
 
 def setup():
     """
@@ -52,9 +53,9 @@ def setup():
     """
     try: 
         st.title('GC Content Calculator')
-        st.caption('To calculate the GC content of a fasta file, please upload a fasta file beneath or enter a FASTA sequence in the text box below.')
+        st.caption('To calculate the GC content of a fasta file, please upload a fasta file (optionally gzipped) beneath or enter a FASTA sequence in the text box below.')
         fasta = st.text_area('FASTA Sequence')
-        uploaded_file = st.file_uploader("Upload your FASTA file", type=['fasta', 'fna'])
+        uploaded_file = st.file_uploader("Upload your FASTA file", type=['fasta', 'fna', 'fa', 'gz'])
         file_entries = process_fasta_from_file(uploaded_file)
     except Exception as e:
         handle_errors(e)
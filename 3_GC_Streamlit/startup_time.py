@@ -0,0 +1,75 @@
+"""
+Measures the startup time of the command line tool and the modules of the Streamlit app.
+
+Every measurement runs in a fresh Python interpreter, so nothing is cached in sys.modules, and
+reports the median time of several runs together with the heavy libraries that were loaded.
+
+Functions:
+    measure_import(statement, runs): Times a statement in fresh interpreters.
+    main(): Measures the startup of all entry points and prints a report.
+
+Usage:
+    python startup_time.py [RUNS]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+# Statements run at the start of each entry point
+ENTRY_POINTS = {
+    "exercise_3 --stream": "import exercise_3",
+    "exercise_3 (validate)": "import exercise_3, fasta_parser",
+    "exercise_3 --biopython": "import exercise_3, fasta_parser; from Bio import SeqIO",
+    "text_upload": "import text_upload",
+    "file_upload": "import file_upload",
+}
+HEAVY_MODULES = ["Bio", "numpy", "pandas", "streamlit"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def measure_import(statement, runs=5):
+    """
+    Times a statement in fresh Python interpreters.
+
+    Args:
+        statement (str): The Python statement to time, usually imports.
+        runs (int): Number of interpreters started.
+
+    Returns:
+        tuple: The median time in seconds and the list of heavy modules that were loaded.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    times = []
+    loaded = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], cwd=here, check=True,
+                                capture_output=True, text=True)
+        elapsed, _, modules = result.stdout.strip().partition(" ")
+        times.append(float(elapsed))
+        loaded = modules.split(",") if modules else []
+    return statistics.median(times), loaded
+
+
+def main():
+    """
+    Measures the startup of all entry points and prints the median time in milliseconds.
+    """
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'Entry point':<26}{'Startup (ms)':>14}  Loaded")
+    for name, statement in ENTRY_POINTS.items():
+        elapsed, loaded = measure_import(statement, runs)
+        print(f"{name:<26}{elapsed * 1000:>14.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
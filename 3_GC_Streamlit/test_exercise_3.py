@@ -7,9 +7,26 @@ The TestProcessFasta class encapsulates all unit tests for testing the error han
 of the process_fasta_from_file function when faced with problematic inputs.
 """
 
+import gzip
+import hashlib
+import io
+import os
+import tempfile
 import unittest
+from contextlib import redirect_stdout
 from unittest.mock import MagicMock, patch
-from file_upload import process_fasta_from_file
+from file_upload import process_fasta_from_file, upload_digest
+from exercise_3 import validate_fasta_file, output, stream_output, count_gc, output_selected
+from fasta_index import load_or_build_index, INDEX_SUFFIX
+from composition import count_composition, gc_profile
+from fasta_class import FastaRecord, iter_upload_records
+from gc_content import build_results_table
+from background_jobs import (UploadJob, get_or_start_job, discard_job, DONE, CANCELLED,
+                             DECOMPRESS_SHARE)
+from fasta_parser import parse_fasta_text, parse_fasta_file
+from benchmark_gc import generate_fasta, PATHS, STAGES
+import text_upload
+from timing import span
 from logging_config import setup_logging
 
 setup_logging()
@@ -54,5 +71,372 @@ class TestProcessFasta(unittest.TestCase):
         # Optionally, check if the result is as expected (likely an empty list)
         self.assertEqual(result, [])
 
+    def test_upload_cache(self):
+        """
+        Test that processing the same upload twice parses it only once and returns the cached 
+        records with their GC content.
+        """
+        uploaded_file = MagicMock()
+        uploaded_file.getvalue.return_value = b">cached_entry\nGGCCAT\n"
+
+        with patch('file_upload.iter_upload_records', wraps=iter_upload_records) as mock_parse:
+            first = process_fasta_from_file(uploaded_file)
+            second = process_fasta_from_file(uploaded_file)
+
+        mock_parse.assert_called_once()
+        self.assertIs(first, second)
+        self.assertEqual([(entry.id, entry.gc) for entry in first], [("cached_entry", 4 / 6)])
+
+    @patch('file_upload.st')
+    def test_digest_per_file_id(self, mock_st):
+        """
+        Test that the upload is hashed once per file id and again when another file is 
+        uploaded.
+        """
+        mock_st.session_state = {}
+        uploaded_file = MagicMock(file_id="first")
+        with patch('file_upload.hashlib.sha256', wraps=hashlib.sha256) as mock_sha256:
+            digest = upload_digest(uploaded_file, b">a\nACGT\n")
+            self.assertEqual(upload_digest(uploaded_file, b">a\nACGT\n"), digest)
+            mock_sha256.assert_called_once()
+            uploaded_file.file_id = "second"
+            self.assertNotEqual(upload_digest(uploaded_file, b">b\nGGCC\n"), digest)
+            self.assertEqual(mock_sha256.call_count, 2)
+
+    def test_gzipped_upload(self):
+        """
+        Test that a gzipped upload gives the same records and GC content as the plain file.
+        """
+        with open(os.path.join(os.path.dirname(__file__), "human_gene.fna"), "rb") as file:
+            data = file.read()
+        plain_file = MagicMock()
+        plain_file.getvalue.return_value = data
+        gzipped_file = MagicMock()
+        gzipped_file.getvalue.return_value = gzip.compress(data)
+
+        plain = process_fasta_from_file(plain_file)
+        gzipped = process_fasta_from_file(gzipped_file)
+
+        self.assertEqual(len(plain), 2)
+        self.assertEqual([(entry.id, entry.seq, entry.gc) for entry in gzipped],
+                         [(entry.id, entry.seq, entry.gc) for entry in plain])
+
+class TestStreamOutput(unittest.TestCase):
+    """
+    A test suite checking that the streaming mode of exercise_3 prints the same output as 
+    the default mode, which keeps all entries in memory.
+    """
+    def test_same_output_as_output(self):
+        """
+        Compares the output of stream_output with the output of validate_fasta_file and output 
+        for a file with valid entries, invalid entries, mixed case and wrapped lines, both when 
+        processed serially and by worker processes. A small chunk size forces long lines to be 
+        read in several pieces.
+        """
+        content = ">first desc\nACGTacgt\nGGC\n>\nAAA\n>empty\n\n>long\n" + "gC" * 50 + "\n"
+        with tempfile.NamedTemporaryFile("w", suffix=".fna", delete=False) as file:
+            file.write(content)
+        try:
+            expected = io.StringIO()
+            with redirect_stdout(expected):
+                output(*validate_fasta_file(file.name))
+            streamed = io.StringIO()
+            with redirect_stdout(streamed):
+                stream_output(file.name, chunk_size=8)
+            parallel = io.StringIO()
+            with redirect_stdout(parallel):
+                stream_output(file.name, chunk_size=8, workers=2)
+        finally:
+            os.remove(file.name)
+
+        self.assertEqual(streamed.getvalue(), expected.getvalue())
+        self.assertEqual(parallel.getvalue(), expected.getvalue())
+
+class TestFastaIndex(unittest.TestCase):
+    """
+    A test suite for the offset index, checking that single entries read through the index 
+    match the entries parsed by Biopython and that the saved index is reused.
+    """
+    def test_fetch_and_gc_content(self):
+        """
+        Fetches every entry of human_gene.fna by ID and compares sequence and GC content with 
+        the results of validate_fasta_file. Loading the index a second time has to read the 
+        saved '.fxi' file instead of rebuilding it.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "human_gene.fna")
+            source_path = os.path.join(os.path.dirname(__file__), "human_gene.fna")
+            with open(source_path, "rb") as source, open(file_path, "wb") as target:
+                target.write(source.read())
+
+            index = load_or_build_index(file_path)
+            valid_entries, _ = validate_fasta_file(file_path)
+            self.assertEqual(index.ids(), [entry.id for entry in valid_entries])
+            for entry in valid_entries:
+                self.assertEqual(index.fetch(entry.id).seq, str(entry.seq))
+                self.assertEqual(index.gc_content(entry.id), count_gc(entry.seq))
+
+            self.assertTrue(os.path.exists(file_path + INDEX_SUFFIX))
+            with patch('fasta_index.build_index') as mock_build_index:
+                self.assertEqual(load_or_build_index(file_path).entries, index.entries)
+                mock_build_index.assert_not_called()
+
+    def test_duplicate_ids(self):
+        """
+        Keeps every entry of an ID occurring twice, so --ids outputs both like the full run.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "duplicates.fna")
+            with open(file_path, "w") as file:
+                file.write(">a\nGGCC\n>b\nATAT\n>a\nGATT\nACA\n")
+
+            index = load_or_build_index(file_path)
+            self.assertEqual(index.ids(), ["a", "b"])
+            self.assertEqual(index.count("a"), 2)
+            self.assertEqual(index.fetch("a").seq, "GGCC")
+            self.assertEqual(index.fetch("a", 1).seq, "GATTACA")
+            self.assertEqual(index.gc_content("a", 1), 2 / 7)
+            self.assertEqual(load_or_build_index(file_path).entries, index.entries)
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                output_selected(file_path, ["a"])
+            self.assertEqual(output.getvalue().count("Entry ID: a"), 2)
+
+class TestComposition(unittest.TestCase):
+    """
+    A test suite for the shared composition engine.
+    """
+    def test_count_composition(self):
+        """
+        Checks the single-pass counts for a sequence with mixed case, N and other characters.
+        """
+        composition = count_composition("ACGTNacgtn-*")
+        self.assertEqual(composition, (2, 2, 2, 2, 2, 5, 2, 12))
+
+    def test_gc_profile(self):
+        """
+        Compares the sliding-window GC content and GC skew with a direct count per window.
+        """
+        seq = "GGGCCATATAgcgcNNATGC" * 5
+        starts, gc, skew = gc_profile(seq, window=7, step=3)
+        self.assertEqual(list(starts), list(range(0, len(seq) - 6, 3)))
+        for start, window_gc, window_skew in zip(starts, gc, skew):
+            window = seq[start:start + 7].upper()
+            g, c = window.count("G"), window.count("C")
+            self.assertAlmostEqual(window_gc, (g + c) / 7)
+            self.assertAlmostEqual(window_skew, (g - c) / (g + c) if g + c else 0)
+
+class TestResultsTable(unittest.TestCase):
+    """
+    A test suite for the table the GC content results are rendered from.
+    """
+    def test_build_results_table(self):
+        """
+        Checks length, GC percentage, N count and validity of valid and invalid records.
+        """
+        table = build_results_table([FastaRecord("a", "GCNNat"), FastaRecord("b", ""),
+                                     FastaRecord("", "GG")])
+        self.assertEqual(list(table["ID"]), ["a", "b", ""])
+        self.assertEqual(list(table["Length"]), [6, 0, 2])
+        self.assertEqual(list(table["GC %"]), [2 / 6 * 100, 0, 100])
+        self.assertEqual(list(table["N count"]), [2, 0, 0])
+        self.assertEqual(list(table["Valid"]), [True, False, False])
+
+class TestTextUpload(unittest.TestCase):
+    """
+    A test suite for the parsing and validation of FASTA text input.
+    """
+    def test_parsed_once_and_summarized(self):
+        """
+        Checks that the same text is parsed only once and that the summary counts invalid 
+        records and non-ACGT characters.
+        """
+        text = ">a\nACGTNNxx\n>\nGG\n>b\n"
+        with patch('text_upload.parse_fasta_from_string',
+                   wraps=text_upload.parse_fasta_from_string) as mock_parse:
+            entries = text_upload.get_text_entries(text)
+            self.assertIs(text_upload.get_text_entries(text), entries)
+            mock_parse.assert_called_once()
+        summary = text_upload.summarize_entries(entries)
+        self.assertEqual(summary, text_upload.TextSummary(3, 1, 1, 2, 2))
+        self.assertTrue(text_upload.check_entry(entries))
+        self.assertFalse(text_upload.check_entry(entries[2:]))
+
+    @patch('text_upload.output_results_table')
+    @patch('text_upload.st')
+    def test_results_dropped_after_edit(self, mock_st, mock_output):
+        """
+        Checks that the results table is shown on reruns with the same text and dropped once 
+        the text is edited or cleared.
+        """
+        mock_st.session_state = {}
+        mock_st.button.return_value = True
+        text_upload.display_results_from_text(">a\nACGT\n")
+        mock_st.button.return_value = False
+        text_upload.display_results_from_text(">a\nACGT\n")
+        self.assertEqual(mock_output.call_count, 2)
+        text_upload.display_results_from_text(">a\nACGTT\n")
+        self.assertNotIn(text_upload.TEXT_RESULTS_KEY, mock_st.session_state)
+        self.assertEqual(mock_output.call_count, 2)
+        mock_st.button.return_value = True
+        text_upload.display_results_from_text(">a\nACGT\n")
+        mock_st.button.return_value = False
+        text_upload.display_results_from_text("")
+        self.assertNotIn(text_upload.TEXT_RESULTS_KEY, mock_st.session_state)
+        self.assertEqual(mock_output.call_count, 3)
+
+class TestTiming(unittest.TestCase):
+    """
+    A test suite for the timing spans of the pipeline stages.
+    """
+    def test_span(self):
+        """
+        Checks the records logged by a span used as context manager and as decorator.
+        """
+        with self.assertLogs('gc.timing', level='INFO') as logs:
+            with span("parse", source="text") as parse_span:
+                parse_span.set(records=3)
+
+            @span("validate")
+            def fail():
+                raise ValueError("invalid")
+            with self.assertRaises(ValueError):
+                fail()
+        self.assertRegex(logs.output[0],
+                         r"span=parse duration_ms=\d+\.\d{3} status=ok source=text records=3")
+        self.assertIn("span=validate", logs.output[1])
+        self.assertIn("status=error", logs.output[1])
+        self.assertEqual(logs.records[0].fields, {"source": "text", "records": 3})
+
+class TestFastaParser(unittest.TestCase):
+    """
+    A test suite for the built-in FASTA parser.
+    """
+    def test_same_as_biopython(self):
+        """
+        Checks that the built-in parser gives the same IDs and sequences as Biopython.
+        """
+        text = ">a desc\nAC GT\r\nGG\n>\nAA\n>b\n\n>c\nttt"
+        expected = [(entry.id, entry.seq) for entry in parse_fasta_text(text, True)]
+        self.assertEqual([(entry.id, entry.seq) for entry in parse_fasta_text(text, False)],
+                         expected)
+        with self.assertRaises(ValueError):
+            parse_fasta_text("no fasta", False)
+        file_path = os.path.join(os.path.dirname(__file__), 'human_gene.fna')
+        self.assertEqual([(entry.id, entry.seq) for entry in parse_fasta_file(file_path, False)],
+                         [(entry.id, str(entry.seq)) for entry in parse_fasta_file(file_path, True)])
+
+class TestBenchmarkGenerator(unittest.TestCase):
+    """
+    A test suite for the synthetic FASTA files and the paths of the benchmark suite.
+    """
+    def test_generate_fasta(self):
+        """
+        Checks that the files are deterministic and have the properties of their scenario.
+        """
+        self.assertEqual(generate_fasta("n_rich"), generate_fasta("n_rich"))
+        self.assertNotEqual(generate_fasta("n_rich"), generate_fasta("n_rich", seed=1))
+        entries = parse_fasta_text(generate_fasta("huge").decode(), False)
+        self.assertEqual(len(entries), 4)
+        self.assertTrue(all(len(line) <= 70 for line in generate_fasta("tiny").split(b"\n")
+                            if not line.startswith(b">")))
+        mixed = count_composition(generate_fasta("mixed_case").split(b"\n", 1)[1])
+        self.assertAlmostEqual(mixed.lowercase / (mixed.length - mixed.other), 0.5, places=1)
+        rich = count_composition(b"".join(entry.seq_bytes for entry in
+                                          parse_fasta_text(generate_fasta("n_rich").decode())))
+        self.assertAlmostEqual(rich.n / rich.length, 0.33, places=1)
+
+    def test_path_stages(self):
+        """
+        Checks that every path runs each stage once and that the paths agree on the valid 
+        records.
+        """
+        data = b">a\nGGCC\n>\nAT\n>b\n>c\nnnAT\n"
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "stages.fa")
+            with open(file_path, "wb") as handle:
+                handle.write(data)
+            for name, path in PATHS.items():
+                stages = dict(path(data, file_path))
+                self.assertEqual(sorted(stages), sorted(STAGES), name)
+                self.assertEqual([entry.id for entry in stages["validate"]], ["a", "c"], name)
+
+class TestUploadJob(unittest.TestCase):
+    """
+    A test suite for the background jobs processing large uploads.
+    """
+    def test_batches_and_cancel(self):
+        """
+        Runs jobs synchronously and checks the published records, progress and cancellation.
+        """
+        data = b"".join(b">seq%d\nGGCCAT\nAT\n" % number for number in range(5000))
+        job = UploadJob("digest", len(data))
+        job.run(data)
+        entries, fraction = job.snapshot()
+        self.assertEqual(job.state, DONE)
+        self.assertEqual(fraction, 1.0)
+        self.assertEqual([entry.id for entry in entries], [f"seq{n}" for n in range(5000)])
+        self.assertEqual(entries[-1].seq, "GGCCATAT")
+
+        job = UploadJob("digest", len(data))
+        job.cancel()
+        job.run(gzip.compress(data))
+        self.assertEqual(job.state, CANCELLED)
+        self.assertEqual(job.snapshot(), ([], 0.0))
+
+        class CancelledJob(UploadJob):
+            def _publish(self, batch, fraction):
+                super()._publish(batch, fraction)
+                self.cancel()
+
+        with patch('background_jobs.PUBLISH_BYTES', 1000):
+            job = CancelledJob("digest", len(data))
+            job.run(data)
+        entries, fraction = job.snapshot()
+        self.assertEqual(job.state, CANCELLED)
+        self.assertTrue(0 < len(entries) < 100)
+        self.assertAlmostEqual(fraction, entries[-1].end / len(data))
+
+    def test_gzip_progress(self):
+        """
+        Checks that a gzipped upload reports the progress of its decompression before the 
+        records are published, and that the progress never goes back.
+        """
+        data = b"".join(b">seq%d\nGGCCAT\nAT\n" % number for number in range(50000))
+        published = []
+
+        class RecordingJob(UploadJob):
+            def _publish(self, batch, fraction):
+                super()._publish(batch, fraction)
+                published.append((len(batch), fraction))
+
+        job = RecordingJob("digest", len(data))
+        job.run(gzip.compress(data))
+        entries, fraction = job.snapshot()
+        self.assertEqual(job.state, DONE)
+        self.assertEqual(len(entries), 50000)
+        self.assertEqual(entries[-1].seq, "GGCCATAT")
+        self.assertEqual(published[0][0], 0)
+        self.assertTrue(0 < published[0][1] <= DECOMPRESS_SHARE)
+        fractions = [fraction for _, fraction in published]
+        self.assertEqual(fractions, sorted(fractions))
+        self.assertEqual(fractions[-1], 1.0)
+
+    def test_jobs_per_session(self):
+        """
+        Checks that sessions uploading the same file get their own jobs, and discarding the job 
+        of one session does not cancel the other.
+        """
+        data = b">seq\nGGCCAT\n"
+        first = get_or_start_job("session1", "digest", data)
+        second = get_or_start_job("session2", "digest", data)
+        self.assertIsNot(first, second)
+        self.assertIs(get_or_start_job("session1", "digest", data), first)
+        discard_job("session1", "digest")
+        self.assertTrue(first._cancelled.is_set())
+        self.assertFalse(second._cancelled.is_set())
+        self.assertIsNot(get_or_start_job("session1", "digest", data), first)
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,20 +3,33 @@ This module provides web-based tools to calculate GC content from user-provided
 Utilizes Streamlit for UI interactions, processing FASTA sequences and displaying 
 GC content results.
 
+The text is parsed and its bases are counted once per distinct content of the text box, cached 
+by the hash of the text, so reruns and the button press reuse the parsed records. A short 
+validation summary is shown below the text box after every edit.
+
 Dependencies:
 - streamlit: For creating the web application interface.
-- Bio.SeqIO: For parsing FASTA formatted sequences.
-- custom modules: `fasta_class`, `error_handling`, `gc_content` for managing FASTA records and 
-errors and calculating GC content.
+- custom modules: `fasta_parser`, `error_handling`, `gc_content` for parsing FASTA records, 
+handling errors and calculating GC content.
 """
 
 
-from io import StringIO
-from Bio import SeqIO
+import hashlib
+from collections import namedtuple
 import streamlit as st
-from fasta_class import FastaRecord
+from fasta_parser import parse_fasta_text
 from error_handling import handle_errors, EntryCheckError
-from gc_content import output_gc_content
+from gc_content import build_results_table, output_results_table
+from timing import span
+
+# Session state key under which the results of the last calculation are kept between reruns,
+# together with the hash of the text they were calculated from
+TEXT_RESULTS_KEY = "text_results"
+# Number of distinct texts whose parsed records are kept, the least recently used is evicted
+TEXT_CACHE_ENTRIES = 8
+
+TextSummary = namedtuple(
+    "TextSummary", ["records", "invalid_headers", "empty_sequences", "n_bases", "other"])
 
 
 def display_results_from_text(fasta):
@@ -26,14 +39,27 @@ def display_results_from_text(fasta):
     Args:
         fasta (str): User-provided FASTA sequences as a string.
 
-    Uses a button to start GC content calculations. 
+    Shows a validation summary of the text first, then uses a button to start GC content 
+    calculations. 
     Catches and handles exceptions using a custom error handler.
+    The results table is kept in the session state, so it stays visible while paging through it. 
+    It is dropped as soon as the text is edited or cleared, so it never shows results of a text 
+    that is no longer in the text box.
     """
+    display_text_feedback(fasta)
+    results = st.session_state.get(TEXT_RESULTS_KEY)
+    if results is not None and (not fasta or results[0] != text_digest(fasta)):
+        del st.session_state[TEXT_RESULTS_KEY]
     if st.button('Calculate GC Content'):
         try:
             process_fasta_from_textinput(fasta)
         except Exception as e:
+            st.session_state.pop(TEXT_RESULTS_KEY, None)
             handle_errors(e)
+    if TEXT_RESULTS_KEY in st.session_state:
+        _, table = st.session_state[TEXT_RESULTS_KEY]
+        with span("render", source="text", records=len(table)):
+            output_results_table(table, "text")
 
 def process_fasta_from_textinput(fasta):
     """
@@ -45,15 +71,17 @@ def process_fasta_from_textinput(fasta):
     Raises:
         EntryCheckError: If the entries are invalid or do not meet requirements.
     
-    Parses FASTA data, checks validity, and uses output_gc_content to display GC content 
-    for each valid entry.
+    Parses FASTA data, checks validity, and stores the results table of all entries with the 
+    hash of the text in the session state, from where display_results_from_text renders it. 
+    The records are usually already parsed and counted by display_text_feedback. Building the 
+    table is logged as a step of the 'render' stage.
     """
-    text_entries = []
-    text_entries = parse_fasta_from_string(fasta)
+    text_entries = get_text_entries(fasta)
 
     if check_entry(text_entries):
-        for entry in text_entries:
-            output_gc_content(entry.id, entry.seq)
+        with span("render", source="text", step="table", records=len(text_entries)):
+            st.session_state[TEXT_RESULTS_KEY] = (
+                text_digest(fasta), build_results_table(text_entries))
     else:
         raise EntryCheckError("Please enter a valid FASTA.")
 
@@ -68,17 +96,103 @@ def parse_fasta_from_string(fasta_string):
     Returns:
         list: A list of FastaRecord instances parsed from the input string.
     
-    Parses FASTA entries using Bio.SeqIO from an in-memory string.
+    Parses FASTA entries with the built-in parser, Biopython is only used if it is requested 
+    with the FASTA_PARSER environment variable.
+    """
+    return parse_fasta_text(fasta_string)
+
+
+@st.cache_resource(max_entries=TEXT_CACHE_ENTRIES, show_spinner=False)
+def parse_fasta_text_once(digest, _fasta):
     """
-    text_entries = []
-    fasta_io = StringIO(fasta_string)
+    Parses FASTA text and counts the bases of every record, cached by the hash of the text.
+
+    Args:
+        digest (str): The SHA-256 hash of the text, used as the cache key.
+        _fasta (str): The FASTA text. The leading underscore excludes it from hashing.
 
-    for record in SeqIO.parse(fasta_io, "fasta"):
-        entry = FastaRecord(record.id, record.seq)
-        text_entries.append(entry)
+    Returns:
+        list: A list of FastaRecord instances with their base counts already computed.
+    """
+    with span("parse", source="text", characters=len(_fasta)) as parse_span:
+        text_entries = parse_fasta_from_string(_fasta)
+        parse_span.set(records=len(text_entries))
+    with span("compute", source="text", records=len(text_entries)):
+        for entry in text_entries:
+            _ = entry.composition
     return text_entries
 
 
+def text_digest(fasta):
+    """
+    Returns the hash of FASTA text, used as the key of its parsed records and results table.
+
+    Args:
+        fasta (str): FASTA formatted text.
+
+    Returns:
+        str: The SHA-256 hash of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(fasta.encode("utf-8")).hexdigest()
+
+
+def get_text_entries(fasta):
+    """
+    Returns the parsed records of FASTA text, parsing it only if the text is new.
+
+    Args:
+        fasta (str): FASTA formatted text.
+
+    Returns:
+        list: A list of FastaRecord instances.
+    """
+    return parse_fasta_text_once(text_digest(fasta), fasta)
+
+
+@span("validate", source="text", check="summary")
+def summarize_entries(text_entries):
+    """
+    Summarizes the validity of parsed FASTA records from their base counts.
+
+    Args:
+        text_entries (list): List of FastaRecord objects.
+
+    Returns:
+        TextSummary: The number of records, of records without an ID, of records without a 
+        sequence, of N bases and of characters other than A, C, G, T and N.
+    """
+    compositions = [entry.composition for entry in text_entries]
+    return TextSummary(
+        records=len(text_entries),
+        invalid_headers=sum(1 for entry in text_entries if not entry.id),
+        empty_sequences=sum(1 for composition in compositions if not composition.length),
+        n_bases=sum(composition.n for composition in compositions),
+        other=sum(composition.other for composition in compositions))
+
+
+def display_text_feedback(fasta):
+    """
+    Displays a short validation summary of the text box content, updated after every edit.
+
+    Args:
+        fasta (str): User-provided FASTA sequences as a string.
+
+    Text that cannot be parsed is reported as a caption instead of a warning, as it may 
+    still be being typed.
+    """
+    if not fasta or not fasta.strip():
+        return
+    try:
+        summary = summarize_entries(get_text_entries(fasta))
+    except Exception as e:
+        st.caption(f"Not a valid FASTA yet: {e}")
+        return
+    st.caption(f"{summary.records} records, {summary.invalid_headers} without ID, "
+               f"{summary.empty_sequences} without sequence, {summary.n_bases} N bases, "
+               f"{summary.other} other non-ACGT characters")
+
+
+@span("validate", source="text")
 def check_entry(text_entries):
     """
     Checks if any of the FASTA entries contain sequences.
@@ -89,6 +203,7 @@ def check_entry(text_entries):
     Returns:
         bool: True if at least one entry has a non-empty sequence, False otherwise.
     
-    Validates that there are entries with sequences available for further processing.
+    Validates that there are entries with sequences available for further processing, using 
+    the base counts of the records instead of decoding their sequences.
     """
-    return any(entry.seq for entry in text_entries)
+    return any(entry.composition.length for entry in text_entries)
@@ -0,0 +1,81 @@
+"""
+Provides lightweight timing spans that log how long a stage of the GC pipeline took.
+
+A span is used as a context manager or as a decorator. When it ends, one record is logged to
+the 'gc.timing' logger with the stage, its duration, whether it raised and any extra fields in
+key=value form, e.g. 'span=parse duration_ms=12.345 status=ok records=200 bytes=1048576'. The
+same values are attached to the record as attributes for handlers that process them.
+
+Classes:
+    Span: Measures and logs the duration of one stage.
+
+Functions:
+    span(stage, **fields): Returns a Span for a stage.
+"""
+
+import functools
+import logging
+import time
+
+TIMING_LOGGER = logging.getLogger("gc.timing")
+
+
+class Span:
+    """
+    Measures the duration of one stage and logs it when the stage ends.
+
+    Attributes:
+        stage (str): The name of the stage, e.g. 'parse', 'validate', 'compute' or 'render'.
+        fields (dict): Extra values logged with the duration, e.g. the number of records.
+
+    Methods:
+        set(**fields): Adds fields while the span is running, e.g. counts known at the end.
+    """
+    def __init__(self, stage, **fields):
+        self.stage = stage
+        self.fields = fields
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        status = "ok" if exc_type is None else "error"
+        details = "".join(f" {key}={value}" for key, value in self.fields.items())
+        TIMING_LOGGER.info("span=%s duration_ms=%.3f status=%s%s", self.stage, duration_ms,
+                           status, details, extra={"span": self.stage, "duration_ms": duration_ms,
+                                                   "status": status, "fields": dict(self.fields)})
+        return False
+
+    def __call__(self, function):
+        # Used as a decorator, every call gets a span of its own
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Span(self.stage, **self.fields):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def set(self, **fields):
+        """
+        Adds fields to the span, logged when it ends.
+
+        Args:
+            **fields: Names and values of the fields.
+        """
+        self.fields.update(fields)
+
+
+def span(stage, **fields):
+    """
+    Returns a span measuring a stage, to be used with 'with' or as a decorator.
+
+    Args:
+        stage (str): The name of the stage.
+        **fields: Extra values logged with the duration.
+
+    Returns:
+        Span: The span of the stage.
+    """
+    return Span(stage, **fields)
@@ -0,0 +1,210 @@
+"""
+This module provides a batch engine that transcribes and translates many DNA sequences at once,
+e.g. all entries of a multi-FASTA file, without going through the SequenceStorage singleton.
+
+Translation uses a precomputed lookup table with one amino acid per codon. The sequences of a
+batch are encoded as NumPy arrays of base codes, every codon is turned into an index into the
+table and all codons of the batch are translated with a single lookup. Large batches are split
+into chunks that are translated in a process pool.
+
+Classes:
+    TranslationResult: DNA, RNA and protein sequence of one input sequence.
+
+Functions:
+    as_bytes(sequence): Converts a sequence to bytes.
+    codon_table(): Returns the lookup table of amino acids by codon index.
+    transcribe_batch(sequences): Transcribes DNA sequences to RNA.
+    translate_batch(sequences): Translates DNA or RNA sequences to proteins.
+    transcribe_and_translate_batch(sequences, workers, ids): Transcribes and translates many
+    sequences, in a process pool for large batches.
+    read_fasta_sequences(file_path): Reads the IDs and sequences of a multi-FASTA file.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import numpy as np
+
+# Base codes in the order of the lookup table, U is translated like T
+IUPAC_BASES = "ACGTRYSWKMBDHVN"
+GAP_CODE = len(IUPAC_BASES)
+INVALID_CODE = GAP_CODE + 1
+CODES = INVALID_CODE + 1
+# Batches with fewer bases are translated in the calling process
+PARALLEL_THRESHOLD = 1_000_000
+# Approximate number of bases per chunk handed to a worker process
+CHUNK_BASES = 1_000_000
+
+TranslationResult = namedtuple("TranslationResult", ["id", "dna", "rna", "protein"])
+
+# Code of every byte value, as used by the codon table
+BASE_CODES = np.full(256, INVALID_CODE, dtype=np.uint16)
+for _code, _base in enumerate(IUPAC_BASES):
+    BASE_CODES[ord(_base)] = BASE_CODES[ord(_base.lower())] = _code
+BASE_CODES[ord("U")] = BASE_CODES[ord("u")] = IUPAC_BASES.index("T")
+BASE_CODES[ord("-")] = GAP_CODE
+
+_TRANSCRIPTION = bytes.maketrans(b"Tt", b"Uu")
+_codon_table = None
+
+
+def codon_table():
+    """
+    Returns the lookup table of the standard genetic code, built on first use.
+
+    Returns:
+        numpy.ndarray: The one-letter amino acid (as uint8) of every codon index
+        CODES * CODES * first + CODES * second + third. Ambiguous codons are translated like
+        Bio.Seq does it and the gap codon '---' gives '-'. Other codons containing gaps or
+        characters other than IUPAC bases give 'X', where Bio.Seq raises a TranslationError.
+    """
+    global _codon_table
+    if _codon_table is None:
+        from Bio.Seq import Seq
+        table = np.full(CODES ** 3, ord("X"), dtype=np.uint8)
+        for first, second, third in product(range(GAP_CODE), repeat=3):
+            codon = IUPAC_BASES[first] + IUPAC_BASES[second] + IUPAC_BASES[third]
+            table[(first * CODES + second) * CODES + third] = ord(str(Seq(codon).translate()))
+        table[(GAP_CODE * CODES + GAP_CODE) * CODES + GAP_CODE] = ord("-")
+        _codon_table = table
+    return _codon_table
+
+
+def _set_codon_table(table):
+    # Process pool initializer, so the workers do not build the table again
+    global _codon_table
+    _codon_table = table
+
+
+def as_bytes(sequence):
+    """
+    Converts a sequence to bytes, without copying it if it already is bytes.
+
+    Args:
+        sequence (str, bytes, bytearray, memoryview or Bio.Seq): The sequence.
+
+    Returns:
+        bytes: The sequence as ASCII bytes.
+    """
+    if isinstance(sequence, bytes):
+        return sequence
+    if isinstance(sequence, (bytearray, memoryview)):
+        return bytes(sequence)
+    return str(sequence).encode("ascii")
+
+
+def transcribe_batch(sequences):
+    """
+    Transcribes DNA sequences to RNA by replacing T with U, keeping the case.
+
+    Args:
+        sequences (list): DNA sequences as str, bytes or Bio.Seq.
+
+    Returns:
+        list: The RNA sequences as str, in the same order.
+    """
+    return [as_bytes(sequence).translate(_TRANSCRIPTION).decode("ascii")
+            for sequence in sequences]
+
+
+def translate_batch(sequences):
+    """
+    Translates DNA or RNA sequences to proteins with one table lookup for all codons.
+
+    Args:
+        sequences (list): DNA or RNA sequences as str, bytes or Bio.Seq.
+
+    Returns:
+        list: The protein sequences as str, in the same order. A trailing partial codon is
+        ignored and stop codons are translated to '*', like Bio.Seq.translate() does it.
+        Codons Bio.Seq.translate() rejects, e.g. 'N-A', are translated to 'X' instead of
+        raising an error.
+    """
+    trimmed = [as_bytes(sequence) for sequence in sequences]
+    trimmed = [sequence[:len(sequence) - len(sequence) % 3] for sequence in trimmed]
+    codes = BASE_CODES[np.frombuffer(b"".join(trimmed), dtype=np.uint8)].reshape(-1, 3)
+    indexes = (codes[:, 0] * CODES + codes[:, 1]) * CODES + codes[:, 2]
+    proteins = codon_table()[indexes].tobytes().decode("ascii")
+
+    results = []
+    start = 0
+    for sequence in trimmed:
+        end = start + len(sequence) // 3
+        results.append(proteins[start:end])
+        start = end
+    return results
+
+
+def _transcribe_and_translate_chunk(sequences):
+    return transcribe_batch(sequences), translate_batch(sequences)
+
+
+def _split_into_chunks(sequences, chunk_bases):
+    chunk = []
+    bases = 0
+    for sequence in sequences:
+        chunk.append(sequence)
+        bases += len(sequence)
+        if bases >= chunk_bases:
+            yield chunk
+            chunk = []
+            bases = 0
+    if chunk:
+        yield chunk
+
+
+def transcribe_and_translate_batch(sequences, workers=None, ids=None):
+    """
+    Transcribes and translates many DNA sequences.
+
+    Args:
+        sequences (list): DNA sequences as str, bytes or Bio.Seq.
+        workers (int, optional): Number of worker processes for batches of at least
+        PARALLEL_THRESHOLD bases, the number of CPUs by default. With 1 the batch is always
+        translated in the calling process.
+        ids (list, optional): An ID per sequence, by default the position in the batch.
+
+    Returns:
+        list: A TranslationResult per sequence, in the same order.
+    """
+    sequences = [as_bytes(sequence) for sequence in sequences]
+    if ids is None:
+        ids = list(range(len(sequences)))
+    workers = workers or os.cpu_count() or 1
+    total = sum(len(sequence) for sequence in sequences)
+
+    if workers == 1 or total < PARALLEL_THRESHOLD:
+        rnas, proteins = _transcribe_and_translate_chunk(sequences)
+    else:
+        chunks = list(_split_into_chunks(sequences, max(CHUNK_BASES, total // (workers * 4))))
+        rnas = []
+        proteins = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_codon_table,
+                                 initargs=(codon_table(),)) as executor:
+            for chunk_rnas, chunk_proteins in executor.map(_transcribe_and_translate_chunk,
+                                                           chunks):
+                rnas.extend(chunk_rnas)
+                proteins.extend(chunk_proteins)
+
+    return [TranslationResult(entry_id, sequence.decode("ascii"), rna, protein)
+            for entry_id, sequence, rna, protein in zip(ids, sequences, rnas, proteins)]
+
+
+def read_fasta_sequences(file_path):
+    """
+    Reads the IDs and sequences of a multi-FASTA file.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+
+    Returns:
+        tuple: A list of IDs and a list of sequences as str, in file order.
+    """
+    from Bio import SeqIO
+    ids = []
+    sequences = []
+    for record in SeqIO.parse(file_path, "fasta"):
+        ids.append(record.id)
+        sequences.append(str(record.seq))
+    return ids, sequences
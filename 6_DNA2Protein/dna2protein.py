@@ -2,6 +2,12 @@
 This module provides tools for DNA and protein sequence manipulation, including
 transcription, translation, and random sequence generation. It utilizes the Singleton
 design pattern for sequence storage and employs a factory pattern for sequence creation.
+Many sequences, e.g. from a multi-FASTA file, are transcribed and translated in one batch by
+the batch_translation module, without the singleton storage. Six-frame translation and the
+search for open reading frames in large sequences are provided by the orf_finder module.
+Many named sequences are kept 2-bit packed, in memory or on disk, by the sequence_store module.
+Translations by DNASequenceTranslator are memoized in a translation_cache.TranslationCache.
+K-mer spectra of large sequence sets are counted by the kmer_counter module.
 
 Classes:
     DNASequenceTranslator: Provides static methods for DNA transcription and translation.
@@ -18,25 +24,63 @@ Functions:
     initialize_storage(sequence): Initializes the sequence storage with a given DNA sequence.
     transcribe_and_translate(storage): Handles transcription and translation of DNA sequence.
     output(storage): Prints the stored sequences.
+    get_option(name): Returns the value of a '--name=value' command line option.
+    batch_output(file_path, workers): Transcribes, translates and prints all sequences of a
+    FASTA file.
+    orf_output(file_path, min_length): Prints the open reading frames of all sequences of a
+    FASTA file.
+    generate_output(file_path): Writes random sequences as set on the command line to a FASTA
+    file.
+    store_output(path): Adds sequences to a sequence store on disk or prints from it.
+    kmer_output(file_paths, k, top, workers, histogram): Prints the most frequent k-mers or the
+    k-mer histogram of FASTA files.
 
 Usage:
     Run the module directly to perform sequence operations and output the results.
+    python dna2protein.py [SEQUENCE]
+    python dna2protein.py --fasta=FILE [--workers=N]
+    python dna2protein.py --orfs=FILE [--min-length=N]
+    python dna2protein.py --generate=FILE --length=N [--records=R] [--gc=X] [--seed=S]
+    [--protein]
+    python dna2protein.py --store=DIR [--add=FILE] [--region=NAME:START-END]
+    python dna2protein.py --kmers=FILE[,FILE...] [--k=N] [--top=N] [--histogram] [--workers=N]
 """
 
 import sys
-import random
 from abc import ABC, abstractmethod
+import numpy as np
 from Bio.Seq import Seq
+from batch_translation import transcribe_and_translate_batch, read_fasta_sequences
+from orf_finder import six_frame_translation, find_orfs, find_orfs_in_fasta, DEFAULT_MIN_LENGTH
+from sequence_store import SequenceStore
+from translation_cache import TranslationCache
+from kmer_counter import count_kmers_in_files
+
+# Number of residues a generator draws at a time when streaming
+GENERATOR_CHUNK_SIZE = 4 * 1024 * 1024
 
 
 class DNASequenceTranslator:
     """
     Provides static methods for DNA transcription to RNA and RNA translation to protein.
 
+    Attributes:
+        translation_cache (TranslationCache): Memoizes the translations, replace it to change
+        its memory bound.
+
     Static Methods:
         transcribe_dna_to_rna(dna, storage): Transcribes DNA to RNA, stores the result.
-        translate_rna_to_protein(rna, storage): Translates RNA to protein, stores the result.
+        translate_rna_to_protein(rna, storage): Translates RNA to protein, served from the
+        translation cache where possible, stores the result.
+        transcribe_and_translate_batch(sequences, workers, ids): Transcribes and translates
+        many DNA sequences and returns the results per sequence, without storing them.
+        six_frame_translation(dna): Translates the three forward and three reverse frames.
+        find_orfs(dna, min_length): Finds the open reading frames on both strands, reading
+        the sequence or an iterable of its chunks chunk by chunk.
+        cache_stats(): Returns the hit and miss statistics of the translation cache.
     """
+    translation_cache = TranslationCache()
+
     # this is a utility class containing static methods
     @staticmethod
     def transcribe_dna_to_rna(dna, storage):
@@ -47,10 +91,26 @@ class DNASequenceTranslator:
 
     @staticmethod
     def translate_rna_to_protein(rna, storage):
-        result = rna.translate()
+        result = Seq(DNASequenceTranslator.translation_cache.translate(rna))
         storage.save('Protein', result)
         # return storage #returns the storage object
 
+    @staticmethod
+    def transcribe_and_translate_batch(sequences, workers=None, ids=None):
+        return transcribe_and_translate_batch(sequences, workers, ids)
+
+    @staticmethod
+    def six_frame_translation(dna):
+        return six_frame_translation(dna)
+
+    @staticmethod
+    def find_orfs(dna, min_length=DEFAULT_MIN_LENGTH):
+        return find_orfs(dna, min_length)
+
+    @staticmethod
+    def cache_stats():
+        return DNASequenceTranslator.translation_cache.stats()
+
 
 class SequenceFactory:
     """
@@ -115,17 +175,89 @@ class SequenceGenerator(ABC):
     Abstract base class for sequence generators.
 
     This class defines a template for creating sequences, ensuring that all concrete
-    implementations provide their own sequence creation methods.
+    implementations provide their own sequence creation methods. Residues are drawn with
+    NumPy for a whole sequence or chunk at once, from a seeded random generator and with
+    optional residue frequencies.
+
+    Attributes:
+        seed (int or None): The seed of the random generator, None for a random seed.
+        frequencies (dict or None): Relative frequency per residue, uniform if None.
 
     Methods:
         create_sequence(n): Abstract method to create a sequence of length n.
+        iter_chunks(n, chunk_size): Yields a sequence of length n in chunks of bytes.
+        write_fasta(file_path, lengths, prefix, line_width, chunk_size): Streams sequences
+        to a FASTA file.
+
+    A generator with the same seed and frequencies always produces the same residues, no
+    matter in which chunk sizes they are drawn.
     """
     # this is an abstract base class so the individual classes
     # can make use of polymorphism
+    def __init__(self, seed=None, frequencies=None):
+        self.seed = seed
+        self.frequencies = frequencies
+        self._rng = np.random.default_rng(seed)
+        residues = self._residues()
+        weights = np.array([frequencies.get(residue, 0) if frequencies else 1
+                            for residue in residues], dtype=np.float64)
+        unknown = set(frequencies or {}) - set(residues)
+        if unknown or weights.sum() <= 0 or (weights < 0).any():
+            raise ValueError(f"Invalid residue frequencies: {frequencies}")
+        self._cumulative = np.cumsum(weights / weights.sum())
+        self._cumulative[-1] = 1.0
+        self._letters = np.frombuffer("".join(residues).encode("ascii"), dtype=np.uint8)
+
+    @abstractmethod
+    def _residues(self):
+        pass
+
     @abstractmethod
     def create_sequence(self, n):
         pass
 
+    def _draw(self, n):
+        # One uniform number per residue, mapped to a residue by the cumulative frequencies
+        indexes = np.searchsorted(self._cumulative, self._rng.random(n), side="right")
+        return self._letters[indexes]
+
+    def iter_chunks(self, n, chunk_size=GENERATOR_CHUNK_SIZE):
+        """
+        Generates a sequence of length n chunk by chunk.
+
+        Args:
+            n (int): The length of the sequence.
+            chunk_size (int): The number of residues per chunk.
+
+        Yields:
+            bytes: The next chunk of the sequence.
+        """
+        for start in range(0, n, chunk_size):
+            yield self._draw(min(chunk_size, n - start)).tobytes()
+
+    def write_fasta(self, file_path, lengths, prefix="seq", line_width=60,
+                    chunk_size=GENERATOR_CHUNK_SIZE):
+        """
+        Streams random sequences to a FASTA file in chunks of fixed size, so the size of the
+        file is not limited by the memory.
+
+        Args:
+            file_path (str): The path to the FASTA file, overwritten if it exists.
+            lengths (list): The length of each sequence.
+            prefix (str): The IDs of the sequences are the prefix followed by a number.
+            line_width (int): The number of residues per line.
+            chunk_size (int): The number of residues generated at a time, rounded down to a
+            multiple of line_width.
+        """
+        chunk_size = max(line_width, chunk_size // line_width * line_width)
+        with open(file_path, "wb") as handle:
+            for number, length in enumerate(lengths, start=1):
+                handle.write(f">{prefix}{number} length={length}\n".encode("ascii"))
+                for start in range(0, length, chunk_size):
+                    residues = self._draw(min(chunk_size, length - start)).tobytes()
+                    handle.writelines(residues[line:line + line_width] + b"\n"
+                                      for line in range(0, len(residues), line_width))
+
 
 class DNASequenceGenerator(SequenceGenerator):
     """
@@ -140,12 +272,26 @@ class DNASequenceGenerator(SequenceGenerator):
     # individual class using polymorphism
     alphabet = ['A', 'C', 'G', 'T']
 
+    def __init__(self, seed=None, gc_content=None, frequencies=None):
+        """
+        Args:
+            seed (int, optional): The seed of the random generator.
+            gc_content (float, optional): The expected fraction of G and C, with A and T
+            as well as G and C equally frequent. Overrides frequencies.
+            frequencies (dict, optional): Relative frequency per nucleotide.
+        """
+        if gc_content is not None:
+            if not 0 <= gc_content <= 1:
+                raise ValueError("The GC content must be between 0 and 1.")
+            frequencies = {'A': (1 - gc_content) / 2, 'T': (1 - gc_content) / 2,
+                           'C': gc_content / 2, 'G': gc_content / 2}
+        super().__init__(seed, frequencies)
+
+    def _residues(self):
+        return DNASequenceGenerator.alphabet
+
     def create_sequence(self, n):
-        result = ''
-        for i in range(n):
-            idx = random.randint(0, len(DNASequenceGenerator.alphabet) - 1)
-            result = result + DNASequenceGenerator.alphabet[idx]
-        return result
+        return self._draw(n).tobytes().decode("ascii")
 
 
 class ProteinSequenceGenerator(SequenceGenerator):
@@ -162,18 +308,48 @@ class ProteinSequenceGenerator(SequenceGenerator):
     # List of one-letter codes for standard amino acids
     amino_acids = ['A', 'R', 'N', 'D', 'C', 'Q', 'E', 'G', 'H', 'I', 'L', 'K', 'M', 'F', 'P', 'S', 'T', 'W', 'Y', 'V']
 
+    def _residues(self):
+        return ProteinSequenceGenerator.amino_acids
+
     def create_sequence(self, n):
-        result = ''
-        for i in range(n):
-            idx = random.randint(0, len(ProteinSequenceGenerator.amino_acids) - 1)
-            result = result + ProteinSequenceGenerator.amino_acids[idx]
-        return result
+        return self._draw(n).tobytes().decode("ascii")
 
 
 def main():
     """
     Main function to orchestrate sequence operations and output results.
+    With the --fasta=FILE option all sequences of the file are translated in one batch instead,
+    with the --orfs=FILE option the open reading frames of its sequences are listed and with
+    the --generate=FILE option random sequences are written to the file. The --store=DIR option
+    works with a sequence store in the directory and the --kmers=FILE[,FILE...] option counts the
+    k-mers of the files.
     """
+    fasta_file = get_option('fasta')
+    if fasta_file:
+        workers = get_option('workers')
+        batch_output(fasta_file, int(workers) if workers else None)
+        return
+    orf_file = get_option('orfs')
+    if orf_file:
+        min_length = get_option('min-length')
+        orf_output(orf_file, int(min_length) if min_length else DEFAULT_MIN_LENGTH)
+        return
+    generate_file = get_option('generate')
+    if generate_file:
+        generate_output(generate_file)
+        return
+    store_path = get_option('store')
+    if store_path:
+        store_output(store_path)
+        return
+    kmer_files = get_option('kmers')
+    if kmer_files:
+        workers = get_option('workers')
+        kmer_output(kmer_files.split(','), int(get_option('k') or 21),
+                    int(get_option('top') or 10), int(workers) if workers else None,
+                    '--histogram' in sys.argv[1:])
+        return
+
     sequence = initialize_sequence()
     storage = initialize_storage(sequence)
 
@@ -238,5 +414,133 @@ def output(storage):
     print("Protein Sequence:", storage.read('Protein'))
 
 
+def get_option(name):
+    """
+    Returns the value of a command line option given as --name=value.
+
+    Args:
+        name (str): The name of the option without the leading dashes.
+
+    Returns:
+        str: The value of the option, or None if it is not given.
+    """
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return None
+
+
+def batch_output(file_path, workers=None):
+    """
+    Transcribes and translates all sequences of a FASTA file in one batch and prints them.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        workers (int, optional): Number of worker processes for large files.
+    """
+    ids, sequences = read_fasta_sequences(file_path)
+    results = DNASequenceTranslator.transcribe_and_translate_batch(sequences, workers, ids)
+    for result in results:
+        print(f"\n{result.id}")
+        print("DNA Sequence:", result.dna)
+        print("RNA Sequence:", result.rna)
+        print("Protein Sequence:", result.protein)
+
+
+def orf_output(file_path, min_length=DEFAULT_MIN_LENGTH):
+    """
+    Prints the open reading frames of all sequences of a FASTA file as tab-separated lines.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        min_length (int): Minimum number of amino acids of an ORF, without the stop codon.
+
+    The sequences are read in chunks, so also chromosome-sized files can be scanned.
+    """
+    print("ID\tStrand\tFrame\tStart\tEnd\tLength\tProtein")
+    for record_id, orf in find_orfs_in_fasta(file_path, min_length):
+        print(f"{record_id}\t{orf.strand}\t{orf.frame}\t{orf.start}\t{orf.end}\t{orf.length}"
+              f"\t{orf.protein}")
+
+
+def generate_output(file_path):
+    """
+    Writes random sequences to a FASTA file, as set by the --length=N, --records=R, --gc=X,
+    --seed=S and --protein options.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+    """
+    length = int(get_option('length') or 1000)
+    records = int(get_option('records') or 1)
+    seed = get_option('seed')
+    seed = int(seed) if seed else None
+    if '--protein' in sys.argv[1:]:
+        generator = ProteinSequenceGenerator(seed)
+    else:
+        gc_content = get_option('gc')
+        generator = DNASequenceGenerator(seed, float(gc_content) if gc_content else None)
+    generator.write_fasta(file_path, [length] * records)
+    print(f"Wrote {records} sequences of length {length} to {file_path}")
+
+
+def store_output(path):
+    """
+    Works with the sequence store in a directory: with --add=FILE the sequences of a FASTA file
+    are added, with --region=NAME:START-END a region of a sequence is printed (0-based, end
+    excluded, NAME alone prints the whole sequence) and otherwise the stored sequences are listed.
+    Exits with status 1 if the sequence of the region is not in the store.
+
+    Args:
+        path (str): The directory of the store, created if it does not exist.
+    """
+    with SequenceStore(path) as store:
+        fasta_file = get_option('add')
+        region = get_option('region')
+        if fasta_file:
+            names = store.add_fasta(fasta_file)
+            print(f"Added {len(names)} sequences to {path}")
+        elif region:
+            # IDs may contain ':' themselves, so the last one separates the positions unless
+            # the whole option is a stored name
+            name, positions = region, ''
+            if region not in store and ':' in region:
+                name, _, positions = region.rpartition(':')
+            start, _, end = positions.partition('-')
+            try:
+                print(store.fetch(name, int(start or 0), int(end) if end else None))
+            except KeyError:
+                print(f"Error: The sequence '{name}' was not found in the store {path}.")
+                sys.exit(1)
+        else:
+            for name in store.names():
+                print(f"{name}\t{store.length(name)}")
+
+
+def kmer_output(file_paths, k, top=10, workers=None, histogram=False):
+    """
+    Counts the canonical k-mers of FASTA files and prints the most frequent ones or the number
+    of distinct k-mers per count, as tab-separated lines.
+
+    Args:
+        file_paths (list): The paths to the FASTA files.
+        k (int): The length of the k-mers, 1 to 31.
+        top (int): The number of k-mers printed.
+        workers (int, optional): Number of worker processes, one file per process.
+        histogram (bool): Print the k-mer histogram instead of the most frequent k-mers, set
+        by the --histogram option.
+    """
+    counts = count_kmers_in_files(file_paths, k, workers=workers)
+    if histogram:
+        print("Count\tK-mers")
+        for multiplicity, number in counts.histogram():
+            print(f"{multiplicity}\t{number}")
+    else:
+        print("K-mer\tCount")
+        for kmer, count in counts.top(top):
+            print(f"{kmer}\t{count}")
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,347 @@
+"""
+This module counts the k-mers (k up to 31) of large sets of DNA sequences, e.g. for the k-mer
+spectrum in quality control.
+
+Every k-mer is encoded in 2 bits per base as a 64-bit integer, A=0, C=1, G=2 and T=3 with the
+first base in the highest bits, and by default counted as its canonical form, the smaller of the
+k-mer and its reverse complement. The codes of all k-mers of a chunk are computed with NumPy,
+rolling the windows up by doubling their length, and k-mers containing other characters than
+A, C, G, T or U are skipped. The k-mers are counted by sorting, so the counts are kept in two
+arrays of k-mers and counts instead of a dictionary entry per k-mer. The sorted counts of several
+chunks or files are merged in linear time, chunks of similar size first, and several files are
+counted in a process pool.
+
+Classes:
+    KmerCounts: Sorted k-mers with their counts.
+
+Functions:
+    encode_kmers(sequence, k, canonical): Returns the 2-bit codes of the k-mers of a sequence.
+    decode_kmer(code, k): Returns the bases of a 2-bit encoded k-mer.
+    merge_counts(parts, k): Merges the counts of several chunks or files.
+    count_kmers(sequences, k, canonical): Counts the k-mers of sequences in memory.
+    count_kmers_in_fasta(file_path, k, canonical, chunk_size): Counts the k-mers of a FASTA
+    file, reading it in chunks.
+    count_kmers_in_files(file_paths, k, canonical, workers): Counts the k-mers of several
+    FASTA files in parallel and merges the counts.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from orf_finder import iter_fasta_chunks, DEFAULT_CHUNK_SIZE
+
+MAX_K = 31
+
+_INVALID = 255
+_CODES = np.full(256, _INVALID, dtype=np.uint8)
+for _code, _bases in enumerate((b"Aa", b"Cc", b"Gg", b"TtUu")):
+    for _base in _bases:
+        _CODES[_base] = _code
+_LETTERS = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+
+def _check_k(k):
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+
+
+def _window_codes(codes, k):
+    # Codes of all windows of k bases, built from windows of 1, 2, 4, ... bases
+    result = None
+    length = 0
+    power = codes.astype(np.uint64)
+    size = 1
+    remaining = k
+    while remaining:
+        if remaining & 1:
+            if result is None:
+                result = power
+            else:
+                count = len(result) - size
+                result = (result[:count] << np.uint64(2 * size)) | power[length:length + count]
+            length += size
+        remaining >>= 1
+        if remaining:
+            power = (power[:len(power) - size] << np.uint64(2 * size)) | power[size:]
+            size *= 2
+    return result
+
+
+def encode_kmers(sequence, k, canonical=True):
+    """
+    Returns the 2-bit codes of all k-mers of a sequence that contain only A, C, G and T (or U).
+
+    Args:
+        sequence (str or bytes): The sequence.
+        k (int): The length of the k-mers, 1 to 31.
+        canonical (bool): Whether to return the smaller code of each k-mer and its reverse
+        complement.
+
+    Returns:
+        numpy.ndarray: The codes as uint64, in the order of the k-mers in the sequence.
+    """
+    _check_k(k)
+    data = sequence if isinstance(sequence, bytes) else str(sequence).encode("ascii")
+    if len(data) < k:
+        return np.zeros(0, dtype=np.uint64)
+    codes = _CODES[np.frombuffer(data, dtype=np.uint8)]
+    invalid = codes == _INVALID
+    codes[invalid] = 0
+    kmers = _window_codes(codes, k)
+    if canonical:
+        reverse = _window_codes((3 - codes)[::-1], k)[::-1]
+        kmers = np.minimum(kmers, reverse)
+    if invalid.any():
+        invalid_counts = np.concatenate(([0], np.cumsum(invalid)))
+        kmers = kmers[invalid_counts[k:] == invalid_counts[:-k]]
+    return kmers
+
+
+def decode_kmer(code, k):
+    """
+    Returns the bases of a 2-bit encoded k-mer.
+
+    Args:
+        code (int): The code of the k-mer.
+        k (int): The length of the k-mer.
+
+    Returns:
+        str: The bases of the k-mer.
+    """
+    shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint64)
+    return _LETTERS[(np.uint64(code) >> shifts) & np.uint64(3)].tobytes().decode("ascii")
+
+
+def _count_sorted(kmers):
+    # Counts the k-mers by sorting them, returns the distinct k-mers and their counts
+    kmers = np.sort(kmers)
+    if len(kmers) == 0:
+        return kmers, np.zeros(0, dtype=np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(kmers[1:] != kmers[:-1]) + 1))
+    return kmers[starts], np.diff(np.append(starts, len(kmers)))
+
+
+def _merge_two(first, second):
+    # Merges two sorted counts without sorting again, a k-mer is at most once in each of them
+    positions = np.searchsorted(first.kmers, second.kmers) + np.arange(len(second.kmers))
+    from_second = np.zeros(len(first.kmers) + len(second.kmers), dtype=bool)
+    from_second[positions] = True
+    kmers = np.empty(len(from_second), dtype=np.uint64)
+    counts = np.empty(len(from_second), dtype=np.int64)
+    kmers[positions] = second.kmers
+    counts[positions] = second.counts
+    kmers[~from_second] = first.kmers
+    counts[~from_second] = first.counts
+    del positions, from_second
+    # A k-mer of both is now in two neighbouring places, the first one gets the sum
+    repeated = kmers[1:] == kmers[:-1]
+    if not repeated.any():
+        return KmerCounts(first.k, kmers, counts)
+    counts[:-1][repeated] += counts[1:][repeated]
+    keep = np.concatenate(([True], ~repeated))
+    return KmerCounts(first.k, kmers[keep], counts[keep])
+
+
+def merge_counts(parts, k):
+    """
+    Merges the counts of several chunks or files.
+
+    Args:
+        parts (list): The KmerCounts to merge, all of the same k.
+        k (int): The length of the k-mers.
+
+    Returns:
+        KmerCounts: The summed counts.
+    """
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return KmerCounts(k, np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64))
+    while len(parts) > 1:
+        merged = [_merge_two(parts[index], parts[index + 1])
+                  for index in range(0, len(parts) - 1, 2)]
+        parts = merged + parts[len(merged) * 2:]
+    return parts[0]
+
+
+class KmerCounts:
+    """
+    The distinct k-mers of a set of sequences with their counts, sorted by their 2-bit codes.
+
+    Attributes:
+        k (int): The length of the k-mers.
+        kmers (numpy.ndarray): The codes of the distinct k-mers as sorted uint64.
+        counts (numpy.ndarray): The count of each k-mer.
+
+    Methods:
+        count(kmer): Returns the count of one k-mer.
+        total(): Returns the number of all counted k-mers.
+        top(n): Returns the most frequent k-mers.
+        histogram(): Returns the number of distinct k-mers per count.
+    """
+    def __init__(self, k, kmers, counts):
+        self.k = k
+        self.kmers = kmers
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.kmers)
+
+    def count(self, kmer, canonical=True):
+        """
+        Returns the count of one k-mer.
+
+        Args:
+            kmer (str): The bases of the k-mer.
+            canonical (bool): Whether the k-mers were counted in their canonical form.
+
+        Returns:
+            int: How often the k-mer (or its reverse complement, if canonical) occurred.
+        """
+        if len(kmer) != self.k:
+            return 0
+        codes = encode_kmers(kmer, self.k, canonical)
+        if len(codes) != 1:
+            return 0
+        index = np.searchsorted(self.kmers, codes[0])
+        if index < len(self.kmers) and self.kmers[index] == codes[0]:
+            return int(self.counts[index])
+        return 0
+
+    def total(self):
+        """
+        Returns the number of all counted k-mers.
+
+        Returns:
+            int: The sum of the counts.
+        """
+        return int(self.counts.sum())
+
+    def top(self, n=10):
+        """
+        Returns the most frequent k-mers.
+
+        Args:
+            n (int): The number of k-mers.
+
+        Returns:
+            list: Tuples of the bases and the count of the k-mers, the most frequent first and
+            k-mers with equal counts in the order of their codes.
+        """
+        n = min(n, len(self.counts))
+        if n <= 0:
+            return []
+        threshold = np.partition(self.counts, len(self.counts) - n)[len(self.counts) - n]
+        above = np.flatnonzero(self.counts > threshold)
+        equal = np.flatnonzero(self.counts == threshold)[:n - len(above)]
+        candidates = np.concatenate((above, equal))
+        candidates = candidates[np.lexsort((candidates, -self.counts[candidates]))]
+        return [(decode_kmer(self.kmers[index], self.k), int(self.counts[index]))
+                for index in candidates]
+
+    def histogram(self):
+        """
+        Returns the k-mer spectrum, the number of distinct k-mers per count.
+
+        Returns:
+            list: Tuples of a count and the number of distinct k-mers occurring that often,
+            ordered by count.
+        """
+        multiplicities, numbers = np.unique(self.counts, return_counts=True)
+        return [(int(multiplicity), int(number))
+                for multiplicity, number in zip(multiplicities, numbers)]
+
+
+class _Counter:
+    # Collects the counts of chunks, merging the newest parts while they are of similar size,
+    # so few parts are kept and every k-mer is merged only a logarithmic number of times
+    def __init__(self, k):
+        self.k = k
+        self.parts = []
+
+    def add(self, kmers):
+        self.parts.append(KmerCounts(self.k, *_count_sorted(kmers)))
+        while len(self.parts) > 1 and 2 * len(self.parts[-1]) >= len(self.parts[-2]):
+            second = self.parts.pop()
+            first = self.parts.pop()
+            self.parts.append(merge_counts([first, second], self.k))
+
+    def result(self):
+        parts = self.parts
+        self.parts = []
+        return merge_counts(parts, self.k)
+
+
+def count_kmers(sequences, k, canonical=True):
+    """
+    Counts the k-mers of sequences in memory.
+
+    Args:
+        sequences (str, bytes or list): A sequence or a list of sequences, k-mers are not
+        counted across the ends of sequences.
+        k (int): The length of the k-mers, 1 to 31.
+        canonical (bool): Whether to count each k-mer together with its reverse complement.
+
+    Returns:
+        KmerCounts: The counts of the k-mers.
+    """
+    _check_k(k)
+    if isinstance(sequences, (str, bytes)):
+        sequences = [sequences]
+    counter = _Counter(k)
+    for sequence in sequences:
+        counter.add(encode_kmers(sequence, k, canonical))
+    return counter.result()
+
+
+def count_kmers_in_fasta(file_path, k, canonical=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Counts the k-mers of all sequences of a FASTA file, reading them in chunks.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        k (int): The length of the k-mers, 1 to 31.
+        canonical (bool): Whether to count each k-mer together with its reverse complement.
+        chunk_size (int): Approximate number of bases read at a time.
+
+    Returns:
+        KmerCounts: The counts of the k-mers.
+    """
+    _check_k(k)
+    counter = _Counter(k)
+    tail = b""
+    for _, chunk, first in iter_fasta_chunks(file_path, chunk_size):
+        # The last k - 1 bases are kept, so k-mers across chunk borders are counted once
+        data = chunk if first else tail + chunk
+        counter.add(encode_kmers(data, k, canonical))
+        tail = data[max(0, len(data) - (k - 1)):] if k > 1 else b""
+    return counter.result()
+
+
+def _count_file(arguments):
+    return count_kmers_in_fasta(*arguments)
+
+
+def count_kmers_in_files(file_paths, k, canonical=True, workers=None):
+    """
+    Counts the k-mers of several FASTA files, one file per worker process, and merges the
+    counts.
+
+    Args:
+        file_paths (list): The paths to the FASTA files.
+        k (int): The length of the k-mers, 1 to 31.
+        canonical (bool): Whether to count each k-mer together with its reverse complement.
+        workers (int, optional): Number of worker processes, the number of CPUs by default.
+        With 1 the files are counted in the calling process.
+
+    Returns:
+        KmerCounts: The counts of the k-mers of all files.
+    """
+    _check_k(k)
+    workers = min(workers or os.cpu_count() or 1, len(file_paths)) or 1
+    arguments = [(file_path, k, canonical) for file_path in file_paths]
+    if workers == 1:
+        parts = [_count_file(argument) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_count_file, arguments))
+    return merge_counts(parts, k)
@@ -0,0 +1,365 @@
+"""
+This module provides six-frame translation and an open reading frame (ORF) finder that streams
+over chromosome-scale sequences in chunks.
+
+All six frames are translated in one pass over the bases: every codon position of the forward
+strand is looked up once in the codon table of batch_translation for the forward frame, and
+once with complemented bases in reverse order for the frame of the reverse complement that
+covers the same bases. The ORF finder keeps the last two bases of a chunk and the state of each
+frame between chunks, so ORFs crossing chunk boundaries are found without ever holding the
+whole sequence or its reverse complement in memory.
+
+An ORF starts with the first ATG after a stop codon of its frame and ends with the next stop
+codon. ORFs running off the end of the sequence without a stop codon are not reported.
+
+Classes:
+    ORF: Coordinates, length and protein of one open reading frame.
+    OrfScanner: Finds the ORFs of a sequence that is fed in chunks.
+
+Functions:
+    six_frame_translation(sequence): Translates the three forward and three reverse frames.
+    find_orfs(sequence, min_length, chunk_size, with_protein): Finds the ORFs of a sequence.
+    iter_fasta_chunks(file_path, chunk_size): Reads the sequences of a FASTA file in chunks.
+    find_orfs_in_fasta(file_path, min_length, chunk_size, with_protein): Finds the ORFs of
+    all sequences of a FASTA file.
+"""
+
+from collections import namedtuple
+import numpy as np
+from batch_translation import codon_table, as_bytes, IUPAC_BASES, CODES, INVALID_CODE, BASE_CODES
+
+DEFAULT_MIN_LENGTH = 100
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+STOP = ord("*")
+START = ord("M")
+
+# start and end are 0-based forward strand coordinates, end exclusive, including the stop
+# codon; length is the number of amino acids without the stop codon
+ORF = namedtuple("ORF", ["strand", "frame", "start", "end", "length", "protein"])
+
+_COMPLEMENT_CODES = np.arange(CODES, dtype=np.uint16)
+for _base, _complement in zip("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN"):
+    _COMPLEMENT_CODES[IUPAC_BASES.index(_base)] = IUPAC_BASES.index(_complement)
+_COMPLEMENT_CODES[INVALID_CODE] = INVALID_CODE
+
+
+def _translate_codons(codes, first, count):
+    # Translates count codons starting at index first on the forward and the reverse strand
+    codons = codes[first:first + 3 * count].reshape(-1, 3)
+    table = codon_table()
+    forward = table[(codons[:, 0] * CODES + codons[:, 1]) * CODES + codons[:, 2]]
+    complement = _COMPLEMENT_CODES[codons]
+    reverse = table[(complement[:, 2] * CODES + complement[:, 1]) * CODES + complement[:, 0]]
+    return forward, reverse
+
+
+def six_frame_translation(sequence):
+    """
+    Translates all six reading frames of a DNA or RNA sequence.
+
+    Args:
+        sequence (str, bytes or Bio.Seq): The sequence.
+
+    Returns:
+        dict: The proteins of frames 1, 2 and 3 of the sequence and -1, -2 and -3 of its
+        reverse complement, each starting at offset 0, 1 and 2 of its strand, the same as
+        Bio.Seq.translate() gives for these frames.
+    """
+    data = as_bytes(sequence)
+    codes = BASE_CODES[np.frombuffer(data, dtype=np.uint8)]
+    frames = {}
+    for offset in range(3):
+        count = (len(data) - offset) // 3
+        forward, _ = _translate_codons(codes, offset, max(count, 0))
+        frames[offset + 1] = forward.tobytes().decode("ascii")
+        # Frame -k starts at offset k - 1 of the reverse complement, i.e. its codons end
+        # k - 1 bases before the end of the forward strand
+        first = (len(data) - offset) % 3
+        _, reverse = _translate_codons(codes, first, max(count, 0))
+        frames[-(offset + 1)] = reverse[::-1].tobytes().decode("ascii")
+    return frames
+
+
+class OrfScanner:
+    """
+    Finds the open reading frames of a sequence that is fed in chunks.
+
+    Attributes:
+        min_length (int): Minimum number of amino acids of a reported ORF, without the stop.
+        with_protein (bool): Whether the protein of each ORF is collected and reported.
+        sequence_length (int or None): The total length of the sequence if known in advance.
+
+    Methods:
+        feed(chunk): Scans the next chunk of the sequence and returns the ORFs it completed.
+        finish(): Returns the remaining ORFs once the whole sequence has been fed.
+
+    ORFs of the forward strand are returned as soon as their stop codon is read. The frame
+    number of an ORF on the reverse strand depends on the total length of the sequence, so
+    these ORFs are only returned by finish() unless sequence_length is given.
+    """
+    def __init__(self, min_length=DEFAULT_MIN_LENGTH, with_protein=True, sequence_length=None):
+        self.min_length = min_length
+        self.with_protein = with_protein
+        self.sequence_length = sequence_length
+        self._offset = 0
+        self._tail = b""
+        # Per phase of the codon start: start of the open ORF and its protein pieces
+        self._forward = [[None, []] for _ in range(3)]
+        # Per phase: position of the last stop codon, of the last start codon above it and
+        # the translated pieces above the stop codon
+        self._reverse = [[None, None, []] for _ in range(3)]
+        self._pending = []
+
+    def feed(self, chunk):
+        """
+        Scans the next chunk of the sequence.
+
+        Args:
+            chunk (str, bytes or Bio.Seq): The next bases of the sequence, without line breaks.
+
+        Returns:
+            list: The ORFs completed by this chunk, as ORF tuples.
+        """
+        data = self._tail + as_bytes(chunk)
+        codes = BASE_CODES[np.frombuffer(data, dtype=np.uint8)]
+        orfs = []
+        for phase in range(3):
+            first = (phase - self._offset) % 3
+            count = (len(data) - first) // 3
+            if count <= 0:
+                continue
+            forward, reverse = _translate_codons(codes, first, count)
+            position = self._offset + first
+            orfs.extend(self._scan_forward(phase, forward, position))
+            orfs.extend(self._scan_reverse(phase, reverse, position))
+        # Codons starting in the last two bases are completed by the next chunk
+        self._tail = data[-2:] if len(data) >= 2 else data
+        self._offset += len(data) - len(self._tail)
+        return orfs
+
+    def finish(self):
+        """
+        Returns the ORFs that could only be completed at the end of the sequence.
+
+        Returns:
+            list: The remaining ORFs of the reverse strand, as ORF tuples.
+        """
+        length = self._offset + len(self._tail)
+        orfs = []
+        for phase, (stop, start, pieces) in enumerate(self._reverse):
+            # Above the last stop codon of the frame nothing ends the ORF on the reverse strand
+            if stop is not None and start is not None:
+                orfs.extend(self._reverse_orf(stop, start, pieces))
+            self._reverse[phase] = [None, None, []]
+        orfs = [self._with_reverse_frame(orf, length) for orf in self._pending + orfs]
+        self._pending = []
+        self._forward = [[None, []] for _ in range(3)]
+        return orfs
+
+    def _scan_forward(self, phase, aa, position):
+        state = self._forward[phase]
+        stops = np.flatnonzero(aa == STOP)
+        starts = np.flatnonzero(aa == START)
+        orfs = []
+        previous = 0
+        if len(stops):
+            # The first start codon of each segment between two stop codons, found for all
+            # segments at once; only ORFs long enough are turned into tuples
+            begins = np.concatenate(([0], stops[:-1] + 1))
+            first_starts = _first_at_or_after(starts, begins, stops)
+            if state[0] is not None:
+                orfs.extend(self._forward_orf(phase, state[0], state[1], aa, position,
+                                              0, int(stops[0])))
+                first_starts[0] = -1
+            lengths = stops - first_starts
+            for index in np.flatnonzero((first_starts >= 0) & (lengths >= self.min_length)):
+                start = int(first_starts[index])
+                orfs.extend(self._forward_orf(phase, position + 3 * start, [], aa, position,
+                                              start, int(stops[index])))
+            state[0] = None
+            state[1] = []
+            previous = int(stops[-1]) + 1
+
+        if state[0] is None:
+            index = np.searchsorted(starts, previous)
+            if index < len(starts):
+                state[0] = position + 3 * int(starts[index])
+                if self.with_protein:
+                    state[1] = [aa[starts[index]:].tobytes()]
+        elif self.with_protein:
+            state[1].append(aa.tobytes())
+        return orfs
+
+    def _forward_orf(self, phase, start, pieces, aa, position, begin, stop):
+        end = position + 3 * stop + 3
+        length = (end - start) // 3 - 1
+        if length < self.min_length:
+            return []
+        protein = None
+        if self.with_protein:
+            protein = (b"".join(pieces) + aa[begin:stop].tobytes()).decode()
+        return [ORF("+", phase + 1, start, end, length, protein)]
+
+    def _scan_reverse(self, phase, aa, position):
+        state = self._reverse[phase]
+        stops = np.flatnonzero(aa == STOP)
+        starts = np.flatnonzero(aa == START)
+        orfs = []
+        previous = 0
+        if len(stops):
+            # The last start codon of each segment, the ORF runs from it down to the stop
+            # codon below the segment
+            begins = np.concatenate(([0], stops[:-1] + 1))
+            last_starts = _last_before(starts, begins, stops)
+            start = position + 3 * int(last_starts[0]) if last_starts[0] >= 0 else state[1]
+            if state[0] is not None and start is not None:
+                pieces = state[2] + [aa[:stops[0]].tobytes()] if self.with_protein else []
+                orfs.extend(self._reverse_orf(state[0], start, pieces))
+            lengths = last_starts[1:] - stops[:-1]
+            for index in np.flatnonzero((last_starts[1:] >= 0) & (lengths >= self.min_length)):
+                stop = int(stops[index])
+                start = int(last_starts[index + 1])
+                pieces = [aa[stop + 1:start + 1].tobytes()] if self.with_protein else []
+                orfs.extend(self._reverse_orf(position + 3 * stop, position + 3 * start, pieces))
+            state[0] = position + 3 * int(stops[-1])
+            state[1] = None
+            state[2] = []
+            previous = int(stops[-1]) + 1
+
+        if len(starts) and starts[-1] >= previous:
+            state[1] = position + 3 * int(starts[-1])
+        if self.with_protein and state[0] is not None:
+            state[2].append(aa[previous:].tobytes())
+        return orfs
+
+    def _reverse_orf(self, stop, start, pieces):
+        end = start + 3
+        length = (end - stop) // 3 - 1
+        if length < self.min_length:
+            return []
+        protein = None
+        if self.with_protein:
+            protein = b"".join(pieces)[:length][::-1].decode()
+        orf = ORF("-", None, stop, end, length, protein)
+        if self.sequence_length is None:
+            self._pending.append(orf)
+            return []
+        return [self._with_reverse_frame(orf, self.sequence_length)]
+
+    def _with_reverse_frame(self, orf, length):
+        if orf.strand == "+" or orf.frame is not None:
+            return orf
+        return orf._replace(frame=-((length - orf.end) % 3 + 1))
+
+
+def _first_at_or_after(positions, begins, ends):
+    # The first position in [begin, end) for each segment, or -1 if there is none
+    index = np.searchsorted(positions, begins)
+    found = positions[np.minimum(index, len(positions) - 1)] if len(positions) else begins
+    return np.where((index < len(positions)) & (found < ends), found, -1)
+
+
+def _last_before(positions, begins, ends):
+    # The last position in [begin, end) for each segment, or -1 if there is none
+    index = np.searchsorted(positions, ends) - 1
+    found = positions[np.maximum(index, 0)] if len(positions) else begins
+    return np.where((index >= 0) & (found >= begins), found, -1)
+
+
+def find_orfs(sequence, min_length=DEFAULT_MIN_LENGTH, chunk_size=DEFAULT_CHUNK_SIZE,
+              with_protein=True):
+    """
+    Finds the ORFs on both strands of a sequence.
+
+    Args:
+        sequence (str, bytes, Bio.Seq or iterable): The sequence, or an iterable of its chunks.
+        min_length (int): Minimum number of amino acids of an ORF, without the stop codon.
+        chunk_size (int): Number of bases scanned at a time if the sequence is given whole.
+        with_protein (bool): Whether the protein of each ORF is reported.
+
+    Yields:
+        ORF: The ORFs of the forward strand in the order of their stop codons, followed by
+        the ORFs of the reverse strand.
+    """
+    if isinstance(sequence, (str, bytes, bytearray)) or hasattr(sequence, "translate"):
+        data = as_bytes(sequence)
+        scanner = OrfScanner(min_length, with_protein, len(data))
+        chunks = (data[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+    else:
+        scanner = OrfScanner(min_length, with_protein)
+        chunks = sequence
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.finish()
+
+
+def iter_fasta_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads the sequences of a FASTA file in chunks, without holding a whole sequence in memory.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        chunk_size (int): Approximate number of bases per chunk.
+
+    Yields:
+        tuple: The ID of the record, the next chunk of its sequence as bytes and whether the
+        chunk is the first one of the record. A record without sequence yields a single
+        empty chunk.
+    """
+    record_id = None
+    first = True
+    pieces = []
+    size = 0
+    with open(file_path, "rb") as handle:
+        for line in handle:
+            if line.startswith(b">"):
+                if record_id is not None:
+                    yield record_id, b"".join(pieces), first
+                words = line[1:].decode("utf-8", errors="replace").split(None, 1)
+                record_id = words[0] if words else ""
+                first = True
+                pieces = []
+                size = 0
+                continue
+            if record_id is None:
+                continue
+            line = line.translate(None, b" \t\r\n")
+            pieces.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield record_id, b"".join(pieces), first
+                first = False
+                pieces = []
+                size = 0
+    if record_id is not None:
+        yield record_id, b"".join(pieces), first
+
+
+def find_orfs_in_fasta(file_path, min_length=DEFAULT_MIN_LENGTH, chunk_size=DEFAULT_CHUNK_SIZE,
+                       with_protein=True):
+    """
+    Finds the ORFs of all sequences of a FASTA file, reading each sequence in chunks.
+
+    Args:
+        file_path (str): The path to the FASTA file.
+        min_length (int): Minimum number of amino acids of an ORF, without the stop codon.
+        chunk_size (int): Approximate number of bases read at a time.
+        with_protein (bool): Whether the protein of each ORF is reported.
+
+    Yields:
+        tuple: The ID of the record and an ORF found in its sequence.
+    """
+    current_id = None
+    scanner = None
+    for record_id, chunk, first in iter_fasta_chunks(file_path, chunk_size):
+        if first:
+            if scanner is not None:
+                for orf in scanner.finish():
+                    yield current_id, orf
+            current_id = record_id
+            scanner = OrfScanner(min_length, with_protein)
+        for orf in scanner.feed(chunk):
+            yield record_id, orf
+    if scanner is not None:
+        for orf in scanner.finish():
+            yield current_id, orf
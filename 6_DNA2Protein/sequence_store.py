@@ -0,0 +1,410 @@
+"""
+This module provides a keyed store for many named DNA sequences, packed at 2 bits per base.
+
+Like the UCSC .2bit format, A, C, G and T are packed four to a byte. Every other character,
+e.g. N or an IUPAC ambiguity code, is kept in a list of exception blocks (start, length and
+character of each run) and lowercase (soft-masked) runs in a list of mask blocks, so the
+sequences are restored exactly. A region is read by unpacking only the bytes that cover it and
+applying the blocks that overlap it.
+
+The store lives in memory or, if it is given a directory, in files in that directory: the packed
+bases and the blocks are appended to binary files that are memory-mapped for reading, and an
+index in JSON points to each sequence. The index is written once after add_fasta and on close,
+not after every sequence, so adding many sequences takes linear time. A store on disk can hold
+more than fits into memory and is reopened by reading the index only.
+
+Classes:
+    StoreEntry: Position of one sequence in the store.
+    SequenceStore: Stores, reads and slices named sequences.
+
+Functions:
+    pack_bases(data): Packs a sequence into 2-bit codes and its exception and mask blocks.
+    unpack_bases(packed, start, end): Unpacks the bases of a region from 2-bit codes.
+"""
+
+import json
+import os
+from collections import namedtuple
+from itertools import groupby
+import numpy as np
+from orf_finder import iter_fasta_chunks, DEFAULT_CHUNK_SIZE
+
+PACKED_FILE = "packed.bin"
+BLOCKS_FILE = "blocks.bin"
+INDEX_FILE = "index.json"
+# Number of bases packed at a time when a sequence is added from a single string
+PACK_CHUNK_SIZE = 16 * 1024 * 1024
+
+# packed_offset is in bytes, the block offsets and counts in blocks of BLOCK_DTYPE
+StoreEntry = namedtuple("StoreEntry", ["length", "packed_offset", "exception_offset",
+                                       "exception_count", "mask_offset", "mask_count"])
+BLOCK_DTYPE = np.dtype([("start", "<i8"), ("length", "<i8"), ("char", "<i8")])
+
+_CODES = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(b"ACGT"):
+    _CODES[_base] = _CODES[_base + 32] = _code
+_LETTERS = np.frombuffer(b"ACGT", dtype=np.uint8)
+# The four bases of every possible byte, the first base in the highest two bits
+_UNPACKED = _LETTERS[(np.arange(256)[:, None] >> np.array([6, 4, 2, 0])) & 3]
+
+
+def _runs(positions, values=None):
+    # Groups sorted positions into runs of consecutive positions (with equal values)
+    if len(positions) == 0:
+        return np.zeros(0, dtype=BLOCK_DTYPE)
+    breaks = np.diff(positions) != 1
+    if values is not None:
+        breaks |= np.diff(values) != 0
+    first = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+    last = np.concatenate((first[1:], [len(positions)]))
+    blocks = np.empty(len(first), dtype=BLOCK_DTYPE)
+    blocks["start"] = positions[first]
+    blocks["length"] = last - first
+    blocks["char"] = values[first] if values is not None else 0
+    return blocks
+
+
+def pack_bases(data):
+    """
+    Packs a sequence into 2-bit codes, with exception blocks for characters other than
+    A, C, G and T and mask blocks for lowercase runs.
+
+    Args:
+        data (bytes): The sequence.
+
+    Returns:
+        tuple: The packed bytes as uint8 array, the exception blocks with the uppercase
+        character of each run and the mask blocks, both as arrays of BLOCK_DTYPE.
+    """
+    bases = np.frombuffer(data, dtype=np.uint8)
+    codes = _CODES[bases]
+    exceptions = np.flatnonzero(codes == 255)
+    chars = bases[exceptions]
+    chars = np.where((chars >= ord("a")) & (chars <= ord("z")), chars - 32, chars)
+    exception_blocks = _runs(exceptions, chars)
+    mask_blocks = _runs(np.flatnonzero((bases >= ord("a")) & (bases <= ord("z"))))
+
+    codes = np.where(codes == 255, 0, codes)
+    padded = np.zeros((len(codes) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return packed.astype(np.uint8), exception_blocks, mask_blocks
+
+
+def unpack_bases(packed, start, end):
+    """
+    Unpacks the bases of a region from 2-bit codes, reading only the bytes covering it.
+
+    Args:
+        packed (numpy.ndarray): The packed bytes of the whole sequence.
+        start (int): The first position of the region.
+        end (int): The position directly after the region.
+
+    Returns:
+        numpy.ndarray: The bases A, C, G and T of the region as uint8 characters.
+    """
+    if end <= start:
+        return np.zeros(0, dtype=np.uint8)
+    first = start // 4
+    bases = _UNPACKED[packed[first:(end + 3) // 4]].reshape(-1)
+    return bases[start - 4 * first:end - 4 * first]
+
+
+def _apply_blocks(bases, blocks, start, end, lowercase=False):
+    # Writes the blocks overlapping [start, end) into the bases of that region
+    if len(blocks) == 0:
+        return
+    ends = blocks["start"] + blocks["length"]
+    first = np.searchsorted(ends, start, side="right")
+    last = np.searchsorted(blocks["start"], end, side="left")
+    for block in blocks[first:last]:
+        block_start = max(int(block["start"]), start) - start
+        block_end = min(int(block["start"] + block["length"]), end) - start
+        if lowercase:
+            region = bases[block_start:block_end]
+            bases[block_start:block_end] = np.where((region >= ord("A")) & (region <= ord("Z")),
+                                                    region | 32, region)
+        else:
+            bases[block_start:block_end] = block["char"]
+
+
+class SequenceStore:
+    """
+    Keyed store for many named DNA sequences, packed at 2 bits per base.
+
+    Attributes:
+        path (str or None): The directory backing the store, None for a store in memory.
+
+    Methods:
+        add(name, sequence): Adds a sequence, given whole or as an iterable of chunks.
+        add_fasta(file_path): Adds all sequences of a FASTA file under their IDs.
+        get(name): Returns a whole sequence.
+        fetch(name, start, end): Returns a region of a sequence.
+        length(name): Returns the length of a sequence.
+        names(): Returns the names of the stored sequences.
+        flush(): Writes the index of a store on disk.
+        close(): Writes the index and releases the memory-mapped files.
+
+    Adding a sequence under an existing name replaces it. In a store on disk the space of the
+    replaced sequence is not reused, and sequences added with add() are only found after
+    reopening the store once the index is written by flush() or close(), which is also called
+    at the end of a with block.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._memory = {}
+        self._packed = None
+        self._blocks = None
+        self._changed = False
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            index_path = os.path.join(path, INDEX_FILE)
+            if os.path.exists(index_path):
+                with open(index_path, "r", encoding="utf-8") as index_file:
+                    self._entries = {name: StoreEntry(*entry)
+                                     for name, entry in json.load(index_file).items()}
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def names(self):
+        """
+        Returns the names of the stored sequences.
+
+        Returns:
+            list: The names in the order the sequences were added.
+        """
+        return list(self._entries)
+
+    def length(self, name):
+        """
+        Returns the length of a sequence without reading it.
+
+        Args:
+            name (str): The name of the sequence.
+
+        Returns:
+            int: The number of bases.
+
+        Raises:
+            KeyError: If there is no sequence with this name.
+        """
+        return self._entries[name].length
+
+    def add(self, name, sequence):
+        """
+        Adds a sequence to the store, packing it chunk by chunk.
+
+        Args:
+            name (str): The name of the sequence.
+            sequence (str, bytes or iterable): The sequence, or an iterable of its chunks as
+            str or bytes, e.g. read from a FASTA file, so it never has to be in memory whole.
+        """
+        if isinstance(sequence, (str, bytes, bytearray)):
+            data = sequence.encode("ascii") if isinstance(sequence, str) else bytes(sequence)
+            chunks = (data[start:start + PACK_CHUNK_SIZE]
+                      for start in range(0, len(data), PACK_CHUNK_SIZE))
+        else:
+            chunks = (chunk.encode("ascii") if isinstance(chunk, str) else bytes(chunk)
+                      for chunk in sequence)
+
+        packed_parts = []
+        exception_parts = []
+        mask_parts = []
+        length = 0
+        carry = b""
+        for chunk in chunks:
+            # Only multiples of four bases are packed, the rest is carried to the next chunk
+            pending = carry + chunk
+            usable = len(pending) // 4 * 4
+            carry = pending[usable:]
+            if usable:
+                packed, exceptions, masks = pack_bases(pending[:usable])
+                exceptions["start"] += length
+                masks["start"] += length
+                packed_parts.append(packed)
+                exception_parts.append(exceptions)
+                mask_parts.append(masks)
+                length += usable
+        if carry:
+            packed, exceptions, masks = pack_bases(carry)
+            exceptions["start"] += length
+            masks["start"] += length
+            packed_parts.append(packed)
+            exception_parts.append(exceptions)
+            mask_parts.append(masks)
+            length += len(carry)
+
+        packed = np.concatenate(packed_parts) if packed_parts else np.zeros(0, dtype=np.uint8)
+        exceptions = _merge_blocks(exception_parts)
+        masks = _merge_blocks(mask_parts)
+        if self.path is None:
+            self._memory[name] = (packed, exceptions, masks)
+            self._entries[name] = StoreEntry(length, 0, 0, len(exceptions), 0, len(masks))
+        else:
+            self._entries[name] = self._append(length, packed, exceptions, masks)
+            self._changed = True
+
+    def add_fasta(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Adds all sequences of a FASTA file under their IDs, reading them in chunks.
+
+        Args:
+            file_path (str): The path to the FASTA file.
+            chunk_size (int): Approximate number of bases read at a time.
+
+        Returns:
+            list: The IDs of the added sequences, in file order.
+        """
+        record = 0
+
+        def record_number(item):
+            # Changes with every record, so records with the same ID are not joined
+            nonlocal record
+            record += item[2]
+            return record
+
+        names = []
+        for _, chunks in groupby(iter_fasta_chunks(file_path, chunk_size), key=record_number):
+            first_id, first_chunk, _ = next(chunks)
+            self.add(first_id, _chain_chunks(first_chunk, chunks))
+            names.append(first_id)
+        self.flush()
+        return names
+
+    def _append(self, length, packed, exceptions, masks):
+        self._unmap()
+        packed_path = os.path.join(self.path, PACKED_FILE)
+        blocks_path = os.path.join(self.path, BLOCKS_FILE)
+        packed_offset = os.path.getsize(packed_path) if os.path.exists(packed_path) else 0
+        block_offset = (os.path.getsize(blocks_path) // BLOCK_DTYPE.itemsize
+                        if os.path.exists(blocks_path) else 0)
+        with open(packed_path, "ab") as packed_file:
+            packed_file.write(packed.tobytes())
+        with open(blocks_path, "ab") as blocks_file:
+            blocks_file.write(exceptions.tobytes())
+            blocks_file.write(masks.tobytes())
+        return StoreEntry(length, packed_offset, block_offset, len(exceptions),
+                          block_offset + len(exceptions), len(masks))
+
+    def flush(self):
+        """
+        Writes the index of a store on disk if sequences were added since it was last written.
+        The index is replaced atomically, so a reader never sees a partly written index.
+        """
+        if self.path is None or not self._changed:
+            return
+        index_path = os.path.join(self.path, INDEX_FILE)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as index_file:
+            json.dump({name: list(entry) for name, entry in self._entries.items()}, index_file)
+        os.replace(index_path + ".tmp", index_path)
+        self._changed = False
+
+    def _arrays(self, name):
+        # The packed bytes, exception blocks and mask blocks of a sequence, as views
+        entry = self._entries[name]
+        if self.path is None:
+            return self._memory[name]
+        if self._packed is None:
+            self._packed = _open_memmap(os.path.join(self.path, PACKED_FILE), np.uint8)
+            self._blocks = _open_memmap(os.path.join(self.path, BLOCKS_FILE), BLOCK_DTYPE)
+        packed = self._packed[entry.packed_offset:entry.packed_offset + (entry.length + 3) // 4]
+        exceptions = self._blocks[entry.exception_offset:
+                                  entry.exception_offset + entry.exception_count]
+        masks = self._blocks[entry.mask_offset:entry.mask_offset + entry.mask_count]
+        return packed, exceptions, masks
+
+    def fetch(self, name, start=0, end=None):
+        """
+        Returns a region of a sequence, unpacking only the bytes that cover it.
+
+        Args:
+            name (str): The name of the sequence.
+            start (int): The first position of the region, 0-based.
+            end (int, optional): The position directly after the region, the end of the
+            sequence by default. Positions outside the sequence are clipped to it.
+
+        Returns:
+            str: The bases of the region, including N, ambiguity codes and lowercase bases
+            exactly as they were added.
+
+        Raises:
+            KeyError: If there is no sequence with this name.
+        """
+        length = self._entries[name].length
+        end = length if end is None else min(end, length)
+        start = max(0, start)
+        packed, exceptions, masks = self._arrays(name)
+        bases = unpack_bases(packed, start, end).copy()
+        _apply_blocks(bases, exceptions, start, end)
+        _apply_blocks(bases, masks, start, end, lowercase=True)
+        return bases.tobytes().decode("ascii")
+
+    def get(self, name):
+        """
+        Returns a whole sequence.
+
+        Args:
+            name (str): The name of the sequence.
+
+        Returns:
+            str: The sequence.
+
+        Raises:
+            KeyError: If there is no sequence with this name.
+        """
+        return self.fetch(name)
+
+    def close(self):
+        """
+        Writes the index and releases the memory-mapped files, they are mapped again on the
+        next read.
+        """
+        self.flush()
+        self._unmap()
+
+    def _unmap(self):
+        self._packed = None
+        self._blocks = None
+
+
+def _chain_chunks(first_chunk, chunks):
+    yield first_chunk
+    for _, chunk, _ in chunks:
+        yield chunk
+
+
+def _merge_blocks(parts):
+    # Joins the blocks of consecutive chunks, merging runs continued across a chunk boundary
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return np.zeros(0, dtype=BLOCK_DTYPE)
+    blocks = [parts[0]]
+    for part in parts[1:]:
+        last = blocks[-1][-1]
+        if (last["start"] + last["length"] == part[0]["start"]
+                and last["char"] == part[0]["char"]):
+            blocks[-1] = blocks[-1].copy()
+            blocks[-1][-1]["length"] += part[0]["length"]
+            part = part[1:]
+        if len(part):
+            blocks.append(part)
+    return np.concatenate(blocks)
+
+
+def _open_memmap(file_path, dtype):
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode="r")
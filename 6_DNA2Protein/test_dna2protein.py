@@ -0,0 +1,522 @@
+"""
+This module contains tests for the batch translation engine and the ORF finder of the
+dna2protein exercise. It uses Python's unittest framework and compares the results with
+Biopython on random input.
+
+The TestBatchTranslation class checks translate_batch and transcribe_and_translate_batch against
+Bio.Seq, in the calling process and in the process pool. The TestOrfFinder class checks
+six_frame_translation and find_orfs against a direct search in the frames translated by Bio.Seq.
+The TestSequenceGenerators class checks the seeding and composition control of the random
+sequence generators. The TestSequenceStore class checks that the 2-bit sequence store returns
+exactly the sequences and regions that were added, in memory, on disk and through the --region
+option. The TestTranslationCache class checks the cached translations against Bio.Seq, the
+statistics and the memory bound of the cache. The TestKmerCounter class checks the k-mer counts
+against a direct count with collections.Counter.
+"""
+
+import io
+import os
+import random
+from collections import Counter
+from contextlib import redirect_stdout
+import tempfile
+import unittest
+import warnings
+from unittest.mock import patch
+from Bio import BiopythonWarning
+from Bio.Seq import Seq
+from batch_translation import translate_batch, transcribe_and_translate_batch, IUPAC_BASES
+from orf_finder import six_frame_translation, find_orfs, ORF
+from dna2protein import DNASequenceGenerator, ProteinSequenceGenerator, store_output
+from sequence_store import SequenceStore
+from translation_cache import TranslationCache, ENTRY_OVERHEAD
+from kmer_counter import count_kmers, count_kmers_in_fasta, count_kmers_in_files, decode_kmer
+
+
+def random_sequences(alphabet, count, seed, max_length=300):
+    """
+    Generates random sequences, including lengths that are not a multiple of three.
+
+    Args:
+        alphabet (str): The characters to draw from.
+        count (int): The number of sequences.
+        seed (int): The seed of the random generator.
+        max_length (int): The maximum length of a sequence.
+
+    Returns:
+        list: The sequences as str.
+    """
+    rng = random.Random(seed)
+    return ["".join(rng.choices(alphabet, k=rng.randint(0, max_length))) for _ in range(count)]
+
+
+def bio_translate(sequence):
+    """
+    Translates a sequence with Bio.Seq, ignoring the warning about a trailing partial codon.
+
+    Args:
+        sequence (str): The sequence.
+
+    Returns:
+        str: The protein.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", BiopythonWarning)
+        return str(Seq(sequence).translate())
+
+
+class TestBatchTranslation(unittest.TestCase):
+    """
+    A test suite for the batch transcription and translation engine.
+    """
+    ALPHABETS = {"dna": "ACGT", "rna": "ACGU", "iupac": IUPAC_BASES,
+                 "lowercase": "acgtn", "mixed_case": "ACGTNacgtnRyS"}
+
+    def test_same_as_biopython(self):
+        """
+        Compares translate_batch and transcribe_and_translate_batch with Bio.Seq on random DNA,
+        RNA, IUPAC and lowercase sequences.
+        """
+        for seed, (name, alphabet) in enumerate(self.ALPHABETS.items()):
+            with self.subTest(alphabet=name):
+                sequences = random_sequences(alphabet, 50, seed)
+                expected = [bio_translate(sequence) for sequence in sequences]
+                self.assertEqual(translate_batch(sequences), expected)
+                self.assertEqual(translate_batch([Seq(sequence) for sequence in sequences]),
+                                 expected)
+                if name == "rna":
+                    continue
+                results = transcribe_and_translate_batch(sequences, workers=1)
+                self.assertEqual([result.rna for result in results],
+                                 [str(Seq(sequence).transcribe()) for sequence in sequences])
+                self.assertEqual([result.protein for result in results], expected)
+                self.assertEqual([result.dna for result in results], sequences)
+
+    def test_process_pool(self):
+        """
+        Checks that batches split into chunks for the process pool give the same results as
+        the calling process and Bio.Seq, in the same order.
+        """
+        sequences = random_sequences(IUPAC_BASES + "acgt", 60, 7)
+        ids = [f"seq{number}" for number in range(len(sequences))]
+        with patch("batch_translation.PARALLEL_THRESHOLD", 1000), \
+                patch("batch_translation.CHUNK_BASES", 500):
+            parallel = transcribe_and_translate_batch(sequences, workers=2, ids=ids)
+        self.assertEqual(parallel, transcribe_and_translate_batch(sequences, workers=1, ids=ids))
+        self.assertEqual([result.id for result in parallel], ids)
+        self.assertEqual([result.protein for result in parallel],
+                         [bio_translate(sequence) for sequence in sequences])
+
+    def test_gap_and_invalid_codons(self):
+        """
+        Checks that the gap codon is translated to '-' like Bio.Seq does it, and codons that
+        Bio.Seq rejects are translated to 'X' instead of raising an error.
+        """
+        self.assertEqual(translate_batch(["---"]), [bio_translate("---")])
+        self.assertEqual(translate_batch(["N-A", "A.T", "ACG---TAA", "AT-", "XXXATG"]),
+                         ["X", "X", "T-*", "X", "XM"])
+
+
+def bio_orfs(sequence, min_length):
+    """
+    Finds the ORFs of a sequence directly in its six frames translated by Bio.Seq.
+
+    Args:
+        sequence (str): The sequence.
+        min_length (int): Minimum number of amino acids of an ORF, without the stop codon.
+
+    Returns:
+        list: The ORFs as ORF tuples in forward strand coordinates, sorted.
+    """
+    orfs = []
+    length = len(sequence)
+    strands = (("+", Seq(sequence)), ("-", Seq(sequence).reverse_complement()))
+    for strand, strand_sequence in strands:
+        for offset in range(3):
+            protein = bio_translate(str(strand_sequence[offset:]))
+            segment_start = 0
+            for stop in (index for index, aa in enumerate(protein) if aa == "*"):
+                start = protein.find("M", segment_start, stop)
+                segment_start = stop + 1
+                if start < 0 or stop - start < min_length:
+                    continue
+                begin, end = offset + 3 * start, offset + 3 * stop + 3
+                if strand == "-":
+                    begin, end = length - end, length - begin
+                frame = offset + 1 if strand == "+" else -(offset + 1)
+                orfs.append(ORF(strand, frame, begin, end, stop - start, protein[start:stop]))
+    return sorted(orfs)
+
+
+class TestOrfFinder(unittest.TestCase):
+    """
+    A test suite for the six-frame translation and the ORF finder.
+    """
+    def test_six_frame_translation(self):
+        """
+        Compares the six frames with Bio.Seq on random sequences, including lowercase and
+        ambiguous bases.
+        """
+        for seed, sequence in enumerate(random_sequences("ACGTNacgtRY", 30, 3)):
+            with self.subTest(seed=seed):
+                reverse = Seq(sequence).reverse_complement()
+                expected = {}
+                for offset in range(3):
+                    expected[offset + 1] = bio_translate(sequence[offset:])
+                    expected[-(offset + 1)] = bio_translate(str(reverse[offset:]))
+                self.assertEqual(six_frame_translation(sequence), expected)
+
+    def test_find_orfs(self):
+        """
+        Checks that find_orfs gives the ORFs of a direct search, whether the sequence is given
+        whole, scanned in chunks of various sizes or fed as an iterable of chunks.
+        """
+        rng = random.Random(11)
+        sequence = "".join(rng.choices("ACGT", k=20000)) + "NNATGAAACCC"
+        expected = bio_orfs(sequence, 5)
+        self.assertGreater(len(expected), 20)
+        self.assertEqual(sorted(find_orfs(sequence, 5)), expected)
+        for chunk_size in (1, 7, 100, 4099):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(sorted(find_orfs(sequence, 5, chunk_size=chunk_size)), expected)
+                chunks = (sequence[start:start + chunk_size]
+                          for start in range(0, len(sequence), chunk_size))
+                self.assertEqual(sorted(find_orfs(chunks, 5)), expected)
+        self.assertEqual(sorted(find_orfs(sequence, 5, chunk_size=100, with_protein=False)),
+                         [orf._replace(protein=None) for orf in expected])
+
+
+class TestSequenceGenerators(unittest.TestCase):
+    """
+    A test suite for the random DNA and protein sequence generators.
+    """
+    def test_seed_reproducible_across_chunk_sizes(self):
+        """
+        Checks that a seed gives the same residues and FASTA files, no matter in which chunk
+        sizes they are drawn, and that another seed gives other residues.
+        """
+        sequence = b"".join(DNASequenceGenerator(seed=5).iter_chunks(10000, 10000))
+        for chunk_size in (1, 7, 999):
+            self.assertEqual(b"".join(DNASequenceGenerator(seed=5).iter_chunks(10000, chunk_size)),
+                             sequence)
+        self.assertEqual(DNASequenceGenerator(seed=5).create_sequence(10000).encode(), sequence)
+        self.assertNotEqual(DNASequenceGenerator(seed=6).create_sequence(10000).encode(),
+                            sequence)
+
+        with tempfile.TemporaryDirectory() as directory:
+            contents = []
+            for chunk_size in (60, 125, 100000):
+                file_path = os.path.join(directory, f"{chunk_size}.fasta")
+                ProteinSequenceGenerator(seed=3).write_fasta(file_path, [1000, 0, 61],
+                                                            chunk_size=chunk_size)
+                with open(file_path, "rb") as handle:
+                    contents.append(handle.read())
+        self.assertEqual(contents[0], contents[1])
+        self.assertEqual(contents[0], contents[2])
+        lines = contents[0].decode("ascii").split("\n")
+        self.assertEqual(lines[0], ">seq1 length=1000")
+        self.assertEqual(lines[18:20], [">seq2 length=0", ">seq3 length=61"])
+        self.assertEqual([len(line) for line in lines[1:18]], [60] * 16 + [40])
+        self.assertEqual([len(line) for line in lines[20:]], [60, 1, 0])
+
+    def test_gc_content(self):
+        """
+        Checks the GC content at its bounds and in between, and that values outside of 0 to 1
+        are rejected.
+        """
+        self.assertEqual(set(DNASequenceGenerator(seed=1, gc_content=0).create_sequence(5000)),
+                         {"A", "T"})
+        self.assertEqual(set(DNASequenceGenerator(seed=1, gc_content=1).create_sequence(5000)),
+                         {"C", "G"})
+        sequence = DNASequenceGenerator(seed=1, gc_content=0.3).create_sequence(100000)
+        self.assertAlmostEqual((sequence.count("G") + sequence.count("C")) / len(sequence), 0.3,
+                               places=2)
+        for gc_content in (-0.1, 1.1):
+            with self.assertRaises(ValueError):
+                DNASequenceGenerator(gc_content=gc_content)
+
+    def test_zero_weight_residues(self):
+        """
+        Checks that residues with a frequency of 0, or missing from the frequencies, are never
+        drawn, and that invalid frequencies are rejected.
+        """
+        sequence = DNASequenceGenerator(seed=2, frequencies={"A": 1, "C": 0, "G": 3}) \
+            .create_sequence(20000)
+        self.assertEqual(set(sequence), {"A", "G"})
+        self.assertAlmostEqual(sequence.count("G") / len(sequence), 0.75, places=2)
+        protein = ProteinSequenceGenerator(seed=2, frequencies={"W": 0, "M": 2}) \
+            .create_sequence(1000)
+        self.assertEqual(protein, "M" * 1000)
+        for frequencies in ({"A": 0, "C": 0}, {"A": 1, "C": -1}, {"A": 1, "U": 1}):
+            with self.assertRaises(ValueError):
+                DNASequenceGenerator(frequencies=frequencies)
+
+
+def random_runs(rng, length, alphabet="ACGTACGTacgtNNnRYKMSW"):
+    """
+    Generates a random sequence of runs of equal characters, so N, ambiguity codes and
+    lowercase bases form blocks of various lengths.
+
+    Args:
+        rng (random.Random): The random generator.
+        length (int): The length of the sequence.
+        alphabet (str): The characters to draw from.
+
+    Returns:
+        str: The sequence.
+    """
+    runs = []
+    size = 0
+    while size < length:
+        run = rng.choice(alphabet) * rng.randint(1, 20)
+        runs.append(run)
+        size += len(run)
+    return "".join(runs)[:length]
+
+
+class TestSequenceStore(unittest.TestCase):
+    """
+    A test suite for the 2-bit packed sequence store.
+    """
+    def check_store(self, store, sequences, rng):
+        """
+        Checks the names, lengths, whole sequences and random regions of a store.
+
+        Args:
+            store (SequenceStore): The store.
+            sequences (dict): The expected sequences by name.
+            rng (random.Random): The random generator choosing the regions.
+        """
+        self.assertEqual(store.names(), list(sequences))
+        for name, sequence in sequences.items():
+            self.assertEqual(store.length(name), len(sequence))
+            self.assertEqual(store.get(name), sequence)
+            for _ in range(20):
+                start = rng.randint(-5, len(sequence) + 5)
+                end = rng.randint(start, len(sequence) + 10)
+                self.assertEqual(store.fetch(name, start, end), sequence[max(start, 0):max(end, 0)])
+
+    def test_round_trip(self):
+        """
+        Adds sequences with N, ambiguity codes and lowercase runs whole, in chunks and from a
+        FASTA file, and checks them in memory, on disk and after reopening the store.
+        """
+        rng = random.Random(13)
+        sequences = {f"seq{number}": random_runs(rng, length)
+                     for number, length in enumerate([0, 1, 2, 3, 4, 5, 97, 1000, 4099])}
+        with tempfile.TemporaryDirectory() as directory:
+            for path in (None, os.path.join(directory, "store")):
+                whole = SequenceStore(path)
+                chunked = SequenceStore(os.path.join(directory, "chunked") if path else None)
+                for name, sequence in sequences.items():
+                    whole.add(name, sequence)
+                    sizes = [rng.randint(1, 9) for _ in range(len(sequence))]
+                    starts = [sum(sizes[:index]) for index in range(len(sizes))]
+                    chunked.add(name, (sequence[start:start + size].encode("ascii")
+                                       for start, size in zip(starts, sizes)))
+                for store in (whole, chunked):
+                    with self.subTest(path=path, store=store is chunked):
+                        self.check_store(store, sequences, rng)
+                    store.close()
+
+            reopened = SequenceStore(os.path.join(directory, "store"))
+            self.check_store(reopened, sequences, rng)
+
+            fasta_path = os.path.join(directory, "sequences.fasta")
+            with open(fasta_path, "w", encoding="ascii") as handle:
+                for name, sequence in sequences.items():
+                    lines = [sequence[start:start + 60] for start in range(0, len(sequence), 60)]
+                    handle.write(f">{name} description\n" + "".join(f"{line}\n" for line in lines))
+            with SequenceStore(os.path.join(directory, "fasta")) as store:
+                with patch("sequence_store.os.replace", wraps=os.replace) as replace:
+                    self.assertEqual(store.add_fasta(fasta_path, chunk_size=50), list(sequences))
+                self.assertEqual(replace.call_count, 1)
+            self.check_store(SequenceStore(os.path.join(directory, "fasta")), sequences, rng)
+
+    def test_region_option(self):
+        """
+        Prints regions of stored sequences with the --region option, also of names containing
+        ':', and checks that an unknown name exits with status 1 instead of raising KeyError.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store")
+            with SequenceStore(path) as store:
+                store.add("chr1", "ACGTACGTAC")
+                store.add("chr2:5", "GGGCCC")
+            for region, expected in (("chr1:2-6", "GTAC\n"), ("chr1", "ACGTACGTAC\n"),
+                                     ("chr2:5", "GGGCCC\n"), ("chr2:5:1-3", "GG\n")):
+                with patch("sys.argv", ["dna2protein.py", f"--region={region}"]), \
+                        redirect_stdout(io.StringIO()) as stdout:
+                    store_output(path)
+                self.assertEqual(stdout.getvalue(), expected, region)
+            with patch("sys.argv", ["dna2protein.py", "--region=unknown:0-20"]), \
+                    redirect_stdout(io.StringIO()) as stdout:
+                with self.assertRaises(SystemExit) as context:
+                    store_output(path)
+            self.assertEqual(context.exception.code, 1)
+            self.assertIn("'unknown' was not found in the store", stdout.getvalue())
+
+
+class TestTranslationCache(unittest.TestCase):
+    """
+    A test suite for the memoizing translation cache.
+    """
+    def test_same_as_biopython(self):
+        """
+        Compares cached translations with Bio.Seq for sequences shorter and longer than a
+        block, ending inside a block or a codon, before and after they are cached.
+        """
+        cache = TranslationCache(block_size=9)
+        rng = random.Random(17)
+        sequences = ["".join(rng.choices("ACGTNacgtn", k=length))
+                     for length in (0, 1, 2, 3, 8, 9, 10, 17, 18, 19, 100)]
+        expected = [bio_translate(sequence) for sequence in sequences]
+        self.assertEqual(cache.translate_many(sequences), expected)
+        self.assertEqual([cache.translate(sequence) for sequence in sequences], expected)
+        self.assertEqual(cache.translate(Seq(sequences[-1])), expected[-1])
+        rna = sequences[-1].upper().replace("T", "U")
+        self.assertEqual(cache.translate(rna), bio_translate(rna))
+
+    def test_hits_and_misses(self):
+        """
+        Checks the counting of hits and misses per block, including blocks repeated within one
+        batch and blocks shared between DNA and RNA in different case.
+        """
+        cache = TranslationCache(block_size=6)
+        cache.translate("ATGGCCATGGCCTTT")
+        self.assertEqual(cache.stats()[:4], (1, 2, 0, 2))
+        cache.translate("augGCCuuc")
+        self.assertEqual(cache.stats()[:4], (2, 3, 0, 3))
+        cache.translate_many(["CCCGGG", "CCCGGG", "ATGGCC"])
+        self.assertEqual(cache.stats()[:4], (4, 4, 0, 4))
+        cache.clear()
+        self.assertEqual(cache.stats(), (0, 0, 0, 0, 0))
+        self.assertEqual(len(cache), 0)
+
+    def test_memory_bound(self):
+        """
+        Checks that the cache stays within max_bytes and evicts the least recently used blocks.
+        """
+        max_bytes = 3 * (ENTRY_OVERHEAD + 2)
+        cache = TranslationCache(max_bytes=max_bytes, block_size=6)
+        rng = random.Random(19)
+        for _ in range(50):
+            cache.translate("".join(rng.choices("ACGT", k=6)))
+            self.assertLessEqual(cache.stats().bytes, max_bytes)
+        stats = cache.stats()
+        self.assertEqual(stats.entries, 3)
+        self.assertEqual(stats.bytes, max_bytes)
+        self.assertEqual(stats.evictions, stats.misses - 3)
+
+        cache = TranslationCache(max_bytes=max_bytes, block_size=6)
+        for sequence in ("AAAAAA", "CCCCCC", "GGGGGG", "AAAAAA", "TTTTTT"):
+            cache.translate(sequence)
+        misses = cache.stats().misses
+        cache.translate("AAAAAA")
+        self.assertEqual(cache.stats().misses, misses)
+        cache.translate("CCCCCC")
+        self.assertEqual(cache.stats().misses, misses + 1)
+
+        cache = TranslationCache(max_bytes=ENTRY_OVERHEAD, block_size=6)
+        self.assertEqual(cache.translate("ATGGCC"), "MA")
+        self.assertEqual(cache.stats().entries, 0)
+
+
+def counter_kmers(sequences, k, canonical):
+    """
+    Counts the k-mers of sequences directly, skipping k-mers with other bases than A, C, G and
+    T or U in either case.
+
+    Args:
+        sequences (list): The sequences as str.
+        k (int): The length of the k-mers.
+        canonical (bool): Whether to count each k-mer together with its reverse complement.
+
+    Returns:
+        collections.Counter: The counts by k-mer.
+    """
+    complement = str.maketrans("ACGT", "TGCA")
+    counts = Counter()
+    for sequence in sequences:
+        sequence = sequence.upper().replace("U", "T")
+        for start in range(len(sequence) - k + 1):
+            kmer = sequence[start:start + k]
+            if set(kmer) <= set("ACGT"):
+                if canonical:
+                    kmer = min(kmer, kmer.translate(complement)[::-1])
+                counts[kmer] += 1
+    return counts
+
+
+def as_counter(counts):
+    """
+    Converts KmerCounts to a Counter.
+
+    Args:
+        counts (KmerCounts): The counts.
+
+    Returns:
+        collections.Counter: The counts by k-mer.
+    """
+    return Counter({decode_kmer(kmer, counts.k): int(count)
+                    for kmer, count in zip(counts.kmers, counts.counts)})
+
+
+class TestKmerCounter(unittest.TestCase):
+    """
+    A test suite for the k-mer counter.
+    """
+    def setUp(self):
+        rng = random.Random(23)
+        self.sequences = [random_runs(rng, length, "ACGTACGTACGTacgtuNNU")
+                          for length in (0, 3, 50, 500, 2000)]
+        self.sequences.append("ACGTUNACGT" * 30)
+
+    def test_count_kmers(self):
+        """
+        Compares count_kmers with a direct count, canonical and not, for several k.
+        """
+        for k in (1, 2, 5, 12, 31):
+            for canonical in (True, False):
+                with self.subTest(k=k, canonical=canonical):
+                    counts = count_kmers(self.sequences, k, canonical)
+                    expected = counter_kmers(self.sequences, k, canonical)
+                    self.assertEqual(as_counter(counts), expected)
+                    self.assertEqual(counts.total(), sum(expected.values()))
+                    kmer, count = expected.most_common(1)[0]
+                    self.assertEqual(counts.count(kmer, canonical), count)
+                    self.assertEqual(counts.top(1)[0][1], count)
+                    self.assertEqual(counts.histogram(),
+                                     sorted(Counter(expected.values()).items()))
+
+    def test_count_kmers_in_fasta(self):
+        """
+        Compares the counts of FASTA files read in small chunks, also across chunk borders and
+        line breaks, and of several files counted in worker processes, with a direct count.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_paths = []
+            for number, sequences in enumerate((self.sequences[:4], self.sequences[4:])):
+                file_path = os.path.join(directory, f"{number}.fasta")
+                with open(file_path, "w", encoding="ascii") as handle:
+                    for index, sequence in enumerate(sequences):
+                        lines = [sequence[start:start + 70]
+                                 for start in range(0, len(sequence), 70)]
+                        handle.write(f">seq{index}\n" + "".join(f"{line}\n" for line in lines))
+                file_paths.append(file_path)
+
+            for k in (1, 5, 21):
+                for canonical in (True, False):
+                    with self.subTest(k=k, canonical=canonical):
+                        expected = counter_kmers(self.sequences, k, canonical)
+                        for chunk_size in (1, 7, 100):
+                            parts = [as_counter(count_kmers_in_fasta(file_path, k, canonical,
+                                                                     chunk_size))
+                                     for file_path in file_paths]
+                            self.assertEqual(parts[0] + parts[1], expected)
+                        merged = count_kmers_in_files(file_paths, k, canonical, workers=2)
+                        self.assertEqual(as_counter(merged), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+This module provides a memoizing cache for translations of redundant input, e.g. amplicons,
+variant panels or re-runs of the same constructs.
+
+A sequence is split into blocks of a fixed number of bases, aligned to its start and a multiple
+of three, so each block is translated on its own. Every block is looked up by a digest of its
+bases, so a repeated sequence is served from the cache completely, and sequences that share a
+prefix or share blocks at the same position reuse the translations of those blocks. Blocks not
+in the cache are translated together in one batch. Case is ignored and U counts as T, so DNA
+and RNA of the same sequence share their entries.
+
+The cache is bounded by the number of bytes of the cached proteins and evicts the least recently
+used blocks first.
+
+Classes:
+    CacheStats: Hit and miss statistics of a TranslationCache.
+    TranslationCache: Translates sequences, reusing cached translations of their blocks.
+"""
+
+import hashlib
+from collections import OrderedDict, namedtuple
+from batch_translation import translate_batch, as_bytes
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_BLOCK_SIZE = 3 * 1024
+# Approximate memory of a cache entry besides the protein, i.e. key, str and dict overhead
+ENTRY_OVERHEAD = 200
+
+CacheStats = namedtuple("CacheStats", ["hits", "misses", "evictions", "entries", "bytes"])
+
+_NORMALIZE = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyzU", b"ABCDEFGHIJKLMNOPQRSTTVWXYZT")
+
+
+class TranslationCache:
+    """
+    Translates DNA or RNA sequences to proteins, memoizing the translations of their blocks.
+
+    Attributes:
+        max_bytes (int): Upper bound of the memory used by the cached translations.
+        block_size (int): Number of bases per cached block, a multiple of three.
+
+    Methods:
+        translate(sequence): Translates one sequence.
+        translate_many(sequences): Translates many sequences in one batch.
+        stats(): Returns the hit and miss statistics.
+        clear(): Removes all entries and resets the statistics.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, block_size=DEFAULT_BLOCK_SIZE):
+        if block_size <= 0 or block_size % 3:
+            raise ValueError("The block size must be a positive multiple of 3")
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def translate(self, sequence):
+        """
+        Translates a DNA or RNA sequence to protein.
+
+        Args:
+            sequence (str, bytes or Bio.Seq): The sequence.
+
+        Returns:
+            str: The protein, like Bio.Seq.translate() returns it, i.e. with '*' for stop codons
+            and without a trailing partial codon.
+        """
+        return self.translate_many([sequence])[0]
+
+    def translate_many(self, sequences):
+        """
+        Translates many DNA or RNA sequences, translating all blocks missing in the cache in one
+        batch.
+
+        Args:
+            sequences (list): The sequences as str, bytes or Bio.Seq.
+
+        Returns:
+            list: The proteins as str, in the same order.
+        """
+        keys_per_sequence = []
+        found = {}
+        missing = {}
+        for sequence in sequences:
+            data = as_bytes(sequence).translate(_NORMALIZE)
+            keys = []
+            for start in range(0, len(data), self.block_size):
+                block = data[start:start + self.block_size]
+                key = hashlib.blake2b(block, digest_size=16).digest()
+                keys.append(key)
+                if key in found or key in missing:
+                    # Repeated within the batch, translated at most once
+                    self._hits += 1
+                    continue
+                protein = self._entries.get(key)
+                if protein is None:
+                    self._misses += 1
+                    missing[key] = block
+                else:
+                    self._hits += 1
+                    self._entries.move_to_end(key)
+                    found[key] = protein
+            keys_per_sequence.append(keys)
+
+        if missing:
+            for key, protein in zip(missing, translate_batch(list(missing.values()))):
+                found[key] = protein
+                self._store(key, protein)
+        return ["".join(found[key] for key in keys) for keys in keys_per_sequence]
+
+    def _store(self, key, protein):
+        size = len(protein) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        self._entries[key] = protein
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted) + ENTRY_OVERHEAD
+            self._evictions += 1
+
+    def stats(self):
+        """
+        Returns the statistics of the cache, counted per block.
+
+        Returns:
+            CacheStats: The numbers of blocks served from the cache (hits) and translated
+            (misses), of evicted blocks, of cached blocks and the bytes they use.
+        """
+        return CacheStats(self._hits, self._misses, self._evictions, len(self._entries),
+                          self._bytes)
+
+    def clear(self):
+        """
+        Removes all cached translations and resets the statistics.
+        """
+        self._entries.clear()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0